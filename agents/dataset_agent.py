@@ -0,0 +1,216 @@
+"""
+One engine for every dataset agent.
+
+Each agent is an entry under `agents:` in config.yaml: where its data comes from
+(`loader`, `source`), how the data becomes documents (`chunker`), where the vectors live
+(`index`), how much is retrieved (`retriever`), extra context providers (`context`) and
+its `prompt`. Loading, chunking, index caching, batching and tracing are implemented once
+here, so they apply to every agent, including ones that only exist in config.
+"""
+import os
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from agents.registry import API_LOADERS
+from utils import fact_table, price_history, table_text
+from utils.climate_lookup import get_climate_lookup
+from utils.data_loader import iter_row_text, load_data
+from utils.embeddings import get_embeddings, similarity_search
+from utils.index_store import get_or_build_index
+from utils.prompts import agent_template, generate
+from utils.tracing import span
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def options(value, default_type=None):
+    """Config values may be a bare type name or a mapping with a `type` key"""
+    if isinstance(value, dict):
+        return {"type": default_type, **value}
+    return {"type": value or default_type}
+
+
+# ============================================================
+# 1️⃣ Loaders — spec → DataFrame
+# ============================================================
+def _load_table(loader, file_path, api_key=None):
+    return load_data(file_path, compact=loader.get("compact", False))
+
+
+def _load_data_gov_api(loader, file_path=None, api_key=None):
+    from utils.api_fetcher import fetch_data_gov_api
+
+    return fetch_data_gov_api(
+        api_key, resource_id=loader["resource_id"], format=loader.get("format", "json"), limit=loader.get("limit", 100)
+    )
+
+
+LOADERS = {"table": _load_table, "data_gov_api": _load_data_gov_api}
+
+
+# ============================================================
+# 2️⃣ Chunkers — (index params, embed batch size, make(df, source) → Documents)
+# ============================================================
+def _chunker(chunker):
+    kind = chunker["type"]
+    if kind == "rows" and table_text.table_text_enabled():
+        # One labelled document per row / row-group (utils/table_text.py templates)
+        return table_text.index_params(), table_text.embed_batch_size(), table_text.render_documents
+
+    size, overlap = chunker.get("chunk_size", 1000), chunker.get("chunk_overlap", 100)
+    if kind in ("rows", "joined"):
+        # Raw cells joined per row, rows joined, then split (rendered one row at a time)
+        row_separator, cell_separator = chunker.get("row_separator", "\n"), chunker.get("cell_separator", ", ")
+
+        def render(df):
+            return row_separator.join(iter_row_text(df, sep=cell_separator))
+    elif kind == "frame":
+        def render(df):
+            return df.to_string(index=False)
+    else:
+        raise ValueError(f"Unknown chunker: {kind}")
+
+    def make(df, source):
+        splitter = RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap)
+        return splitter.create_documents([render(df)], metadatas=[{"source": source}])
+
+    return f"chunks={size}/{overlap}", None, make
+
+
+# ============================================================
+# 3️⃣ Context providers — (file path, agent) → callable(query) → text, or None if not applicable
+# ============================================================
+IMD_TABLES = {
+    os.path.abspath(os.path.join(fact_table.BASE_DIR, rel_path))
+    for rel_path in (fact_table.MEAN_TEMP_CSV, fact_table.MEAN_SEASONAL_CSV, fact_table.SUBDIVISION_CSV)
+}
+
+
+def _climate_lookup(file_path, agent):
+    """Exact cells for year/month/season questions; the lookup only knows the bundled IMD tables"""
+    if not file_path or os.path.abspath(file_path) not in IMD_TABLES:
+        return None
+
+    def context(query):
+        lookup = get_climate_lookup().lookup(query)
+        return lookup.context() if lookup else ""
+
+    return context
+
+
+def _price_history(file_path, agent):
+    """Rolling modal-price trend; the bundled daily feed also accumulates into the history"""
+    mandi_csv = os.path.abspath(os.path.join(fact_table.BASE_DIR, fact_table.MANDI_CSV))
+    if not price_history.history_enabled() or not file_path or os.path.abspath(file_path) != mandi_csv:
+        return None
+    try:
+        with span("ingest_history", agent=agent):
+            price_history.ingest_snapshot(file_path)
+    except Exception as e:
+        print(f"⚠️ Could not ingest {file_path} into the price history: {e}")
+    return price_history.trend_context
+
+
+CONTEXT_PROVIDERS = {"climate_lookup": _climate_lookup, "price_history": _price_history}
+CONTEXT_MODES = ("replace", "prepend", "append")  # replace: skip vector search when it has an answer
+
+
+# ============================================================
+# 4️⃣ Index types
+# ============================================================
+def _shared_index(name, file_path, embeddings, make_docs, params, batch_size):
+    """Content-keyed, memory-mapped index under data/indexes/, shared by every worker"""
+    return get_or_build_index(name, file_path, embeddings, make_docs, params=params, batch_size=batch_size)
+
+
+def _memory_index(name, file_path, embeddings, make_docs, params, batch_size):
+    """In-process index, re-embedded on every build (live API data with no file to key on)"""
+    from langchain_community.vectorstores import FAISS
+
+    docs = make_docs()
+    with span("embed_index", agent=name, chunks=len(docs)):
+        return FAISS.from_documents(docs, embeddings)
+
+
+INDEX_TYPES = {"shared": _shared_index, "memory": _memory_index}
+
+
+def _embeddings():
+    try:
+        return get_embeddings()
+    except Exception:
+        # Google embeddings when the local sentence-transformers model cannot be loaded
+        from utils.rag_helper import get_google_embeddings
+        return get_google_embeddings()
+
+
+# ============================================================
+# 5️⃣ The agent
+# ============================================================
+class DatasetAgent:
+    """Retrieval + answer agent over one dataset, configured by its `agents:` entry"""
+
+    def __init__(self, key, spec, file_path=None, api_key=None, settings=None):
+        self.key = key  # index name and tracing label
+        self.spec = spec
+        self.file_path = file_path or spec.get("source")
+        if self.file_path and not os.path.isabs(self.file_path) and not os.path.exists(self.file_path):
+            self.file_path = os.path.join(BASE_DIR, self.file_path)
+        self.k = options(spec.get("retriever")).get("k", 4)
+        self.intro = spec.get("prompt", "You are an AI assistant for agriculture.")
+        if settings is None:
+            # Standalone use (scripts, benchmarks); the app passes its settings in
+            from utils.app_core import get_settings
+            settings = get_settings()
+        self.gemini_api_key = settings.gemini_api_key
+        self.chat_model = settings.chat_model
+
+        loader = options(spec.get("loader"), "table")
+        chunker = options(spec.get("chunker"), "joined")
+        index_type = options(spec.get("index"), "shared")["type"]
+        if loader["type"] not in API_LOADERS and not (self.file_path and os.path.exists(self.file_path)):
+            raise FileNotFoundError(f"❌ Data file not found: {self.file_path}")
+        params, batch_size, make = _chunker(chunker)
+        source = os.path.basename(self.file_path) if self.file_path else key
+
+        def make_docs():
+            with span("load_data", agent=key):
+                df = LOADERS[loader["type"]](loader, self.file_path, api_key)
+            with span("chunking", agent=key):
+                return make(df, source)
+
+        self.vectorstore = INDEX_TYPES[index_type](key, self.file_path, _embeddings(), make_docs, params, batch_size)
+
+        self.context_providers = []
+        for name, mode in (spec.get("context") or {}).items():
+            if mode not in CONTEXT_MODES:
+                raise ValueError(f"Unknown context mode for {name}: {mode}")
+            provider = CONTEXT_PROVIDERS[name](self.file_path, key)
+            if provider:
+                self.context_providers.append((name, mode, provider))
+
+    def retrieve_context(self, query: str, k: int = None, query_vector=None) -> str:
+        before, after = [], []
+        for name, mode, provider in self.context_providers:
+            try:
+                with span(name, agent=self.key):
+                    text = provider(query)
+            except Exception as e:
+                print(f"⚠️ {name} context failed for {self.key}: {e}")
+                continue
+            if text and mode == "replace":
+                return text
+            if text:
+                (before if mode == "prepend" else after).append(text)
+
+        with span("similarity_search", agent=self.key):
+            docs = similarity_search(self.vectorstore, query, k=k or self.k, query_vector=query_vector)
+        return "\n\n".join(before + [d.page_content for d in docs] + after)
+
+    def run(self, query: str) -> str:
+        """Answer with this agent's context only (the app itself goes through app_core)"""
+        template = agent_template(self.key, self.spec.get("name"), self.intro)
+        response = generate(
+            template, query, self.gemini_api_key, self.chat_model, context=self.retrieve_context(query), agent=self.key
+        )
+        return response.text if response else "No response generated."
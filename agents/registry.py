@@ -0,0 +1,60 @@
+"""
+Lazy agent registry.
+
+Agents are declared under `agents:` in config.yaml and built by the generic engine in
+agents/dataset_agent.py. Front ends look agents up by their display name; the engine (and
+with it LangChain, FAISS, sentence-transformers and the Gemini SDK) is only imported when
+an agent is first built.
+"""
+import importlib
+
+from utils.config import config_section
+
+API_LOADERS = {"data_gov_api"}  # loaders that fetch live data and need the data.gov.in key
+
+
+def _load_agent_specs():
+    return config_section("agents")
+
+
+def _registry_entry(key, spec):
+    loader = spec.get("loader")
+    loader_type = loader.get("type") if isinstance(loader, dict) else loader
+    entry = {**spec, "key": key}
+    if spec.get("source"):
+        entry["default_path"] = spec["source"]
+    if loader_type in API_LOADERS:
+        entry["needs_api_key"] = True
+    return entry
+
+
+# Display name → spec (+ `key`, `default_path`, `needs_api_key`), in config order
+AGENT_REGISTRY = {spec["name"]: _registry_entry(key, spec) for key, spec in _load_agent_specs().items()}
+
+
+def agent_name(key):
+    """Display name of the agent declared as `key` under `agents:`, or None"""
+    return next((name for name, spec in AGENT_REGISTRY.items() if spec["key"] == key), None)
+
+
+def routing(agent_name):
+    """The agent's `routing` entry: keywords, examples, and datasets (default: its source)"""
+    spec = AGENT_REGISTRY[agent_name]
+    entry = spec.get("routing") or {}
+    datasets = entry.get("datasets", [spec["default_path"]] if spec.get("default_path") else [])
+    return {"keywords": entry.get("keywords", []), "examples": entry.get("examples", []), "datasets": datasets}
+
+
+def build_agent(agent_name, file_path=None, api_key=None, settings=None):
+    """
+    Build a registered agent; returns None for unknown agents or a missing API key.
+    `settings` (app_core.Settings) supplies the Gemini key and chat model.
+    """
+    spec = AGENT_REGISTRY.get(agent_name)
+    if spec is None:
+        return None
+    if spec.get("needs_api_key") and not api_key:
+        return None
+
+    engine = importlib.import_module("agents.dataset_agent")
+    return engine.DatasetAgent(spec["key"], spec, file_path, api_key, settings=settings)
@@ -0,0 +1,164 @@
+"""
+Headless HTTP inference service (for the SMS/IVR gateway and load tests).
+
+    uvicorn api:app --host 0.0.0.0 --port 8000
+    curl -X POST localhost:8000/query -H 'Content-Type: application/json' \\
+         -d '{"query": "Onion price in Maharashtra", "agent": "Auto Detect"}'
+
+Requests are accepted on the event loop and run on a bounded thread pool (embedding,
+FAISS search and the Gemini call). When every worker is busy and the wait queue is full
+the service answers 429 instead of piling up work. /healthz is liveness, /readyz reports
+which agent indexes are loaded.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from agents.registry import AGENT_REGISTRY
+from utils.app_core import agent_handle, answer_query, cached_agents, get_agent, load_config, start_index_watcher
+from utils.prompts import token_savings
+from utils.tracing import trace_request, agent_label, start_metrics_server
+
+
+# ----------------------------------
+# 1️⃣ Load Configurations
+# ----------------------------------
+api_config = load_config().get("api", {}) or {}
+WORKERS = api_config.get("workers", 4)
+MAX_QUEUE = api_config.get("max_queue", 16)
+REQUEST_TIMEOUT = api_config.get("request_timeout_seconds", 60)
+PRELOAD_AGENTS = api_config.get("preload_agents", [])
+
+
+# ----------------------------------
+# 2️⃣ Worker Pool and Admission Control
+# ----------------------------------
+class ServiceState:
+    def __init__(self):
+        self.pool = None
+        self.in_flight = 0          # running + queued requests (event-loop only, no lock needed)
+        self.rejected = 0
+        self.preload_errors = {}
+        self.started = time.time()
+
+    def release(self):
+        self.in_flight -= 1
+
+    @property
+    def capacity(self):
+        return WORKERS + MAX_QUEUE
+
+
+state = ServiceState()
+
+
+def _preload(agent_name):
+    try:
+        if not get_agent(agent_handle(agent_name)):
+            state.preload_errors[agent_name] = "build returned no agent"
+    except Exception as e:
+        state.preload_errors[agent_name] = str(e)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    state.pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="krishi-api")
+    start_metrics_server()
+    start_index_watcher()
+    # Build configured indexes in the background; /readyz flips once they are loaded
+    for agent_name in PRELOAD_AGENTS:
+        state.pool.submit(_preload, agent_name)
+    yield
+    state.pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="KrishiSutra API", lifespan=lifespan)
+
+
+class QueryRequest(BaseModel):
+    query: str
+    agent: str = "Auto Detect"
+    session_id: Optional[str] = None  # set to resolve follow-ups against earlier questions
+
+
+def _run_query(query, agent, session_id=None):
+    with trace_request("api", agent=agent_label(agent)):
+        return answer_query(query, agent, session_id=session_id)
+
+
+# ----------------------------------
+# 3️⃣ Endpoints
+# ----------------------------------
+@app.post("/query")
+async def query(request: QueryRequest):
+    if not request.query.strip():
+        return JSONResponse({"error": "Empty query"}, status_code=400)
+    if request.agent != "Auto Detect" and request.agent not in AGENT_REGISTRY:
+        return JSONResponse({"error": f"Unknown agent: {request.agent}"}, status_code=400)
+
+    # Backpressure: reject instead of queueing without bound
+    if state.in_flight >= state.capacity:
+        state.rejected += 1
+        return JSONResponse(
+            {"error": "Server busy, retry shortly"},
+            status_code=429,
+            headers={"Retry-After": "1"},
+        )
+
+    state.in_flight += 1
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    work = state.pool.submit(_run_query, request.query, request.agent, request.session_id)
+    # Free the slot when the work really finishes, not when the client gives up waiting
+    work.add_done_callback(lambda _: loop.call_soon_threadsafe(state.release))
+    try:
+        answer = await asyncio.wait_for(asyncio.wrap_future(work), timeout=REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        return JSONResponse({"error": "Request timed out"}, status_code=504)
+
+    return {
+        "query": request.query,
+        "agent": request.agent,
+        "answer": answer,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+@app.get("/healthz")
+async def healthz():
+    return {
+        "status": "ok",
+        "uptime_seconds": round(time.time() - state.started, 1),
+        "in_flight": state.in_flight,
+        "capacity": state.capacity,
+        "rejected": state.rejected,
+        "llm_tokens": token_savings(),
+    }
+
+
+@app.get("/readyz")
+async def readyz():
+    loaded = sorted({handle.agent_name for handle in cached_agents() if handle.digest is None})
+    pending = [name for name in PRELOAD_AGENTS if name not in loaded and name not in state.preload_errors]
+    ready = not pending and not state.preload_errors
+    return JSONResponse(
+        {
+            "ready": ready,
+            "loaded_agents": loaded,
+            "pending_agents": pending,
+            "failed_agents": state.preload_errors,
+        },
+        status_code=200 if ready else 503,
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=api_config.get("host", "127.0.0.1"), port=api_config.get("port", 8000))
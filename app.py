@@ -1,169 +1,79 @@
 import gradio as gr
-import yaml
-import google.generativeai as genai
-import os
 
-from agents.climate_agent import build_climate_agent
-from agents.agriculture_agent import build_agriculture_agent
-from agents.scheme_agent import build_scheme_agent
-from agents.kcc_agent import build_kcc_agent
+from agents.registry import AGENT_REGISTRY
+
+# Config, clients and built agents live in the shared core (created once per process)
+from utils.app_core import answer_query, get_settings, start_index_watcher, submit_upload, upload_status
+from utils.conversation import get_conversation_store
+from utils.tracing import trace_request, agent_label, start_metrics_server
+from utils.upload_governor import UploadRejected
 
 
 # ----------------------------------
 # 1️⃣ Load Configurations (with env variable support)
 # ----------------------------------
-def load_config():
-    config_path = os.path.join(os.path.dirname(__file__), "config.yaml")
-    with open(config_path, "r") as f:
-        config = yaml.safe_load(f)
-    
-    # Override with environment variables if available (for HuggingFace Spaces secrets)
-    config["google_api_key"] = os.environ.get("GOOGLE_API_KEY", config.get("google_api_key"))
-    config["data_gov"]["api_key"] = os.environ.get("DATA_GOV_API_KEY", config["data_gov"]["api_key"])
-    
-    return config
-
-config = load_config()
-
-# Read keys and parameters
-DATA_GOV_API_KEY = config["data_gov"]["api_key"]
-LLM_PROVIDER = config.get("llm_provider", "gemini")
-GEMINI_API_KEY = config.get("google_api_key")
-EMBEDDING_MODEL = config.get("embedding_model", "models/embedding-001")
-EMBEDDING_PROVIDER = config.get("embedding_provider", "huggingface")
-CHAT_MODEL = config.get("chat_model", "models/gemini-pro-latest")
+settings = get_settings()
+CHAT_MODEL = settings.chat_model
+EMBEDDING_PROVIDER = settings.embedding_provider
 
-# ✅ Configure Gemini API
-if LLM_PROVIDER.lower() == "gemini" and GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+# ✅ Check Gemini settings (the SDK itself is imported and configured on the first answer)
+if not settings.gemini_ready:
     raise ValueError("❌ Gemini API key missing or provider not set to 'gemini'.")
 
 
 # ----------------------------------
-# 2️⃣ Agent Cache
+# 2️⃣ Chat Handler
 # ----------------------------------
-agent_cache = {}
+def _dataset_path(uploaded_file):
+    """gr.File(type="filepath") passes a path string; older Gradio versions pass a tempfile"""
+    if not uploaded_file:
+        return None
+    return uploaded_file if isinstance(uploaded_file, str) else uploaded_file.name
 
-def get_agent(agent_choice, uploaded_file=None):
-    """Dynamically build and return the chosen RAG agent"""
-    temp_path = None
 
-    # Save uploaded file for use
-    if uploaded_file:
-        temp_path = f"data/{os.path.basename(uploaded_file.name)}"
-        os.makedirs("data", exist_ok=True)
-        with open(temp_path, "wb") as f:
-            f.write(uploaded_file.read())
-
-    cache_key = f"{agent_choice}_{temp_path or 'default'}"
-    
-    if cache_key in agent_cache:
-        return agent_cache[cache_key]
-
-    if agent_choice == "🌦️ Climate Agent":
-        agent = build_climate_agent(temp_path or "data/Mean_Temp_IMD_2017.csv")
-    elif agent_choice == "🌾 Agriculture Agent":
-        agent = build_agriculture_agent(temp_path or "data/Current Daily Price of Various Commodities from Various Markets (Mandi).csv")
-    elif agent_choice == "🧾 Scheme Agent":
-        agent = build_scheme_agent(temp_path or "data/GetPMKIsanDatagov.json")
-    elif agent_choice == "☎️ KCC Agent":
-        agent = build_kcc_agent(DATA_GOV_API_KEY) if DATA_GOV_API_KEY else None
-    else:
-        agent = None
-
-    if agent:
-        agent_cache[cache_key] = agent
+def chat_handler(user_query, agent_choice, uploaded_file, chat_history, request: gr.Request = None):
+    """Process user query and return response"""
     
-    return agent
-
-
-# ----------------------------------
-# 3️⃣ Auto Agent Detection
-# ----------------------------------
-def auto_select_agent(user_query):
-    query = user_query.lower()
-    if any(word in query for word in ["rain", "temperature", "climate", "weather"]):
-        return "🌦️ Climate Agent"
-    elif any(word in query for word in ["crop", "yield", "price", "production", "agriculture"]):
-        return "🌾 Agriculture Agent"
-    elif any(word in query for word in ["scheme", "pmkisan", "subsidy", "beneficiary"]):
-        return "🧾 Scheme Agent"
-    elif any(word in query for word in ["kcc", "helpline", "call centre"]):
-        return "☎️ KCC Agent"
-    else:
-        return "🌾 Agriculture Agent"  # Default fallback
-
-
-# ----------------------------------
-# 4️⃣ Gemini Response Helper
-# ----------------------------------
-def gemini_answer(prompt, context=""):
-    """Uses Gemini 1.5 model to generate a clean, factual answer"""
-    try:
-        model = genai.GenerativeModel(CHAT_MODEL)
-        full_prompt = f"""
-You are an AI assistant for smart agriculture - KrishiSutra.
-Use the following context to answer the question accurately.
-
-Context:
-{context}
+    if not user_query or user_query.strip() == "":
+        return chat_history, ""
 
-Question:
-{prompt}
+    # Gradio's per-browser-tab session hash keys the conversation memory
+    session_id = request.session_hash if request else None
+    with trace_request("chat_handler", agent=agent_label(agent_choice)):
+        answer = answer_query(user_query, agent_choice, _dataset_path(uploaded_file), session_id=session_id)
 
-Provide a concise, factual, and human-readable answer.
-"""
-        response = model.generate_content(full_prompt)
-        return response.text or "⚠️ No response generated."
-    except Exception as e:
-        return f"❌ Error: {str(e)}"
+    chat_history.append((user_query, answer))
+    return chat_history, ""
 
 
-# ----------------------------------
-# 5️⃣ Chat Handler
-# ----------------------------------
-def chat_handler(user_query, agent_choice, uploaded_file, chat_history):
-    """Process user query and return response"""
-    
-    if not user_query or user_query.strip() == "":
-        return chat_history, ""
-    
-    # Step 1: Auto-select agent if needed
-    selected_agent = agent_choice
+def upload_handler(uploaded_file, agent_choice):
+    """Check a new upload against the limits and queue its index build for the chosen agent"""
+    dataset_path = _dataset_path(uploaded_file)
+    if not dataset_path:
+        return ""
     if agent_choice == "Auto Detect":
-        selected_agent = auto_select_agent(user_query)
+        return "📎 File received; it is indexed for the agent your first question is routed to."
+    try:
+        return submit_upload(agent_choice, dataset_path).describe()
+    except UploadRejected as e:
+        return f"❌ Upload rejected: {e}"
 
-    # Step 2: Initialize selected agent
-    qa_agent = get_agent(selected_agent, uploaded_file)
 
-    if not qa_agent:
-        error_msg = f"❌ Failed to initialize {selected_agent}"
-        chat_history.append((user_query, error_msg))
-        return chat_history, ""
+def upload_status_handler(uploaded_file, agent_choice):
+    """Polled by a timer while a build runs; leaves the status alone when there is no job"""
+    status = upload_status(agent_choice, _dataset_path(uploaded_file))
+    return status if status else gr.update()
 
-    # Step 3: Retrieve domain-specific context
-    try:
-        if hasattr(qa_agent, 'retrieve_context'):
-            context = qa_agent.retrieve_context(user_query)
-        else:
-            context = qa_agent.run(user_query)
-    except Exception as e:
-        error_msg = f"❌ Error retrieving context: {str(e)}"
-        chat_history.append((user_query, error_msg))
-        return chat_history, ""
 
-    # Step 4: Use Gemini to generate final answer
-    final_answer = gemini_answer(user_query, context)
-    
-    # Add to chat history
-    chat_history.append((user_query, final_answer))
-    
-    return chat_history, ""
+def clear_handler(request: gr.Request = None):
+    """Clear the chat window and forget the session's conversation memory"""
+    if request:
+        get_conversation_store().clear(request.session_hash)
+    return [], ""
 
 
 # ----------------------------------
-# 6️⃣ Gradio Interface
+# 3️⃣ Gradio Interface
 # ----------------------------------
 def build_gradio_app():
     """Build the Gradio UI"""
@@ -184,7 +94,7 @@ def build_gradio_app():
                 gr.Markdown("### ⚙️ Configuration")
                 
                 agent_choice = gr.Dropdown(
-                    choices=["Auto Detect", "🌦️ Climate Agent", "🌾 Agriculture Agent", "🧾 Scheme Agent", "☎️ KCC Agent"],
+                    choices=["Auto Detect", *AGENT_REGISTRY],
                     value="Auto Detect",
                     label="Select Knowledge Agent",
                     interactive=True
@@ -192,9 +102,10 @@ def build_gradio_app():
                 
                 uploaded_file = gr.File(
                     label="📤 Upload Custom Dataset",
-                    file_types=[".csv", ".xlsx", ".xls", ".json"],
+                    file_types=[".csv", ".xlsx", ".xls", ".json", ".parquet", ".zip"],
                     type="filepath"
                 )
+                upload_info = gr.Markdown()
                 
                 gr.Markdown(
                     f"""
@@ -248,8 +159,13 @@ def build_gradio_app():
             outputs=[chatbot, user_input]
         )
         
+        # Upload builds run in the background; the status line is refreshed every 2 s
+        uploaded_file.change(fn=upload_handler, inputs=[uploaded_file, agent_choice], outputs=upload_info)
+        agent_choice.change(fn=upload_handler, inputs=[uploaded_file, agent_choice], outputs=upload_info)
+        gr.Timer(2).tick(fn=upload_status_handler, inputs=[uploaded_file, agent_choice], outputs=upload_info)
+
         clear_btn.click(
-            fn=lambda: ([], ""),
+            fn=clear_handler,
             inputs=None,
             outputs=[chatbot, user_input]
         )
@@ -265,8 +181,10 @@ def build_gradio_app():
 
 
 # ----------------------------------
-# 7️⃣ Launch
+# 4️⃣ Launch
 # ----------------------------------
 if __name__ == "__main__":
+    start_metrics_server()
+    start_index_watcher()
     demo = build_gradio_app()
     demo.launch()
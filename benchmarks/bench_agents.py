@@ -0,0 +1,247 @@
+"""
+Offline benchmark for the agent build and query paths.
+
+Runs without network access: Gemini is replaced by a fake LLM and the embedding model is
+pinned to a local sentence-transformers directory (or a deterministic hashing model).
+Each agent is measured in its own subprocess so peak RSS is not shared between agents.
+
+    python -m benchmarks.bench_agents --model-path ./models/all-MiniLM-L6-v2 --label v1
+    python -m benchmarks.bench_agents --label v2 --compare benchmarks/results/v1.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agents import registry
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+# Benchmark key → registered agent (agents are declared in config.yaml)
+AGENTS = {key: registry.agent_name(key) for key in ("climate", "agriculture", "scheme")}
+
+QUERIES = {
+    "climate": [
+        "Mean temperature in July 1987",
+        "Which year had the warmest winter?",
+        "Temperature trend during the monsoon season",
+        "Compare annual temperature in 1950 and 2010",
+        "How hot was May 2016?",
+    ],
+    "agriculture": [
+        "What is the modal price of onion in Maharashtra?",
+        "Tomato prices in Karnataka markets",
+        "Cheapest potato market in Uttar Pradesh",
+        "Cotton price in Gujarat",
+        "Which commodities arrived in Kerala markets?",
+    ],
+    "scheme": [
+        "How many PM-KISAN beneficiaries are in Bihar?",
+        "List farmer schemes in Rajasthan",
+        "Total amount transferred under PM-KISAN",
+    ],
+}
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8]
+QUERIES_PER_LEVEL = 100
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentiles(latencies_ms):
+    ordered = sorted(latencies_ms)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "mean": sum(ordered) / len(ordered)}
+
+
+def _index_size_bytes(vectorstore):
+    """Serialized FAISS index plus the raw chunk text held by the docstore"""
+    import faiss
+
+    index_bytes = faiss.serialize_index(vectorstore.index).nbytes
+    docstore = vectorstore.docstore
+    if hasattr(docstore, "offsets"):  # flat-file docstore: text size is the last offset
+        text_bytes = int(docstore.offsets[-1])
+    else:
+        text_bytes = sum(len(doc.page_content.encode("utf-8")) for doc in getattr(docstore, "_dict", {}).values())
+    return {"index_bytes": int(index_bytes), "docstore_text_bytes": text_bytes, "vectors": vectorstore.index.ntotal}
+
+
+# ============================================================
+# 1️⃣ Child process: build one agent and hammer it with queries
+# ============================================================
+def run_child(agent_key, model_path, llm_latency):
+    from benchmarks.fakes import install_embeddings, install_fake_llm
+
+    install_fake_llm(latency=llm_latency)
+    embeddings = install_embeddings(model_path)
+
+    from agents.registry import AGENT_REGISTRY, build_agent
+
+    agent_name = AGENTS[agent_key]
+    rel_path = AGENT_REGISTRY[agent_name]["default_path"]
+    source = os.path.join(BASE_DIR, rel_path)
+    if not os.path.exists(source):
+        return {"agent": agent_key, "skipped": f"dataset not found: {rel_path}"}
+
+    rss_before = _peak_rss_mb()
+
+    # Copy the dataset and redirect the index store so indexes are rebuilt from scratch every run
+    with tempfile.TemporaryDirectory() as tmp:
+        from utils import index_store
+        index_store.INDEX_ROOT = os.path.join(tmp, "indexes")
+        dataset = os.path.join(tmp, os.path.basename(rel_path))
+        shutil.copy(source, dataset)
+
+        start = time.perf_counter()
+        agent = build_agent(agent_name, dataset)
+        build_seconds = time.perf_counter() - start
+        peak_rss = _peak_rss_mb()
+
+        result = {
+            "agent": agent_key,
+            "embedding_model": getattr(embeddings, "model_name", type(embeddings).__name__),
+            "build_seconds": build_seconds,
+            "rss_before_build_mb": rss_before,
+            "peak_rss_mb": peak_rss,
+            "index": _index_size_bytes(agent.vectorstore),
+            "queries": {},
+        }
+
+        queries = QUERIES[agent_key]
+        agent.run(queries[0])  # warm-up (tokenizer caches, first FAISS search)
+
+        for concurrency in CONCURRENCY_LEVELS:
+            def timed(i):
+                start = time.perf_counter()
+                agent.run(queries[i % len(queries)])
+                return (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                latencies = list(pool.map(timed, range(QUERIES_PER_LEVEL)))
+            elapsed = time.perf_counter() - start
+
+            result["queries"][str(concurrency)] = {
+                "throughput_qps": QUERIES_PER_LEVEL / elapsed,
+                "latency_ms": _percentiles(latencies),
+            }
+
+    return result
+
+
+# ============================================================
+# 2️⃣ Parent process: run every agent, save and compare results
+# ============================================================
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def run_all(agent_keys, model_path, llm_latency):
+    results = []
+    for agent_key in agent_keys:
+        print(f"⏱️  Benchmarking {agent_key} agent...", file=sys.stderr)
+        cmd = [sys.executable, "-m", "benchmarks.bench_agents", "--child", agent_key,
+               "--llm-latency", str(llm_latency)]
+        if model_path:
+            cmd += ["--model-path", model_path]
+        proc = subprocess.run(cmd, cwd=BASE_DIR, capture_output=True, text=True)
+        if proc.returncode != 0:
+            results.append({"agent": agent_key, "error": proc.stderr.strip().splitlines()[-1:]})
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def compare(current, baseline_path):
+    """Print relative change against a previous results file (positive = slower/bigger)"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["agent"]: r for r in json.load(f)["results"]}
+
+    def delta(new, old):
+        return f"{(new - old) / old * 100:+6.1f}%" if old else "   n/a"
+
+    print(f"\nComparison against {baseline_path}:")
+    for result in current["results"]:
+        old = baseline.get(result["agent"])
+        if not old or "build_seconds" not in result or "build_seconds" not in old:
+            continue
+        print(f"  {result['agent']}:")
+        print(f"    build        {result['build_seconds']:8.2f}s   {delta(result['build_seconds'], old['build_seconds'])}")
+        print(f"    peak RSS     {result['peak_rss_mb']:8.1f}MB  {delta(result['peak_rss_mb'], old['peak_rss_mb'])}")
+        for level, stats in result["queries"].items():
+            old_stats = old["queries"].get(level)
+            if old_stats:
+                p95, old_p95 = stats["latency_ms"]["p95"], old_stats["latency_ms"]["p95"]
+                print(f"    c={level:<2} p95    {p95:8.1f}ms  {delta(p95, old_p95)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline KrishiSutra build/query benchmark")
+    parser.add_argument("--agents", nargs="+", default=list(AGENTS), choices=list(AGENTS))
+    parser.add_argument("--model-path", help="local sentence-transformers directory (default: hashing embeddings)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fake LLM latency in seconds")
+    parser.add_argument("--label", default=None, help="results file name (default: git revision)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.model_path, args.llm_latency)))
+        return
+
+    revision = _git_revision()
+    report = {
+        "label": args.label or revision or "unlabelled",
+        "git_revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "llm_latency": args.llm_latency,
+        "results": run_all(args.agents, args.model_path, args.llm_latency),
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"{report['label']}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {os.path.relpath(out_path, BASE_DIR)}")
+
+    for result in report["results"]:
+        if "build_seconds" in result:
+            c1 = result["queries"]["1"]
+            print(f"  {result['agent']:<12} build {result['build_seconds']:.2f}s  "
+                  f"peak RSS {result['peak_rss_mb']:.0f}MB  "
+                  f"index {result['index']['index_bytes'] / 1e6:.1f}MB  "
+                  f"p95@1 {c1['latency_ms']['p95']:.1f}ms  {c1['throughput_qps']:.0f} qps@1")
+        else:
+            print(f"  {result['agent']:<12} {result.get('skipped') or result.get('error')}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Query-embedding throughput and tail latency, with and without micro-batching.
+
+N client threads each embed queries back to back through utils.embeddings.embed_query,
+the path the router and agents use, with `embedding_batching` disabled (one forward pass
+per query) and enabled (utils.embeddings.QueryBatcher). Uses a local
+sentence-transformers directory when given, otherwise a randomly initialised encoder with
+the MiniLM-L6 shape (same compute profile, no weights needed).
+
+    python -m benchmarks.bench_batching --model-path ./models/all-MiniLM-L6-v2
+    python -m benchmarks.bench_batching --concurrency 1 8 32 --max-wait-ms 2
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_agents import QUERIES, RESULTS_DIR, _percentiles
+
+ALL_QUERIES = [q for queries in QUERIES.values() for q in queries]
+
+
+def _load_model(model_path):
+    if model_path:
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_path)
+    from benchmarks.fakes import MiniLMShapedEmbeddings
+    return MiniLMShapedEmbeddings()
+
+
+def run_level(embed, concurrency, total):
+    def timed(i):
+        start = time.perf_counter()
+        embed(ALL_QUERIES[i % len(ALL_QUERIES)])
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - start
+    return {"throughput_qps": total / elapsed, "latency_ms": _percentiles(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query-embedding micro-batching benchmark")
+    parser.add_argument("--model-path", help="local sentence-transformers directory (default: MiniLM-shaped random encoder)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=256, help="queries per concurrency level")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=3)
+    args = parser.parse_args()
+
+    from utils.embeddings import embed_query, get_query_batcher, set_batching, set_embeddings
+
+    model = _load_model(args.model_path)
+    set_embeddings(model)
+    model.embed_query(ALL_QUERIES[0])  # warm-up
+
+    report = {"model": getattr(model, "model_name", type(model).__name__),
+              "max_batch_size": args.max_batch_size, "max_wait_ms": args.max_wait_ms, "levels": {}}
+    print(f"{'clients':>7}  {'mode':<9} {'qps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  avg batch")
+    for concurrency in args.concurrency:
+        set_batching(enabled=False)
+        direct = run_level(embed_query, concurrency, args.queries)
+        set_batching(enabled=True, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+        batched = run_level(embed_query, concurrency, args.queries)
+        batcher = get_query_batcher()
+        avg_batch = batcher.queries / max(1, batcher.batches)
+        batched["avg_batch_size"] = avg_batch
+        report["levels"][str(concurrency)] = {"direct": direct, "batched": batched}
+
+        for mode, stats in (("direct", direct), ("batched", batched)):
+            lat = stats["latency_ms"]
+            extra = f"  {avg_batch:.1f}" if mode == "batched" else ""
+            print(f"{concurrency:>7}  {mode:<9} {stats['throughput_qps']:8.1f} "
+                  f"{lat['p50']:8.1f} {lat['p95']:8.1f} {lat['p99']:8.1f}{extra}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "batching.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Index build scaling with the number of embedding worker processes.
+
+Embeds the agriculture chunks (repeated up to --chunks) with utils.parallel_embed at each
+worker count, checks the index matches the single-process build, and reports speedup and
+parallel efficiency. Worker start-up (one model load per process) is included, as it is in
+a real build.
+
+    python -m benchmarks.bench_build --workers 1 2 4 8 16 --model-path ./models/all-MiniLM-L6-v2
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from agents.registry import AGENT_REGISTRY
+from benchmarks.bench_agents import AGENTS, BASE_DIR, RESULTS_DIR
+from benchmarks.bench_batching import _load_model
+
+
+def _chunks(count):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from utils.data_loader import load_data
+
+    df = load_data(os.path.join(BASE_DIR, AGENT_REGISTRY[AGENTS["agriculture"]]["default_path"]))
+    text = " ".join(df.astype(str).apply(lambda x: " | ".join(x), axis=1).tolist())
+    chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_text(text)
+    return [chunks[i % len(chunks)] for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel index build benchmark")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunks", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model-path", help="local sentence-transformers directory (default: MiniLM-shaped random encoder)")
+    args = parser.parse_args()
+
+    from utils import parallel_embed
+    from utils.parallel_embed import build_index
+
+    parallel_embed._load_build_config = lambda: {"min_chunks_for_parallel": 0}
+    model = _load_model(args.model_path)
+    chunks = _chunks(args.chunks)
+    print(f"{len(chunks)} chunks, batch size {args.batch_size}, {os.cpu_count()} CPU cores")
+    print(f"{'workers':>7} {'seconds':>8} {'chunks/s':>9} {'speedup':>8} {'efficiency':>10}")
+
+    report, baseline, reference = {}, None, None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        index = build_index(chunks, model, label=f"{workers} workers", workers=workers,
+                            batch_size=args.batch_size, progress=False)
+        seconds = time.perf_counter() - start
+
+        vectors = index.reconstruct_n(0, index.ntotal)
+        if reference is None:
+            reference = vectors
+        matches = bool(np.allclose(vectors, reference, atol=1e-4))
+
+        baseline = baseline or seconds
+        report[workers] = {"seconds": seconds, "chunks_per_s": len(chunks) / seconds,
+                           "speedup": baseline / seconds, "matches_single_process": matches}
+        print(f"{workers:>7} {seconds:8.2f} {len(chunks) / seconds:9.1f} {baseline / seconds:7.2f}x "
+              f"{baseline / seconds / workers:9.0%}{'' if matches else '  ⚠️ vectors differ'}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "build.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"chunks": len(chunks), "cpu_count": os.cpu_count(), "workers": report}, f, indent=2)
+    print(f"✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
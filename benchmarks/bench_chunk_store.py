@@ -0,0 +1,104 @@
+"""
+Index load time and hit-fetch latency: pickled LangChain docstore vs the flat chunk store.
+
+For each corpus size, saves the same vectors and chunk text both ways, then times opening
+the index in a fresh process (FAISS.load_local + unpickling vs utils.index_store.load_index)
+and fetching the documents for a k=5 search.
+
+    python -m benchmarks.bench_chunk_store --sizes 10000 100000 500000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_agents import BASE_DIR, RESULTS_DIR
+
+_PROBE = """
+import json, time
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from benchmarks.fakes import HashingEmbeddings
+from utils.index_store import load_index
+mode, path = {mode!r}, {path!r}
+embeddings = HashingEmbeddings(dim={dim})
+start = time.perf_counter()
+if mode == "pickle":
+    store = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+else:
+    store = load_index(path, embeddings)
+load = time.perf_counter() - start
+query = np.random.default_rng(1).random({dim}).tolist()
+store.similarity_search_by_vector(query, k=5)
+start = time.perf_counter()
+for _ in range(20):
+    store.similarity_search_by_vector(query, k=5)
+print(json.dumps({{"load_ms": load * 1000, "search_ms": (time.perf_counter() - start) / 20 * 1000}}))
+"""
+
+
+def _build(tmp, size, dim):
+    import faiss
+    import numpy as np
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+
+    from benchmarks.fakes import HashingEmbeddings
+    from utils.index_store import save_vectorstore
+
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(dim)
+    index.add(rng.random((size, dim), dtype=np.float32))
+    docs = {
+        str(i): Document(
+            page_content=f"State {i % 36} | District {i % 700} | Market {i % 3000} | Onion | modal price {i % 5000}",
+            metadata={"source": f"mandi_{i % 4}.csv"},
+        )
+        for i in range(size)
+    }
+    store = FAISS(HashingEmbeddings(dim=dim), index, InMemoryDocstore(docs), {i: str(i) for i in range(size)})
+
+    pickle_path, flat_path = os.path.join(tmp, f"pickle-{size}"), os.path.join(tmp, f"flat-{size}")
+    store.save_local(pickle_path)
+    save_vectorstore(flat_path, store)
+    return pickle_path, flat_path
+
+
+def _probe(mode, path, dim):
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(mode=mode, path=path, dim=dim)],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pickled docstore vs flat chunk store")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000, 100000, 500000])
+    parser.add_argument("--dim", type=int, default=32, help="small by default: this measures the docstore, not FAISS")
+    args = parser.parse_args()
+
+    report = {}
+    print(f"{'chunks':>8}  {'pickle load':>12}  {'flat load':>10}  {'pickle k=5':>11}  {'flat k=5':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            pickle_path, flat_path = _build(tmp, size, args.dim)
+            pickled, flat = _probe("pickle", pickle_path, args.dim), _probe("flat", flat_path, args.dim)
+            report[size] = {"pickle": pickled, "flat": flat}
+            print(f"{size:>8}  {pickled['load_ms']:10.1f}ms  {flat['load_ms']:8.1f}ms  "
+                  f"{pickled['search_ms']:9.2f}ms  {flat['search_ms']:7.2f}ms")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "chunk_store.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Memory of the mandi DataFrame and of rendering it to text: default dtypes vs compact ones.
+
+The bundled mandi CSV is one day's feed; --days copies it across that many arrival dates
+(and --scale copies it within a day) to approximate the all-India history. For each mode
+a fresh process loads the file and renders the chunk text the way the agriculture agent
+does; reports the frame's deep memory and the process's peak RSS.
+
+    python -m benchmarks.bench_frame_memory --days 30
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_agents import BASE_DIR, RESULTS_DIR
+
+MANDI_CSV = os.path.join(BASE_DIR, "data", "Current Daily Price of Various Commodities from Various Markets (Mandi).csv")
+
+_PROBE = """
+import json, resource, time
+from utils.data_loader import iter_row_text, load_data, memory_mb
+mode, path = {mode!r}, {path!r}
+start = time.perf_counter()
+df = load_data(path, compact=mode == "compact")
+load = time.perf_counter() - start
+frame_mb = memory_mb(df)
+start = time.perf_counter()
+if mode == "compact":
+    text = " ".join(iter_row_text(df))
+else:
+    text = " ".join(df.astype(str).apply(lambda x: " | ".join(x), axis=1).tolist())
+render = time.perf_counter() - start
+print(json.dumps({{
+    "rows": len(df),
+    "frame_mb": frame_mb,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "load_s": load,
+    "render_s": render,
+    "text_chars": len(text),
+}}))
+"""
+
+
+def _write_history(path, days, scale):
+    import pandas as pd
+
+    day = pd.read_csv(MANDI_CSV)
+    first = pd.to_datetime(day["Arrival_Date"], format="%d/%m/%Y").min()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for d in range(days):
+            frame = pd.concat([day] * scale, ignore_index=True)
+            frame["Arrival_Date"] = (first - pd.Timedelta(days=d)).strftime("%d/%m/%Y")
+            frame.to_csv(f, index=False, header=d == 0)
+
+
+def _probe(mode, path):
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(mode=mode, path=path)],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mandi DataFrame memory: default vs compact dtypes")
+    parser.add_argument("--days", type=int, default=30, help="arrival dates to synthesise")
+    parser.add_argument("--scale", type=int, default=1, help="copies of the feed per day")
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mandi.csv")
+        _write_history(path, args.days, args.scale)
+        print(f"{os.path.getsize(path) / 1e6:.1f} MB CSV, {args.days} day(s) × {args.scale}\n")
+        print(f"{'mode':<8} {'rows':>9} {'frame':>9} {'peak RSS':>9} {'load':>7} {'render':>7}")
+        for mode in ("default", "compact"):
+            stats = report[mode] = _probe(mode, path)
+            print(f"{mode:<8} {stats['rows']:>9} {stats['frame_mb']:7.1f}MB {stats['peak_rss_mb']:7.0f}MB "
+                  f"{stats['load_s']:6.2f}s {stats['render_s']:6.2f}s")
+
+    if report["default"]["text_chars"] != report["compact"]["text_chars"]:
+        print("⚠️ Rendered text differs between modes")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "frame_memory.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Load test: simulated farmers against the Gradio chat handler.
+
+Replays a query mix generated from the bundled datasets (commodity/state price questions,
+rainfall comparisons, temperature lookups, scheme questions and follow-ups in the same
+session) against app.chat_handler, with Gemini replaced by a fake LLM of configurable
+latency. Gradio runs an event on at most `concurrency_limit` worker threads (1 unless
+configured) and queues the rest, so the harness does the same: N closed-loop users submit
+to a pool of --workers threads, wait for the answer, think, and ask again.
+
+For every step of the ramp it reports throughput, error rate, end-to-end latency
+percentiles (queue wait included), the queue wait alone, queue depth, and the slowest
+pipeline stages from the tracer.
+
+    python -m benchmarks.bench_load --users 1 2 4 8 16 --workers 1 4 --llm-latency 1.5
+    python -m benchmarks.bench_load --mix price=1 rainfall=1 scheme=0
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pandas as pd
+
+from benchmarks.bench_agents import BASE_DIR, RESULTS_DIR, _percentiles
+
+MIX = {"price": 30, "market": 10, "rainfall": 20, "temperature": 10, "scheme": 10, "follow_up": 20}
+STAGES = ["climate_lookup", "facts", "route", "fan_out", "get_agent", "retrieve_context", "generate_content"]
+SEASONS = ["monsoon", "winter", "pre-monsoon", "post-monsoon", "annual"]
+MONTHS = ["January", "March", "May", "July", "August", "October", "December"]
+
+
+# ============================================================
+# 1️⃣ Query mix from the bundled datasets
+# ============================================================
+class QueryMix:
+    """Draws (kind, question) pairs; follow-ups refer to the user's previous question"""
+
+    def __init__(self, weights, seed=0):
+        from utils import fact_table
+
+        mandi = pd.read_csv(os.path.join(BASE_DIR, fact_table.MANDI_CSV), usecols=["State", "Market", "Commodity"])
+        rain = pd.read_csv(os.path.join(BASE_DIR, fact_table.SUBDIVISION_CSV), usecols=["SUBDIVISION", "YEAR"])
+        # Common combinations are asked about more often, as in the feed itself
+        self.combos = list(mandi.groupby(["Commodity", "State"]).size().sort_values(ascending=False).index[:300])
+        self.markets = list(mandi.drop_duplicates(["Commodity", "Market"]).itertuples(index=False, name=None))
+        self.states = sorted(mandi["State"].unique())
+        self.subdivisions = sorted(rain["SUBDIVISION"].unique())
+        self.years = (int(rain["YEAR"].min()), int(rain["YEAR"].max()))
+        self.kinds = [kind for kind, weight in weights.items() if weight > 0]
+        self.weights = [weights[kind] for kind in self.kinds]
+        self.seed = seed
+
+    def user(self, user_id):
+        """Per-user generator with its own random stream and previous-question memory"""
+        rng = random.Random(self.seed * 1000 + user_id)
+        previous = None
+        while True:
+            kind = rng.choices(self.kinds, self.weights)[0]
+            if kind == "follow_up" and previous is None:
+                kind = "price"
+            question = getattr(self, f"_{kind}")(rng, previous)
+            previous = kind if kind != "follow_up" else previous
+            yield kind, question
+
+    def _price(self, rng, previous):
+        commodity, state = rng.choice(self.combos[:60] if rng.random() < 0.7 else self.combos)
+        return rng.choice([
+            f"What is the modal price of {commodity} in {state}?",
+            f"{commodity} prices in {state} mandis today",
+            f"Cheapest {commodity} market in {state}",
+        ])
+
+    def _market(self, rng, previous):
+        commodity, _, market = rng.choice(self.markets)
+        return f"Price of {commodity} at {market} market"
+
+    def _rainfall(self, rng, previous):
+        a, b = rng.sample(self.subdivisions, 2)
+        year = rng.randint(*self.years)
+        return rng.choice([
+            f"Compare rainfall in {a} and {b}",
+            f"How much rainfall did {a} get in the {rng.choice(SEASONS)} of {year}?",
+            f"Was {year} a drought year in {a}?",
+        ])
+
+    def _temperature(self, rng, previous):
+        year = rng.randint(*self.years)
+        return rng.choice([f"Mean temperature in {rng.choice(MONTHS)} {year}", f"How hot was {year}?"])
+
+    def _scheme(self, rng, previous):
+        state = rng.choice(self.states)
+        return rng.choice([
+            f"How many PM-KISAN beneficiaries are in {state}?",
+            f"List farmer schemes in {state}",
+            "Total amount transferred under PM-KISAN",
+        ])
+
+    def _follow_up(self, rng, previous):
+        if previous in ("rainfall", "temperature"):
+            return rng.choice([f"And in {rng.randint(*self.years)}?", f"What about {rng.choice(self.subdivisions)}?"])
+        return rng.choice([f"What about {rng.choice(self.states)}?", "And the minimum price?", "How about onion?"])
+
+
+# ============================================================
+# 2️⃣ One ramp step: N users → Gradio-like worker pool
+# ============================================================
+class QueueGauge:
+    """Requests submitted but not yet started, sampled in the background"""
+
+    def __init__(self, every=0.05):
+        self.waiting = 0
+        self.samples = []
+        self.every = every
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def add(self, count):
+        with self._lock:
+            self.waiting += count
+
+    def _sample(self):
+        while not self._stop.wait(self.every):
+            self.samples.append(self.waiting)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_step(chat_handler, mix, users, workers, duration, think_time, agent_choice):
+    from utils.tracing import tracer
+
+    tracer.spans.clear()
+    records, lock = [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gradio-worker")
+
+    def handle(question, request, submitted, gauge):
+        gauge.add(-1)
+        started = time.perf_counter()
+        try:
+            history, _ = chat_handler(question, agent_choice, None, [], request)
+            answer, error = history[-1][1], None
+            if answer.startswith("❌"):
+                error = answer[:120]
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[:120]
+        return submitted, started, time.perf_counter(), error
+
+    def farmer(user_id, gauge):
+        # A Gradio session per simulated farmer, so follow-ups hit the conversation memory
+        request = SimpleNamespace(session_hash=f"load-{users}-{user_id}")
+        rng = random.Random(user_id)
+        for kind, question in mix.user(user_id):
+            if time.perf_counter() >= deadline:
+                return
+            gauge.add(1)
+            submitted = time.perf_counter()
+            result = pool.submit(handle, question, request, submitted, gauge).result()
+            with lock:
+                records.append((kind, *result))
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+
+    start = time.perf_counter()
+    with QueueGauge() as gauge:
+        threads = [threading.Thread(target=farmer, args=(i, gauge)) for i in range(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+
+    latency = [(end - submitted) * 1000 for _, submitted, _, end, _ in records]
+    wait = [(started - submitted) * 1000 for _, submitted, started, _, _ in records]
+    service = [(end - started) * 1000 for _, _, started, end, _ in records]
+    errors = [(kind, error) for kind, *_, error in records if error]
+    stages = {
+        f"{stage}[{agent}]" if agent else stage: stats["p95"]
+        for (stage, agent), stats in sorted(tracer.summary().items(), key=lambda kv: STAGES.index(kv[0][0]) if kv[0][0] in STAGES else 0)
+        if stage in STAGES
+    }
+    return {
+        "users": users,
+        "workers": workers,
+        "requests": len(records),
+        "throughput_qps": len(records) / elapsed,
+        "error_rate": len(errors) / len(records) if records else 0.0,
+        "errors": sorted({f"{kind}: {error}" for kind, error in errors})[:5],
+        "latency_ms": _percentiles(latency) if latency else None,
+        "queue_wait_ms": _percentiles(wait) if wait else None,
+        "service_ms": _percentiles(service) if service else None,
+        "queue_depth": {
+            "mean": sum(gauge.samples) / len(gauge.samples) if gauge.samples else 0.0,
+            "max": max(gauge.samples, default=0),
+        },
+        "stage_p95_ms": stages,
+    }
+
+
+# ============================================================
+# 3️⃣ Driver
+# ============================================================
+def _parse_mix(pairs):
+    weights = dict(MIX)
+    for pair in pairs or []:
+        kind, _, weight = pair.partition("=")
+        if kind not in MIX:
+            raise SystemExit(f"Unknown query kind {kind!r}; choose from {', '.join(MIX)}")
+        weights[kind] = float(weight)
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-user load test of the chat pipeline")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1],
+                        help="handler threads, like Gradio's concurrency_limit (default 1)")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per ramp step")
+    parser.add_argument("--think-time", type=float, default=2.0, help="mean seconds between a user's questions")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="fake Gemini latency in seconds")
+    parser.add_argument("--agent", default="Auto Detect")
+    parser.add_argument("--mix", nargs="*", help="query kind weights, e.g. price=50 scheme=0")
+    parser.add_argument("--slo-ms", type=float, default=10000, help="p95 latency target for the capacity estimate")
+    parser.add_argument("--model-path", help="local sentence-transformers directory (default: HashingEmbeddings)")
+    args = parser.parse_args()
+
+    from benchmarks.fakes import install_embeddings, install_fake_llm
+
+    install_fake_llm(latency=args.llm_latency)
+    embeddings = install_embeddings(args.model_path)
+    mix = QueryMix(_parse_mix(args.mix))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Indexes and the price history go to a scratch directory, not data/
+        from utils import index_store, price_history
+        index_store.INDEX_ROOT = os.path.join(tmp, "indexes")
+        price_history.history_root = lambda: os.path.join(tmp, "mandi_history")
+
+        from app import chat_handler
+
+        # Warm-up: build every agent the mix reaches before anything is timed
+        print("🔥 Warming up agents...", flush=True)
+        warm = mix.user(-1)
+        for _ in range(20):
+            try:
+                chat_handler(next(warm)[1], args.agent, None, [], SimpleNamespace(session_hash="warm-up"))
+            except Exception:
+                pass
+
+        report = {
+            "llm_latency_s": args.llm_latency,
+            "think_time_s": args.think_time,
+            "duration_s": args.duration,
+            "agent": args.agent,
+            "mix": _parse_mix(args.mix),
+            "embedding_model": getattr(embeddings, "model_name", type(embeddings).__name__),
+            "cpus": os.cpu_count(),
+            "steps": [],
+        }
+        print(f"\n{'users':>5} {'workers':>7} {'reqs':>6} {'qps':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'wait p95':>9} {'queue':>9}")
+        for workers in args.workers:
+            for users in args.users:
+                step = run_step(chat_handler, mix, users, workers, args.duration, args.think_time, args.agent)
+                report["steps"].append(step)
+                lat, wait = step["latency_ms"] or {}, step["queue_wait_ms"] or {}
+                print(f"{users:>5} {workers:>7} {step['requests']:>6} {step['throughput_qps']:6.2f} "
+                      f"{step['error_rate'] * 100:5.1f}% {lat.get('p50', 0):7.0f}ms {lat.get('p95', 0):7.0f}ms "
+                      f"{lat.get('p99', 0):7.0f}ms {wait.get('p95', 0):8.0f}ms "
+                      f"{step['queue_depth']['mean']:4.1f}/{step['queue_depth']['max']:<4}", flush=True)
+
+    print("\nCapacity at p95 ≤ {:.0f} ms and < 1% errors:".format(args.slo_ms))
+    for workers in args.workers:
+        steps = [s for s in report["steps"] if s["workers"] == workers and s["latency_ms"]]
+        within = [s["users"] for s in steps if s["latency_ms"]["p95"] <= args.slo_ms and s["error_rate"] < 0.01]
+        report.setdefault("capacity_users", {})[str(workers)] = max(within, default=0)
+        print(f"  {workers} worker(s): {max(within, default=0)} concurrent users (of {[s['users'] for s in steps]} tried)")
+        if steps:
+            # Where the time goes at the heaviest load tried
+            stages = ", ".join(f"{name} {ms:.0f}" for name, ms in steps[-1]["stage_p95_ms"].items())
+            print(f"    stage p95 (ms) at {steps[-1]['users']} users: {stages}")
+    for step in report["steps"]:
+        if step["errors"]:
+            print(f"  ⚠️ {step['users']} users / {step['workers']} workers: {step['errors'][0]}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "load_test.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
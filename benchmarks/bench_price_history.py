@@ -0,0 +1,95 @@
+"""
+Mandi price history store: ingest cost, size on disk and scan latency.
+
+Synthesises --days daily snapshots from the bundled one-day feed (prices jittered per
+day), ingests them into a temporary store, and compares its size with keeping every day
+as CSV. Then times range scans and the rolling 7-day modal price used by retrieval.
+
+    python -m benchmarks.bench_price_history --days 90
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_agents import RESULTS_DIR
+from benchmarks.bench_frame_memory import MANDI_CSV
+
+
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def _timed_ms(fn, runs=5):
+    fn()  # warm the page cache / imports
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    return (time.perf_counter() - start) / runs * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitioned Parquet price history benchmark")
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    from utils import price_history
+
+    day = pd.read_csv(MANDI_CSV)
+    last = pd.to_datetime(day["Arrival_Date"], format="%d/%m/%Y").max()
+    rng = np.random.default_rng(0)
+
+    report = {"days": args.days, "rows_per_day": len(day)}
+    with tempfile.TemporaryDirectory() as tmp:
+        root, csv_bytes, ingest_s = os.path.join(tmp, "history"), 0, 0.0
+        for d in range(args.days):
+            snapshot = day.copy()
+            snapshot["Arrival_Date"] = (last - pd.Timedelta(days=d)).strftime("%d/%m/%Y")
+            snapshot["Modal_x0020_Price"] = (snapshot["Modal_x0020_Price"] * rng.uniform(0.9, 1.1, len(day))).astype(int)
+            path = os.path.join(tmp, f"snapshot-{d}.csv")
+            snapshot.to_csv(path, index=False)
+            csv_bytes += os.path.getsize(path)
+
+            start = time.perf_counter()
+            price_history.ingest_snapshot(path, root=root)
+            ingest_s += time.perf_counter() - start
+            os.remove(path)
+
+        report["csv_mb"] = csv_bytes / 1e6
+        report["store_mb"] = _dir_bytes(root) / 1e6
+        report["ingest_ms_per_day"] = ingest_s / args.days * 1000
+
+        end, week = last, last - pd.Timedelta(days=6)
+        scans = {
+            "7 days, one state": lambda: price_history.scan(week, end, states=["Maharashtra"], root=root),
+            "7 days, all states": lambda: price_history.scan(week, end, root=root),
+            "all days, all states": lambda: price_history.scan(root=root),
+            "rolling 7d onion, one state": lambda: price_history.rolling_modal_price(
+                commodity="Onion", state="Maharashtra", root=root),
+            "rolling 7d onion, all states": lambda: price_history.rolling_modal_price(commodity="Onion", root=root),
+            "trend_context": lambda: price_history.trend_context("onion price in Maharashtra", root=root),
+        }
+        report["scans"] = {}
+        for name, fn in scans.items():
+            ms, result = _timed_ms(fn)
+            report["scans"][name] = {"ms": ms, "rows": len(result) if hasattr(result, "__len__") else None}
+
+    print(f"\n{args.days} days × {len(day)} rows: CSV {report['csv_mb']:.1f} MB, "
+          f"store {report['store_mb']:.1f} MB, ingest {report['ingest_ms_per_day']:.0f} ms/day\n")
+    print(f"{'scan':<30} {'ms':>8} {'rows':>8}")
+    for name, stats in report["scans"].items():
+        print(f"{name:<30} {stats['ms']:8.1f} {stats['rows'] if stats['rows'] is not None else '':>8}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "price_history.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Memory, encode throughput and recall of quantized vectors and a quantized encoder.
+
+- Vectors: the agriculture + climate chunks are embedded once; the float32 flat index is
+  the baseline, float16 and int8 scalar-quantized copies are compared on index size,
+  search latency and recall@k of their top-k against the float32 top-k.
+- Encoder: the same chunks are encoded by the float32 model and by the dynamic int8 model;
+  reports docs/s, single-query latency, and recall@k of int8-encoded queries searched
+  against the int8-encoded corpus, against the float32 results.
+
+Uses a local sentence-transformers directory when given, otherwise a randomly initialised
+encoder with the MiniLM-L6 shape (realistic speed, but recall numbers are only meaningful
+with the real weights).
+
+    python -m benchmarks.bench_quantization --model-path ./models/all-MiniLM-L6-v2
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from agents.registry import AGENT_REGISTRY
+from benchmarks.bench_agents import AGENTS, BASE_DIR, QUERIES, RESULTS_DIR
+from benchmarks.bench_batching import _load_model
+
+
+def _chunks(limit):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from utils.data_loader import load_data
+
+    chunks = []
+    for key in ("agriculture", "climate"):
+        df = load_data(os.path.join(BASE_DIR, AGENT_REGISTRY[AGENTS[key]]["default_path"]))
+        text = " ".join(df.astype(str).apply(lambda x: " | ".join(x), axis=1).tolist())
+        chunks += RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_text(text)
+    return chunks[:limit]
+
+
+def _queries(chunks, count):
+    """The benchmark's hand-written queries plus snippets of random chunks"""
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(chunks), size=min(count, len(chunks)), replace=False)
+    return [q for qs in QUERIES.values() for q in qs] + [chunks[i][:120] for i in picks]
+
+
+def _encode(model, texts, batch_size=32):
+    start = time.perf_counter()
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors += model.embed_documents(texts[i:i + batch_size])
+    return np.asarray(vectors, dtype=np.float32), time.perf_counter() - start
+
+
+def _query_latency_ms(model, queries, runs=50):
+    start = time.perf_counter()
+    for i in range(runs):
+        model.embed_query(queries[i % len(queries)])
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def _recall(results, baseline):
+    k = baseline.shape[1]
+    return float(np.mean([len(set(r) & set(b)) / k for r, b in zip(results, baseline)]))
+
+
+def _search(index, queries, k):
+    start = time.perf_counter()
+    _, ids = index.search(queries, k)
+    return ids, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized vectors / encoder benchmark")
+    parser.add_argument("--model-path", help="local sentence-transformers directory (default: MiniLM-shaped random encoder)")
+    parser.add_argument("--chunks", type=int, default=2000, help="max corpus chunks")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    import faiss
+    import torch
+    from utils.embeddings import quantize_encoder
+    from utils.index_store import quantize_index
+
+    torch.manual_seed(0)
+    chunks = _chunks(args.chunks)
+    queries = _queries(chunks, args.queries)
+    print(f"corpus: {len(chunks)} chunks, {len(queries)} queries, recall@{args.k} vs float32\n")
+
+    # ---------------- Encoder: float32 vs dynamic int8 ----------------
+    model = _load_model(args.model_path)
+    model_int8 = quantize_encoder(_load_model(args.model_path))  # same weights (fixed seed)
+    _encode(model, chunks[:32])
+    _encode(model_int8, chunks[:32])
+
+    corpus_f32, seconds_f32 = _encode(model, chunks)
+    corpus_i8, seconds_i8 = _encode(model_int8, chunks)
+    queries_f32, _ = _encode(model, queries)
+    queries_i8, _ = _encode(model_int8, queries)
+
+    def param_bytes(embeddings):
+        module = getattr(embeddings, "_client", None) or getattr(embeddings, "model")
+        state = module.state_dict()
+        return sum(v.numel() * v.element_size() for v in state.values() if torch.is_tensor(v)) + sum(
+            p.numel() * p.element_size()
+            for v in state.values() if isinstance(v, tuple) for p in v if torch.is_tensor(p)
+        )
+
+    def flat(vectors):
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        index.add(vectors)
+        return index
+
+    baseline_ids, _ = _search(flat(corpus_f32), queries_f32, args.k)
+    encoder_ids, _ = _search(flat(corpus_i8), queries_i8, args.k)
+
+    report = {"chunks": len(chunks), "queries": len(queries), "k": args.k, "encoder": {}, "vectors": {}}
+    report["encoder"] = {
+        "float32": {
+            "docs_per_s": len(chunks) / seconds_f32,
+            "query_ms": _query_latency_ms(model, queries),
+            "weights_mb": param_bytes(model) / 1e6,
+            "recall": 1.0,
+        },
+        "int8": {
+            "docs_per_s": len(chunks) / seconds_i8,
+            "query_ms": _query_latency_ms(model_int8, queries),
+            "weights_mb": param_bytes(model_int8) / 1e6,
+            "recall": _recall(encoder_ids, baseline_ids),
+        },
+    }
+
+    print(f"{'encoder':<8} {'docs/s':>8} {'query ms':>9} {'weights':>9} {'recall':>7}")
+    for name, stats in report["encoder"].items():
+        print(f"{name:<8} {stats['docs_per_s']:8.1f} {stats['query_ms']:9.2f} "
+              f"{stats['weights_mb']:7.1f}MB {stats['recall']:7.3f}")
+
+    # ---------------- Vectors: float32 vs float16 vs int8 ----------------
+    print(f"\n{'vectors':<8} {'index':>9} {'bytes/vec':>10} {'search ms':>10} {'recall':>7}")
+    base_index = flat(corpus_f32)
+    for dtype in ("float32", "float16", "int8"):
+        index = quantize_index(base_index, dtype)
+        ids, search_ms = _search(index, queries_f32, args.k)
+        size = faiss.serialize_index(index).nbytes
+        report["vectors"][dtype] = {
+            "index_bytes": int(size),
+            "bytes_per_vector": size / index.ntotal,
+            "search_ms": search_ms,
+            "recall": _recall(ids, baseline_ids),
+        }
+        print(f"{dtype:<8} {size / 1e6:7.2f}MB {size / index.ntotal:10.0f} {search_ms:10.3f} "
+              f"{report['vectors'][dtype]['recall']:7.3f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "quantization.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Templated row documents vs join-and-split chunks: build time and retrieval recall.
+
+For the climate temperature table, the subdivision rainfall table and the mandi feed,
+builds an index both ways (the old `", ".join(row)` text split into 1000-char chunks,
+and utils.table_text's one labelled document per row / row-group) and asks generated
+questions whose answer is one known row ("mean temperature in March 1950", "rainfall in
+Kerala in 1987", "modal price of Onion at Lasalgaon market"). A hit means the retrieved
+top-k contains that row's full text. A few large chunks cover more rows than the same
+number of row documents, so the context size of the top-k and the recall a random pick of
+that much text would get ("chance") are reported alongside.
+
+Uses HashingEmbeddings unless a local sentence-transformers directory is given; the
+hashing model only matches tokens, so it shows whether the row can be found from the
+words in the question at all, not how well a semantic model ranks it.
+
+    python -m benchmarks.bench_table_text --model-path ./models/all-MiniLM-L6-v2
+"""
+import argparse
+import calendar
+import json
+import os
+import time
+
+import numpy as np
+
+from benchmarks.bench_agents import BASE_DIR, RESULTS_DIR
+
+DATASETS = {
+    "mean_temperature": ("data/Mean_Temp_IMD_2017.csv", 1000, 150, ", "),
+    "subdivision_rainfall": ("data/Sub_Division_IMD_2017.csv", 1000, 150, ", "),
+    "mandi": ("data/Current Daily Price of Various Commodities from Various Markets (Mandi).csv", 1000, 100, " | "),
+}
+
+
+def _questions(name, df, count, rng):
+    """[(question, row position)] for rows picked at random"""
+    rows = rng.choice(len(df), size=min(count, len(df)), replace=False)
+    questions = []
+    for i in rows:
+        row = df.iloc[i]
+        if name == "mean_temperature":
+            month = calendar.month_name[int(rng.integers(1, 13))]
+            questions.append((f"What was the mean temperature in {month} {row['YEAR']}?", i))
+        elif name == "subdivision_rainfall":
+            questions.append((f"How much rainfall did {row['SUBDIVISION']} get in {row['YEAR']}?", i))
+        else:
+            questions.append((f"What is the modal price of {row['Commodity']} at {row['Market']} market?", i))
+    return questions
+
+
+def _joined(df, sep, chunk_size, overlap):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    rows = [sep.join(map(str, values)) for values in df.itertuples(index=False, name=None)]
+    joiner = "\n" if sep == ", " else " "  # climate joined rows by line, agriculture by space
+    chunks = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=overlap).split_text(joiner.join(rows))
+    return chunks, rows
+
+
+def _templated(df):
+    from utils import table_text
+
+    docs = [doc.page_content for doc in table_text.render_documents(df)]
+    _, group_texts = table_text.render_rows(df)
+    template = table_text.find_template(df.columns)
+    if template and template.get("group_by"):
+        # A row's identity is its own line inside its group document
+        rows = ["- " + template["row"].format_map(record) for record in table_text._records(df)]
+    else:
+        rows = group_texts
+    return docs, rows
+
+
+def _evaluate(texts, row_texts, questions, model, k, batch_size):
+    from utils.parallel_embed import build_index
+
+    start = time.perf_counter()
+    index = build_index(texts, model, progress=False, batch_size=batch_size, workers=1)
+    build_s = time.perf_counter() - start
+
+    vectors = np.asarray(model.embed_documents([q for q, _ in questions]), dtype=np.float32)
+    _, ids = index.search(vectors, k)
+    hits = sum(any(row_texts[row] in texts[j] for j in found if j >= 0) for (_, row), found in zip(questions, ids))
+    context_chars = float(np.mean([sum(len(texts[j]) for j in found if j >= 0) for found in ids]))
+    return {
+        "docs": len(texts),
+        "build_s": build_s,
+        "recall": hits / len(questions),
+        "context_chars": context_chars,
+        # Recall of a retriever returning the same amount of text at random
+        "chance": min(1.0, context_chars / sum(len(text) for text in texts)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row templates vs join-and-split chunks")
+    parser.add_argument("--model-path", help="local sentence-transformers directory (default: HashingEmbeddings)")
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    from benchmarks.fakes import HashingEmbeddings
+    from utils.data_loader import load_data
+    from utils.table_text import embed_batch_size
+
+    if args.model_path:
+        from benchmarks.bench_batching import _load_model
+        model = _load_model(args.model_path)
+    else:
+        model = HashingEmbeddings()
+
+    report = {"k": args.k, "model": getattr(model, "model_name", type(model).__name__), "datasets": {}}
+    print(f"{'dataset':<22} {'mode':<10} {'docs':>6} {'render':>8} {'build':>8} {'recall@' + str(args.k):>9} {'chance':>7} {'ctx chars':>10}")
+    for name, (rel_path, chunk_size, overlap, sep) in DATASETS.items():
+        df = load_data(os.path.join(BASE_DIR, rel_path))
+        questions = _questions(name, df, args.questions, np.random.default_rng(0))
+        results = report["datasets"][name] = {}
+        for mode in ("joined", "templated"):
+            start = time.perf_counter()
+            texts, row_texts = _joined(df, sep, chunk_size, overlap) if mode == "joined" else _templated(df)
+            render_s = time.perf_counter() - start
+            batch_size = 64 if mode == "joined" else embed_batch_size()
+            stats = results[mode] = {"render_s": render_s, **_evaluate(texts, row_texts, questions, model, args.k, batch_size)}
+            print(f"{name:<22} {mode:<10} {stats['docs']:>6} {render_s:7.2f}s {stats['build_s']:7.2f}s {stats['recall']:9.2f} {stats['chance']:7.2f} {stats['context_chars']:10.0f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "table_text.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Memory footprint of N worker processes serving the same on-disk index.
+
+Builds a synthetic index in the shared format (utils/index_store.py), then starts N
+workers that each open it and run searches, once with the vectors memory-mapped and once
+copied onto each worker's heap. Reports the workers' combined PSS (proportional set size:
+shared pages are split between the processes that map them), i.e. the physical memory
+the index costs the machine.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 --vectors 200000
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+
+import numpy as np
+import psutil
+
+from benchmarks.bench_agents import RESULTS_DIR
+
+
+def _build(path, vectors, dim):
+    import faiss
+    from utils.index_store import save_index
+
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(dim)
+    for start in range(0, vectors, 50000):
+        index.add(rng.random((min(50000, vectors - start), dim), dtype=np.float32))
+    texts = [f"chunk {i} | synthetic mandi record {i % 977} | modal price {i % 5000}" for i in range(vectors)]
+    save_index(path, index, texts)
+
+
+def _worker(path, mmap_vectors, ready, done):
+    from benchmarks.fakes import HashingEmbeddings
+    from utils.index_store import load_index
+
+    embeddings = HashingEmbeddings()
+    store = load_index(path, embeddings, mmap_vectors=mmap_vectors)
+    rng = np.random.default_rng(os.getpid())
+    for _ in range(5):  # full scans touch every vector page
+        store.similarity_search_by_vector(rng.random(store.index.d).tolist(), k=4)
+    ready.put(os.getpid())
+    done.wait()
+
+
+def measure(path, workers, mmap_vectors):
+    ctx = mp.get_context("spawn")
+    ready, done = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=_worker, args=(path, mmap_vectors, ready, done)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    pids = [ready.get(timeout=300) for _ in procs]
+
+    pss = uss = 0
+    for pid in pids:
+        info = psutil.Process(pid).memory_full_info()
+        pss += info.pss
+        uss += info.uss
+
+    done.set()
+    for p in procs:
+        p.join()
+    return {"pss_mb": pss / 1e6, "uss_mb": uss / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-index memory benchmark")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        sys.exit("PSS is only reported on Linux")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic")
+        _build(path, args.vectors, args.dim)
+        print(f"index: {args.vectors} x {args.dim} float32 = {args.vectors * args.dim * 4 / 1e6:.0f}MB of vectors")
+        print(f"{'workers':>7}  {'heap copy PSS':>14}  {'mmap PSS':>9}")
+        report = {}
+        for workers in args.workers:
+            copied = measure(path, workers, mmap_vectors=False)
+            mapped = measure(path, workers, mmap_vectors=True)
+            report[workers] = {"copy": copied, "mmap": mapped}
+            print(f"{workers:>7}  {copied['pss_mb']:12.0f}MB  {mapped['pss_mb']:7.0f}MB")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, "workers.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"vectors": args.vectors, "dim": args.dim, "workers": report}, f, indent=2)
+    print(f"✅ Results written to {os.path.relpath(out_path)}")
+
+
+if __name__ == "__main__":
+    main()
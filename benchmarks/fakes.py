@@ -0,0 +1,132 @@
+"""
+Offline stand-ins for the network-bound pieces, used by the benchmark scripts.
+
+- FakeGenerativeModel replaces google.generativeai.GenerativeModel (configurable latency)
+- HashingEmbeddings is a deterministic bag-of-words embedding with the MiniLM dimension,
+  for machines without the pinned sentence-transformers weights
+- MiniLMShapedEmbeddings runs a randomly initialised encoder with the MiniLM-L6 shape, so
+  compute-bound measurements (batching, threads) are realistic without the real weights
+"""
+import hashlib
+import os
+import re
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Echoes the prompt size after sleeping `latency` seconds, like a remote LLM call"""
+
+    latency = 0.0
+
+    def __init__(self, model_name=None, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return _FakeResponse(f"[fake answer from {self.model_name}: {len(str(prompt))} prompt chars]")
+
+
+def install_fake_llm(latency=0.0):
+    """Patch google.generativeai so every GenerativeModel is a FakeGenerativeModel"""
+    import google.generativeai as genai
+
+    FakeGenerativeModel.latency = latency
+    genai.GenerativeModel = FakeGenerativeModel
+    genai.configure = lambda *args, **kwargs: None
+    return FakeGenerativeModel
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic token-hashing embeddings (no model weights, no network)"""
+
+    model_name = "hashing-384"
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class MiniLMShapedEmbeddings(Embeddings):
+    """6-layer / 384-dim BERT encoder with random weights and hashed token ids"""
+
+    model_name = "minilm-shaped-random"
+
+    def __init__(self, max_length=64, seed=0):
+        import torch
+        from transformers import BertConfig, BertModel
+
+        torch.manual_seed(seed)
+        config = BertConfig(
+            vocab_size=30522, hidden_size=384, num_hidden_layers=6,
+            num_attention_heads=12, intermediate_size=1536,
+        )
+        self.torch = torch
+        self.model = BertModel(config).eval()
+        self.vocab_size = config.vocab_size
+        self.max_length = max_length
+        self.seed = seed
+
+    def __reduce__(self):
+        # Rebuilt from the seed in worker processes: same weights, no tensor pickling
+        return (MiniLMShapedEmbeddings, (self.max_length, self.seed))
+
+    def _token_ids(self, text):
+        ids = [101]
+        for token in re.findall(r"\w+|[^\w\s]", text.lower())[: self.max_length - 2]:
+            ids.append(1000 + int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16) % (self.vocab_size - 1000))
+        return ids + [102]
+
+    def embed_documents(self, texts):
+        torch = self.torch
+        batch = [self._token_ids(text) for text in texts]
+        width = max(len(ids) for ids in batch)
+        input_ids = torch.tensor([ids + [0] * (width - len(ids)) for ids in batch])
+        mask = (input_ids != 0).long()
+        with torch.inference_mode():
+            hidden = self.model(input_ids=input_ids, attention_mask=mask).last_hidden_state
+        pooled = (hidden * mask.unsqueeze(-1)).sum(1) / mask.sum(1, keepdim=True)
+        return torch.nn.functional.normalize(pooled, dim=1).tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def install_embeddings(model_path=None):
+    """
+    Pin the shared embedding model: a local sentence-transformers directory if given
+    (loaded with the HuggingFace hub in offline mode), otherwise HashingEmbeddings.
+    """
+    from utils.embeddings import set_embeddings
+
+    if model_path:
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+        from langchain_huggingface import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(model_name=model_path)
+    else:
+        embeddings = HashingEmbeddings()
+    set_embeddings(embeddings)
+    return embeddings
@@ -0,0 +1,124 @@
+"""
+Import-time budget check for the front ends.
+
+Imports each target in a fresh interpreter, times it, and fails (exit code 1) if it takes
+longer than the budget or drags in any of the heavy libraries that should only load when
+an agent is first built. The UI framework (gradio / streamlit) is imported before the clock
+starts, so the budget covers our own startup cost only. "Saved" is the extra time the same
+import costs when those heavy libraries are imported eagerly, as the front ends used to do.
+
+    python -m benchmarks.import_budget --budget 3.0
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY_MODULES = [
+    "langchain_openai",
+    "langchain_classic",
+    "langchain_google_genai",
+    "langchain_community.vectorstores",
+    "langchain_huggingface",
+    "sentence_transformers",
+    "torch",
+    "faiss",
+    "google.generativeai",
+    "pandas",
+]
+
+# name → (UI framework imported before timing, modules to time)
+TARGETS = {
+    # Shared modules both front ends import at startup
+    "core": ([], [
+        "agents.registry", "utils.app_core", "utils.gemini_client", "utils.multi_agent",
+        "utils.query_router", "utils.fact_table", "utils.tracing",
+    ]),
+    "app": (["gradio"], ["app"]),
+    "streamlit_app": (["streamlit"], ["streamlit_app"]),
+}
+
+_PROBE = """
+import importlib, json, sys, time
+pre, targets, heavy = {pre!r}, {targets!r}, {heavy!r}
+for name in pre:
+    importlib.import_module(name)
+already = set(m for m in heavy if m in sys.modules)
+start = time.perf_counter()
+for name in targets:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in heavy if m in sys.modules and m not in already]}}))
+"""
+
+
+def _probe(targets, pre=(), runs=3):
+    """Best-of-N import time of `targets` in a fresh interpreter, after importing `pre`"""
+    best = None
+    for _ in range(runs):
+        code = _PROBE.format(pre=list(pre), targets=targets, heavy=HEAVY_MODULES)
+        proc = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def _eager_seconds(targets, pre=(), runs=3):
+    """Time to import the heavy libraries plus the targets, as the old top-level imports did"""
+    code = (
+        "import importlib, time\n"
+        f"for name in {list(pre)!r}:\n"
+        "    importlib.import_module(name)\n"
+        "start = time.perf_counter()\n"
+        f"for name in {HEAVY_MODULES!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except Exception:\n"
+        "        pass\n"
+        f"for name in {targets!r}:\n"
+        "    importlib.import_module(name)\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    times = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None
+        times.append(float(proc.stdout.strip().splitlines()[-1]))
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Front-end import-time budget check")
+    parser.add_argument("--budget", type=float, default=3.0, help="max seconds per target")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.targets:
+        framework, modules = TARGETS[name]
+        lazy = _probe(modules, pre=framework)
+        if "error" in lazy:
+            print(f"⚠️  {name:<14} skipped ({lazy['error']})")
+            continue
+
+        eager = _eager_seconds(modules, pre=framework)
+        saved = f"{eager - lazy['seconds']:.2f}s saved" if eager is not None else "saved: n/a"
+        over_budget = lazy["seconds"] > args.budget
+        status = "❌" if over_budget or lazy["loaded"] else "✅"
+        print(f"{status} {name:<14} {lazy['seconds']:.2f}s (budget {args.budget:.1f}s, {saved})")
+        if lazy["loaded"]:
+            print(f"   heavy modules imported at startup: {', '.join(lazy['loaded'])}")
+        failed = failed or over_budget or bool(lazy["loaded"])
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
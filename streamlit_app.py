@@ -1,38 +1,29 @@
+import uuid
+
 import streamlit as st
-import yaml
-import google.generativeai as genai
-import os
 
-from agents.climate_agent import build_climate_agent
-from agents.agriculture_agent import build_agriculture_agent
-from agents.scheme_agent import build_scheme_agent
-from agents.kcc_agent import build_kcc_agent
-from utils.api_fetcher import fetch_data_gov_api
+from agents.registry import AGENT_REGISTRY
+
+# Config, clients and built agents live in the shared core: it is imported once per
+# server process, so a rerun of this script only re-renders the page.
+from utils.app_core import answer_query, get_settings, save_upload, start_index_watcher, submit_upload
+from utils.conversation import get_conversation_store
+from utils.tracing import trace_request, agent_label
+from utils.upload_governor import UploadRejected
 
 
 # ----------------------------------
 # 1️⃣ Load Configurations
 # ----------------------------------
-def load_config():
-    config_path = os.path.join(os.path.dirname(__file__), "config.yaml")
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f)
-
-config = load_config()
-
-# Read keys and parameters
-DATA_GOV_API_KEY = config["data_gov"]["api_key"]
-LLM_PROVIDER = config.get("llm_provider", "gemini")
-GEMINI_API_KEY = config.get("google_api_key")
-EMBEDDING_MODEL = config.get("embedding_model", "models/embedding-001")
-EMBEDDING_PROVIDER = config.get("embedding_provider", "huggingface")
-CHAT_MODEL = config.get("chat_model", "models/gemini-pro-latest")
-
-# ✅ Configure Gemini API
-if LLM_PROVIDER.lower() == "gemini" and GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    st.sidebar.success(f"✅ Gemini Configured ({CHAT_MODEL})")
-    st.sidebar.info(f"📊 Embeddings: {EMBEDDING_PROVIDER.upper()}")
+settings = get_settings()
+start_index_watcher()  # no-op after the first run in this server process
+
+st.set_page_config(page_title="🌾 Project Samarth", layout="wide")
+
+# ✅ Check Gemini settings (the SDK itself is imported and configured on the first answer)
+if settings.gemini_ready:
+    st.sidebar.success(f"✅ Gemini Configured ({settings.chat_model})")
+    st.sidebar.info(f"📊 Embeddings: {settings.embedding_provider.upper()}")
 else:
     st.sidebar.error("❌ Gemini API key missing or provider not set to 'gemini'.")
 
@@ -40,8 +31,6 @@ else:
 # ----------------------------------
 # 2️⃣ Streamlit UI Setup
 # ----------------------------------
-st.set_page_config(page_title="🌾 Project Samarth", layout="wide")
-
 # Center align the title and subtitle
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
@@ -55,104 +44,73 @@ st.divider()
 st.sidebar.header("⚙️ Configuration")
 agent_choice = st.sidebar.selectbox(
     "Select Knowledge Agent:",
-    ["Auto Detect", "🌦️ Climate Agent", "🌾 Agriculture Agent", "🧾 Scheme Agent", "☎️ KCC Agent"]
+    ["Auto Detect", *AGENT_REGISTRY]
 )
 
 uploaded_file = st.sidebar.file_uploader(
-    "📤 Upload Custom Dataset (CSV, Excel, JSON, ZIP)",
-    type=["csv", "xlsx", "xls", "json", "zip"],
+    "📤 Upload Custom Dataset (CSV, Excel, JSON, Parquet, ZIP)",
+    type=["csv", "xlsx", "xls", "json", "parquet", "zip"],
 )
 
-if GEMINI_API_KEY:
-    st.sidebar.success("✅ Gemini API key loaded")
-else:
-    st.sidebar.error("❌ Missing Gemini API key")
-
 
 # ----------------------------------
-# 3️⃣ Agent Initializer
+# 3️⃣ Uploaded Dataset
 # ----------------------------------
-@st.cache_resource(show_spinner=False)
-def get_agent(agent_choice, api_key=None, uploaded_file=None):
-    """Dynamically build and return the chosen RAG agent"""
-    temp_path = None
-
-    # Save uploaded file for use
-    if uploaded_file:
-        temp_path = f"data/{uploaded_file.name}"
-        with open(temp_path, "wb") as f:
-            f.write(uploaded_file.read())
-        st.sidebar.success(f"✅ Loaded file: {uploaded_file.name}")
-
-    if agent_choice == "🌦️ Climate Agent":
-        return build_climate_agent(temp_path or "data/Mean_Temp_IMD_2017.csv")
-
-    elif agent_choice == "🌾 Agriculture Agent":
-        return build_agriculture_agent(temp_path or "data/Current Daily Price of Various Commodities from Various Markets (Mandi).csv")
+def uploaded_dataset_path(uploaded_file):
+    """Save an upload once per session; reruns reuse the stored path instead of re-hashing bytes"""
+    if uploaded_file is None:
+        return None
 
-    elif agent_choice == "🧾 Scheme Agent":
-        return build_scheme_agent(temp_path or "data/GetPMKisanDatagov.json")
+    upload_key = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+    saved = st.session_state.setdefault("saved_uploads", {})
+    if upload_key not in saved:
+        saved[upload_key] = save_upload(uploaded_file.name, uploaded_file.getvalue())
+        st.sidebar.success(f"✅ Loaded file: {uploaded_file.name}")
+    return saved[upload_key]
 
-    elif agent_choice == "☎️ KCC Agent":
-        if api_key:
-            return build_kcc_agent(api_key)
-        else:
-            st.error("❌ Missing data.gov.in API key for KCC Agent.")
-            return None
 
-    return None
+@st.fragment(run_every=2)
+def upload_progress(job):
+    """Re-renders only this block every 2 s while the background build runs"""
+    if job.status in ("ready", "failed"):
+        st.rerun()  # a full rerun shows the result and stops the polling
+    st.progress(job.progress, text=job.describe())
 
 
-# ----------------------------------
-# 4️⃣ Auto Agent Detection
-# ----------------------------------
-def auto_select_agent(user_query):
-    query = user_query.lower()
-    if any(word in query for word in ["rain", "temperature", "climate", "weather"]):
-        return "🌦️ Climate Agent"
-    elif any(word in query for word in ["crop", "yield", "price", "production", "agriculture"]):
-        return "🌾 Agriculture Agent"
-    elif any(word in query for word in ["scheme", "pmkisan", "subsidy", "beneficiary"]):
-        return "🧾 Scheme Agent"
-    elif any(word in query for word in ["kcc", "helpline", "call centre"]):
-        return "☎️ KCC Agent"
+def show_upload_job(job):
+    if job.status == "failed":
+        st.error(job.describe())
+    elif job.status == "ready":
+        st.success(job.describe())
     else:
-        return None
-
+        upload_progress(job)
 
-# ----------------------------------
-# 5️⃣ Gemini Response Helper
-# ----------------------------------
-def gemini_answer(prompt, context=""):
-    """Uses Gemini 1.5 model to generate a clean, factual answer"""
-    try:
-        # Use the configured model from config.yaml (CHAT_MODEL). Example: 'models/gemini-pro-latest'
-        model = genai.GenerativeModel(CHAT_MODEL)
-        full_prompt = f"""
-        You are an AI assistant for smart agriculture.
-        Use the following context to answer the question accurately.
 
-        Context:
-        {context}
+dataset_path = uploaded_dataset_path(uploaded_file)
 
-        Question:
-        {prompt}
+# Index the upload in the background for an explicitly chosen agent; with Auto Detect it
+# is queued for whichever agent the first question is routed to
+if dataset_path and agent_choice != "Auto Detect":
+    try:
+        with st.sidebar:
+            show_upload_job(submit_upload(agent_choice, dataset_path))
+    except UploadRejected as e:
+        st.sidebar.error(f"❌ Upload rejected: {e}")
 
-        Provide a concise, factual, and human-readable answer.
-        """
-        response = model.generate_content(full_prompt)
-        return response.text or "⚠️ No response generated."
-    except Exception as e:
-        return f"❌ Error: {str(e)}"
+if agent_choice == "☎️ KCC Agent" and not settings.data_gov_api_key:
+    st.sidebar.error("❌ Missing data.gov.in API key for KCC Agent.")
 
 
 # ----------------------------------
-# 6️⃣ Chat Interface
+# 4️⃣ Chat Interface
 # ----------------------------------
 
 # Initialize chat history in session state if it doesn't exist
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+# Conversation memory lives server-side in the shared store, keyed by this id
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+MAX_DISPLAYED_TURNS = 50
 
 st.markdown("## 💬 Chat with Samarth AI")
 
@@ -172,46 +130,29 @@ with col1:
 with col2:
     if st.button("Clear Chat"):
         st.session_state.chat_history = []
+        get_conversation_store().clear(session_id)
         st.rerun()
 
 if st.button("Submit", type="primary") and user_query:
     with st.spinner("🔎 Analyzing and fetching data..."):
-        # Step 1: Auto-select agent
-        selected_agent = agent_choice
-        if agent_choice == "Auto Detect":
-            selected_agent = auto_select_agent(user_query)
-
-        if not selected_agent:
-            st.warning("🤖 Could not auto-detect domain. Please select an agent manually.")
-            st.stop()
-
-        # Step 2: Initialize selected agent
-        qa_agent = get_agent(selected_agent, DATA_GOV_API_KEY, uploaded_file)
-
-        if not qa_agent:
-            st.error("❌ Failed to initialize selected agent.")
-            st.stop()
-
-        # Step 3: Retrieve domain-specific context
-        try:
-            context = qa_agent.retrieve_context(user_query)
-        except AttributeError:
-            # Fallback: if old `.run()` method exists
-            context = qa_agent.run(user_query)
-
-        # Step 4: Use Gemini to generate final answer
-        final_answer = gemini_answer(user_query, context)
-        
+        with trace_request("streamlit", agent=agent_label(agent_choice)):
+            # No keyword/embedding match in Auto Detect → ask the user to pick an agent
+            final_answer = answer_query(
+                user_query, agent_choice, dataset_path, fallback_agent=None, session_id=session_id
+            )
+
         # Add the Q&A pair to chat history
         st.session_state.chat_history.append((user_query, final_answer))
-        
+        # Only the visible transcript is kept per browser session; it is capped too
+        del st.session_state.chat_history[:-MAX_DISPLAYED_TURNS]
+
         # Show the latest response
         st.success("✅ Latest Response:")
         st.write(final_answer)
 
 
 # ----------------------------------
-# 7️⃣ Footer
+# 5️⃣ Footer
 # ----------------------------------
 st.sidebar.markdown("---")
 st.sidebar.caption("👨‍💻 Developed by Premkumar Pawar | Multi-Agent RAG with Gemini")
@@ -1,12 +1,12 @@
 """
 Test script to verify the agriculture agent fix
 """
-from agents.agriculture_agent import build_agriculture_agent
+from agents.registry import build_agent
 
 # Test building the agent
 print("Building agriculture agent...")
 try:
-    qa_agent = build_agriculture_agent()
+    qa_agent = build_agent("🌾 Agriculture Agent")
     print("✅ Agent built successfully!")
     
     # Test running a query
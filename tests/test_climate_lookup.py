@@ -0,0 +1,100 @@
+import pytest
+
+from utils import app_core
+from utils.climate_lookup import CLIMATE_AGENT, get_climate_lookup
+
+AGRICULTURE_AGENT = "🌾 Agriculture Agent"
+
+
+@pytest.mark.parametrize("query", [
+    "Tomato arrivals in Kerala in 2017",
+    "How many farmers in Bihar got PM-KISAN in 2016?",
+])
+def test_place_and_year_alone_are_not_a_rainfall_question(query):
+    assert get_climate_lookup().lookup(query) is None
+
+
+def test_rainfall_question_is_answered_directly():
+    lookup = get_climate_lookup().lookup("Rainfall in Kerala in 2017")
+    assert lookup.direct
+    assert lookup.lines == ["annual rainfall in Kerala, 2017: 2664.9 mm"]
+
+
+def test_no_domain_keyword_leaves_the_decision_to_the_caller():
+    lookup = get_climate_lookup().lookup("How hot was July 1987?")
+    assert lookup.lines and not lookup.direct
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """_answer_query with routing, agents and Gemini replaced; records what reached Gemini"""
+    calls = {"route": [], "gemini": []}
+
+    class Agent:
+        def retrieve_context(self, query, query_vector=None):
+            return "agent context"
+
+    def route(agents):
+        def auto_select_agents(query):
+            calls["route"].append(query)
+            return agents, None
+        monkeypatch.setattr(app_core, "auto_select_agents", auto_select_agents)
+
+    monkeypatch.setattr(app_core, "get_agent", lambda handle: Agent())
+    monkeypatch.setattr(app_core, "gemini_answer", lambda q, c="", h="": calls["gemini"].append(c) or "llm")
+    calls["set_route"] = route
+    return calls
+
+
+@pytest.mark.parametrize("query", [
+    "Tomato arrivals in Kerala in 2017",
+    "How many farmers in Bihar got PM-KISAN in 2016?",
+])
+def test_non_climate_questions_reach_the_llm(pipeline, query):
+    pipeline["set_route"]([AGRICULTURE_AGENT])
+    assert app_core._answer_query(query, "Auto Detect", None, None) == "llm"
+    assert app_core._answer_query(query, AGRICULTURE_AGENT, None, None) == "llm"
+
+
+def test_explicit_non_climate_agent_skips_the_lookup(pipeline):
+    answer = app_core._answer_query("Rainfall in Kerala in 2017", AGRICULTURE_AGENT, None, None)
+    assert answer == "llm"
+    assert "2664.9" not in pipeline["gemini"][0]
+
+
+def test_router_decides_without_keywords(pipeline):
+    pipeline["set_route"]([CLIMATE_AGENT])
+    assert "1987: 28.16°C" in app_core._answer_query("How hot was July 1987?", "Auto Detect", None, None)
+    assert len(pipeline["route"]) == 1
+
+    pipeline["set_route"]([])
+    answer = app_core._answer_query("How hot was July 1987?", "Auto Detect", None, AGRICULTURE_AGENT)
+    assert answer == "llm" and "Exact dataset values" in pipeline["gemini"][-1]
+    assert app_core._answer_query("How hot was July 1987?", CLIMATE_AGENT, None, None).startswith("📊")
+
+
+@pytest.mark.parametrize("query", [
+    "Average monsoon rainfall in Kerala since 2000",
+    "wettest year for rainfall in Kerala after 1950",
+    "Rainfall in Kerala before 1950",
+    "Mean temperature until 1990",
+])
+def test_open_ranges_are_not_a_cell_lookup(query):
+    assert get_climate_lookup().lookup(query) is None
+
+
+@pytest.mark.parametrize("query", [
+    "Average monsoon rainfall in Kerala between 2000 and 2005",
+    "Total rainfall in Kerala in 2017 and 2016",
+    "Which was hotter, 1987 or 1988? Compare mean temperature",
+])
+def test_aggregates_go_to_the_llm(query, pipeline):
+    lookup = get_climate_lookup().lookup(query)
+    assert lookup.lines and not lookup.complete and not lookup.direct
+    pipeline["set_route"]([CLIMATE_AGENT])
+    assert app_core._answer_query(query, CLIMATE_AGENT, None, None) == "llm"
+    assert "Exact dataset values" in pipeline["gemini"][-1]
+
+
+def test_mean_temperature_names_the_column():
+    assert get_climate_lookup().lookup("Mean temperature in July 1987").direct
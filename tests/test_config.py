@@ -0,0 +1,50 @@
+import builtins
+
+import pytest
+
+from utils import config, index_store, table_text, upload_governor
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "google_api_key: from-file\n"
+        "data_gov:\n  api_key: gov-from-file\n"
+        "quantization:\n  vectors: INT8\n"
+        "table_text:\n  enabled: true\n"
+        "uploads:\n  max_rows: 10\n"
+    )
+    monkeypatch.setattr(config, "CONFIG_PATH", str(path))
+    config.load_config.cache_clear()
+    yield path
+    config.load_config.cache_clear()
+
+
+def test_env_overrides_apply(config_file, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "from-env")
+    monkeypatch.delenv("DATA_GOV_API_KEY", raising=False)
+    loaded = config.load_config()
+    assert loaded["google_api_key"] == "from-env"
+    assert loaded["data_gov"]["api_key"] == "gov-from-file"
+
+
+def test_module_readers_share_one_read(config_file, monkeypatch):
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file) == str(config_file):
+            opened.append(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    for _ in range(3):
+        assert index_store.vector_dtype() == "int8"
+        assert table_text.table_text_enabled()
+        assert upload_governor.upload_limits()["max_rows"] == 10
+    assert len(opened) == 1
+
+
+def test_missing_section_is_empty(config_file):
+    assert config.config_section("tracing") == {}
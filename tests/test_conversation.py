@@ -0,0 +1,37 @@
+import pytest
+
+from utils.conversation import ConversationStore, resolved_question
+
+
+@pytest.fixture
+def store():
+    store = ConversationStore()
+    store.add_turn("s", "Onion price in Maharashtra", "Onion price in Maharashtra", "₹1,200/quintal")
+    return store
+
+
+def test_elliptical_follow_up_repeats_last_question(store):
+    assert store.rewrite("s", "and in Kerala?") == "Onion price in Kerala?"
+    assert store.rewrite("s", "what about wheat?") == "Wheat price in Maharashtra?"
+
+
+@pytest.mark.parametrize("follow_up, expected", [
+    ("Is it cheaper than in Kerala?", "Is it cheaper than in Kerala for Onion?"),
+    ("Why is it so high?", "Why is it so high in Maharashtra for Onion?"),
+    ("Which market has it cheapest?", "Which market has it cheapest in Maharashtra for Onion?"),
+    ("is it higher than Tamil Nadu?", "is it higher than Tamil Nadu for Onion?"),
+])
+def test_follow_up_with_its_own_question_keeps_it(store, follow_up, expected):
+    assert store.rewrite("s", follow_up) == expected
+
+
+def test_new_question_is_left_alone(store):
+    assert store.rewrite("s", "hottest year on record") == "hottest year on record"
+
+
+def test_llm_gets_question_as_asked_with_implicit_entities(store):
+    standalone = store.rewrite("s", "Why is it so high?")
+    question = resolved_question("Why is it so high?", standalone)
+    assert question.startswith("Why is it so high?\n")
+    assert "commodity Onion" in question and "state Maharashtra" in question
+    assert resolved_question("Onion price in Kerala", "Onion price in Kerala") == "Onion price in Kerala"
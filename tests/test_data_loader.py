@@ -0,0 +1,46 @@
+import pandas as pd
+
+from utils.data_loader import compact_dtypes, iter_row_text, load_data
+
+CSV = """State,Market,Commodity,Arrival_Date,Min Price,Modal Price,Weight
+Kerala,Kochi,Onion,01/02/2024,1200,1500,1.5
+Kerala,Kochi,Onion,02/02/2024,1250,1550,
+Punjab,Amritsar,Wheat,01/02/2024,2100,2200,2.25
+Punjab,,Wheat,02/02/2024,2150,2250,2.0
+"""
+
+
+def _plain_rows(df):
+    # What the agriculture agent rendered before compact dtypes (df.astype(str), row-joined)
+    return [" | ".join(str(value) for value in row) for row in df.itertuples(index=False)]
+
+
+def test_compact_load_shrinks_dtypes(tmp_path):
+    path = tmp_path / "mandi.csv"
+    path.write_text(CSV)
+    df = load_data(str(path), compact=True)
+
+    assert isinstance(df["State"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["Commodity"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["Arrival_Date"])
+    assert df.attrs["date_formats"] == {"Arrival_Date": "%d/%m/%Y"}
+    assert df["Modal_Price"].dtype.itemsize < 8
+    assert df["Weight"].dtype == "float64"  # floats keep their text
+
+
+def test_compact_rows_render_like_the_plain_frame(tmp_path):
+    path = tmp_path / "mandi.csv"
+    path.write_text(CSV)
+    assert list(iter_row_text(load_data(str(path), compact=True))) == _plain_rows(load_data(str(path)))
+
+
+def test_ambiguous_dates_stay_text():
+    # 2024-2-1 would not round-trip through any known format, so the column keeps its text
+    df = compact_dtypes(pd.DataFrame({"Arrival_Date": ["2024-2-1", "2024-02-02"]}))
+    assert df.attrs["date_formats"] == {}
+    assert list(iter_row_text(df)) == ["2024-2-1", "2024-02-02"]
+
+
+def test_unique_text_columns_are_not_categorical():
+    df = compact_dtypes(pd.DataFrame({"Market": ["Kochi", "Amritsar", "Nashik"]}))
+    assert not isinstance(df["Market"].dtype, pd.CategoricalDtype)
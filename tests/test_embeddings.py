@@ -0,0 +1,15 @@
+from utils import embeddings
+
+
+def test_batching_settings_read_config_once(monkeypatch):
+    calls = []
+
+    def load_config():
+        calls.append(1)
+        return {"embedding_batching": {"enabled": False}}
+
+    monkeypatch.setattr(embeddings, "_load_config", load_config)
+    monkeypatch.setattr(embeddings, "_batching", None)
+    for _ in range(3):
+        assert embeddings.get_query_batcher() is None
+    assert len(calls) == 1
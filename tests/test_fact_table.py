@@ -0,0 +1,46 @@
+import pytest
+
+from utils.fact_table import get_fact_matcher
+
+
+def test_all_india_fact_answers_plain_question():
+    answer = get_fact_matcher().answer("Which was the hottest year on record?")
+    assert answer and "Warmest year on record (annual all-India" in answer
+
+
+def test_named_subdivision_is_not_answered_by_all_india_fact():
+    matcher = get_fact_matcher()
+    assert matcher.answer("hottest year in Kerala") is None
+    assert matcher.answer("hottest year in Tamil Nadu?") is None
+    assert "Warmest year on record" in matcher.context("hottest year in Kerala")
+
+
+def test_named_commodity_is_not_answered_by_overall_count():
+    matcher = get_fact_matcher()
+    assert matcher.answer("How many states grow wheat?") is None
+    assert "distinct states" in matcher.answer("How many states are in the price data?")
+
+
+def test_fact_about_the_named_entity_still_answers():
+    answer = get_fact_matcher().answer("How many markets in Kerala?")
+    assert answer and "markets in Kerala" in answer
+
+
+@pytest.mark.parametrize("query", [
+    "Which was the hottest year between 1950 and 1980?",
+    "hottest year before 1950",
+    "What was the coldest year in the 1990s?",
+    "coldest year since 2000",
+    "How many markets report onion above Rs 2000?",
+    "How many markets report onion prices under 1500?",
+    "Compare the hottest year with 2010",
+])
+def test_qualified_question_goes_to_the_llm(query):
+    matcher = get_fact_matcher()
+    assert matcher.answer(query) is None
+    assert matcher.context(query)
+
+
+def test_fact_phrases_are_not_qualifiers():
+    # "change over" is a trend phrase, not a range qualifier
+    assert get_fact_matcher().answer("annual temperature change over the years")
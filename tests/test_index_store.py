@@ -0,0 +1,136 @@
+import json
+import os
+
+import faiss
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from utils import index_store
+
+
+class FakeEmbeddings(Embeddings):
+    model_name = "fake-8"
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def embed_documents(self, texts):
+        return [np.random.default_rng(len(t)).standard_normal(8).astype(np.float32).tolist() for t in texts]
+
+
+TEXTS = ["rice yield Punjab", "wheat yield Haryana", "rainfall Kerala 2019 ₹", "", "onion price Nashik"]
+METADATAS = [{"state": "Punjab"}, {"state": "Haryana"}, {"state": "Kerala", "year": 2019}, {}, {"state": "Maharashtra"}]
+
+
+def _flat_index():
+    index = faiss.IndexFlatL2(8)
+    index.add(np.asarray(FakeEmbeddings().embed_documents(TEXTS), dtype=np.float32))
+    return index
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_save_load_round_trip(tmp_path, dtype):
+    index = index_store.quantize_index(_flat_index(), dtype)
+    path = index_store.save_index(str(tmp_path / "idx"), index, TEXTS, metadatas=METADATAS, embeddings=FakeEmbeddings())
+
+    store = index_store.load_index(path, FakeEmbeddings())
+    assert store.index.ntotal == len(TEXTS)
+    for i, text in enumerate(TEXTS):
+        doc = store.docstore.search(store.index_to_docstore_id[i])
+        assert (doc.page_content, doc.metadata) == (text, METADATAS[i])
+
+    hit = store.similarity_search(TEXTS[4], k=1)[0]
+    assert hit.page_content == TEXTS[4]
+    assert hit.metadata == {"state": "Maharashtra"}
+
+
+def test_load_without_mmap(tmp_path):
+    path = index_store.save_index(str(tmp_path / "idx"), _flat_index(), TEXTS, embeddings=FakeEmbeddings())
+    store = index_store.load_index(path, FakeEmbeddings(), mmap_vectors=False)
+    assert store.similarity_search(TEXTS[0], k=1)[0].page_content == TEXTS[0]
+
+
+@pytest.fixture
+def index_root(tmp_path, monkeypatch):
+    root = tmp_path / "indexes"
+    monkeypatch.setattr(index_store, "INDEX_ROOT", str(root))
+    clock = iter(range(100, 200))
+    monkeypatch.setattr(index_store.time, "time", lambda: next(clock))
+    return root
+
+
+def _build(root, entry, source, key):
+    return index_store.save_index(
+        str(root / entry), _flat_index(), TEXTS, embeddings=FakeEmbeddings(), source_path=str(source), key=key
+    )
+
+
+def test_prune_removes_only_older_builds_with_the_same_key(index_root, tmp_path):
+    source, other_source = tmp_path / "a.csv", tmp_path / "b.csv"
+    old = _build(index_root, "crop-old", source, "k1")
+    other_params = _build(index_root, "crop-int8", source, "k2")
+    other_file = _build(index_root, "crop-b", other_source, "k1")
+    other_name = _build(index_root, "rain-old", source, "k1")
+    keep = _build(index_root, "crop-new", source, "k1")
+    newer = _build(index_root, "crop-newer", source, "k1")
+
+    index_store.prune_indexes("crop", str(source), keep=keep)
+
+    assert not os.path.exists(old)
+    for path in (keep, newer, other_params, other_file, other_name):
+        assert index_store.is_index(path)
+
+
+def test_prune_keeps_legacy_builds_without_a_key(index_root, tmp_path):
+    source = tmp_path / "a.csv"
+    legacy = _build(index_root, "crop-legacy", source, None)
+    keep = _build(index_root, "crop-new", source, "k1")
+
+    index_store.prune_indexes("crop", str(source), keep=keep)
+    assert index_store.is_index(legacy)
+    with open(os.path.join(keep, index_store.MANIFEST_FILE)) as f:
+        assert json.load(f)["build_key"] == "k1"
+
+
+def test_build_key_ignores_source_but_not_params():
+    embeddings = FakeEmbeddings()
+    assert index_store.build_key(embeddings, "a") == index_store.build_key(embeddings, "a")
+    assert index_store.build_key(embeddings, "a") != index_store.build_key(embeddings, "b")
+
+
+def test_save_vectorstore_round_trip(tmp_path):
+    from langchain_community.vectorstores import FAISS
+
+    store = FAISS.from_texts(TEXTS, FakeEmbeddings(), metadatas=METADATAS)
+    path = index_store.save_vectorstore(str(tmp_path / "idx"), store)
+    loaded = index_store.load_index(path, FakeEmbeddings())
+
+    for i in range(len(TEXTS)):
+        original = store.docstore.search(store.index_to_docstore_id[i])
+        doc = loaded.docstore.search(loaded.index_to_docstore_id[i])
+        assert (doc.page_content, doc.metadata) == (original.page_content, original.metadata)
+
+
+def test_flat_docstore_decodes_on_demand(tmp_path):
+    metadatas = [{"state": "Punjab", "tags": ["kharif"]}, {"state": "Punjab"}, {}, {"year": 2019}, {"state": "Kerala"}]
+    path = index_store.save_index(str(tmp_path / "idx"), _flat_index(), TEXTS, metadatas=metadatas)
+    docstore = index_store.FlatFileDocstore(path)
+
+    assert len(docstore) == len(TEXTS)
+    assert list(docstore.texts()) == TEXTS  # multi-byte text and empty chunks keep their offsets
+    assert [docstore.metadata(i) for i in range(len(TEXTS))] == metadatas
+
+    codes, values = docstore.metadata_columns["state"]
+    assert codes.dtype == np.int16 and list(codes) == [0, 0, -1, -1, 1]
+    assert values == ["Punjab", "Kerala"]
+
+    assert docstore.search("9") == "ID 9 not found."
+    assert docstore.search("-1") == "ID -1 not found."
+
+
+def test_position_ids_match_faiss_positions():
+    ids = index_store._PositionIds(3)
+    assert [ids[i] for i in range(3)] == list(ids) == [0, 1, 2]
+    with pytest.raises(KeyError):
+        ids[3]
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from utils import app_core
+from utils.index_watcher import IndexWatcher
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text("State,Price\nKerala,1\n")
+    return str(path)
+
+
+def _touch(path, text, mtime_ns):
+    with open(path, "w") as f:
+        f.write(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _drain(watcher):
+    watcher._pool.shutdown(wait=True)
+
+
+def test_rebuild_waits_for_the_change_to_settle(dataset):
+    rebuilt = []
+    watcher = IndexWatcher(lambda: {dataset: rebuilt.append})
+
+    watcher.poll()  # baseline
+    watcher.poll()
+    _touch(dataset, "State,Price\nKerala,1\nPunjab", 1_000_000_000)
+    watcher.poll()  # still being written?
+    _touch(dataset, "State,Price\nKerala,1\nPunjab,2\n", 2_000_000_000)
+    watcher.poll()  # changed again: restart the wait
+    assert rebuilt == []
+
+    watcher.poll()  # stable for one poll → rebuild once
+    watcher.poll()
+    _drain(watcher)
+    assert rebuilt == [dataset]
+    assert watcher.rebuilds == 1
+
+
+def test_missing_file_does_not_trigger_a_rebuild(dataset):
+    rebuilt = []
+    watcher = IndexWatcher(lambda: {dataset: rebuilt.append})
+    watcher.poll()
+    os.remove(dataset)
+    watcher.poll()
+    watcher.poll()
+    _drain(watcher)
+    assert rebuilt == []
+
+
+def test_failed_rebuild_is_recorded_and_cleared(dataset):
+    attempts = []
+
+    def rebuild(path):
+        attempts.append(path)
+        if len(attempts) == 1:
+            raise RuntimeError("embedding model unavailable")
+
+    watcher = IndexWatcher(lambda: {dataset: rebuild})
+    watcher.poll()
+    for mtime_ns in (1_000_000_000, 2_000_000_000):
+        _touch(dataset, f"State,Price\nKerala,{mtime_ns}\n", mtime_ns)
+        watcher.poll()
+        watcher.poll()
+        watcher._pool.submit(lambda: None).result()  # wait for the queued rebuild
+        if mtime_ns == 1_000_000_000:
+            assert watcher.errors == {dataset: "embedding model unavailable"}
+    _drain(watcher)
+    assert len(attempts) == 2
+    assert watcher.errors == {} and watcher.rebuilds == 1
+
+
+def test_rebuild_agent_swaps_in_a_new_agent(monkeypatch):
+    handle = app_core.AgentHandle("🌾 Agriculture Agent")
+    builds = iter(["old agent", "new agent", None])
+    monkeypatch.setattr(app_core, "_build", lambda h: next(builds))
+    monkeypatch.setattr(app_core, "_agent_cache", {})
+
+    serving = app_core.get_agent(handle)
+    assert app_core.rebuild_agent(handle) == "new agent"
+    assert serving == "old agent"  # in-flight queries keep the agent they already hold
+    assert app_core.get_agent(handle) == "new agent"
+
+    assert app_core.rebuild_agent(handle) is None  # a failed rebuild keeps the last good agent
+    assert app_core.get_agent(handle) == "new agent"
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from agents.registry import agent_name
+from utils.multi_agent import fan_out_retrieve, merge_contexts, multi_agent_context, select_agents
+
+CLIMATE, AGRICULTURE, SCHEME = agent_name("climate"), agent_name("agriculture"), agent_name("scheme")
+
+
+class FakeAgent:
+    def __init__(self, context, delay=0.0, error=None):
+        self.context, self.delay, self.error = context, delay, error
+        self.release = threading.Event()
+
+    def retrieve_context(self, user_query, query_vector=None):
+        if self.delay:
+            self.release.wait(self.delay)
+        if self.error:
+            raise self.error
+        return f"{self.context}: {user_query}"
+
+
+def test_keywords_pick_every_domain_in_priority_order():
+    assert select_agents("onion price and rainfall in Kerala") == [CLIMATE, AGRICULTURE]
+    assert select_agents("pmkisan subsidy for crop loss", max_agents=1) == [AGRICULTURE]
+
+
+def test_keywords_match_word_starts_only():
+    assert select_agents("grain prices") == [AGRICULTURE]  # "grain" is not "rain"
+    assert select_agents("hello") == []
+
+
+def test_fan_out_runs_agents_in_parallel():
+    agents = {CLIMATE: FakeAgent("rain", delay=0.3), AGRICULTURE: FakeAgent("price", delay=0.3)}
+    start = time.perf_counter()
+    contexts, errors = fan_out_retrieve("q", list(agents), agents.get, timeout=5)
+    assert time.perf_counter() - start < 0.55
+    assert contexts == {CLIMATE: "rain: q", AGRICULTURE: "price: q"} and errors == {}
+
+
+def test_slow_agent_times_out_without_blocking_the_rest():
+    slow = FakeAgent("slow", delay=5)
+    agents = {CLIMATE: slow, AGRICULTURE: FakeAgent("price")}
+    start = time.perf_counter()
+    try:
+        contexts, errors = fan_out_retrieve("q", list(agents), agents.get, timeout=0.2)
+    finally:
+        slow.release.set()
+    assert time.perf_counter() - start < 1
+    assert contexts == {AGRICULTURE: "price: q"}
+    assert errors == {CLIMATE: "timed out after 0.2s"}
+
+
+def test_failures_are_reported_per_agent():
+    agents = {CLIMATE: FakeAgent("rain", error=ValueError("index missing")), AGRICULTURE: None}
+    contexts, errors = fan_out_retrieve("q", [CLIMATE, AGRICULTURE], agents.get, timeout=5)
+    assert contexts == {}
+    assert errors == {CLIMATE: "index missing", AGRICULTURE: f"Failed to initialize {AGRICULTURE}"}
+
+    with pytest.raises(RuntimeError, match="index missing"):
+        multi_agent_context("q", [CLIMATE, AGRICULTURE], agents.get, timeout=5)
+
+
+def test_merged_context_keeps_routing_order_and_notes_gaps():
+    merged = merge_contexts({AGRICULTURE: "prices", SCHEME: "schemes"}, [SCHEME, CLIMATE, AGRICULTURE],
+                            errors={CLIMATE: "timed out after 20s"})
+    assert merged == (f"### {SCHEME}\nschemes\n\n### {CLIMATE}\n(No data: timed out after 20s)"
+                      f"\n\n### {AGRICULTURE}\nprices")
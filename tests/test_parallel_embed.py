@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils import parallel_embed
+
+
+class IndexEmbeddings:
+    """Embeds "chunk i" as [i, 1]; the first batch is the slowest, so batches finish out of order"""
+
+    model_name = "index-2"
+
+    def embed_documents(self, texts):
+        numbers = [int(text.split()[1]) for text in texts]
+        if 0 in numbers:
+            time.sleep(0.5)
+        return [[float(n), 1.0] for n in numbers]
+
+    def embed_query(self, text):
+        return [0.0, 1.0]
+
+
+TEXTS = [f"chunk {i}" for i in range(40)]
+
+
+def _positions(index):
+    return [int(v[0]) for v in index.reconstruct_n(0, index.ntotal)]
+
+
+@pytest.fixture
+def build_config(monkeypatch):
+    monkeypatch.setattr(parallel_embed, "_load_build_config", lambda: {"min_chunks_for_parallel": 0})
+
+
+def test_parallel_build_keeps_chunk_order(build_config):
+    index = parallel_embed.build_index(TEXTS, IndexEmbeddings(), workers=2, batch_size=4, progress=False)
+    assert _positions(index) == list(range(len(TEXTS)))
+
+
+def test_in_process_build_matches(build_config):
+    index = parallel_embed.build_index(TEXTS, IndexEmbeddings(), workers=1, batch_size=4, progress=False)
+    assert _positions(index) == list(range(len(TEXTS)))
+
+
+def test_progress_reaches_total(build_config):
+    seen = []
+    token = parallel_embed.build_progress.set(lambda done, total: seen.append((done, total)))
+    try:
+        parallel_embed.build_index(TEXTS, IndexEmbeddings(), workers=1, batch_size=16)
+    finally:
+        parallel_embed.build_progress.reset(token)
+    assert seen == [(16, 40), (32, 40), (40, 40)]
+
+
+def test_empty_corpus_gives_empty_index(build_config):
+    index = parallel_embed.build_index([], IndexEmbeddings(), workers=2, progress=False)
+    assert index.ntotal == 0 and index.d == 2
+
+
+def test_unpicklable_embeddings_build_in_process():
+    class Local:
+        pass
+
+    assert parallel_embed.embeddings_factory(Local()) is None
+    factory = parallel_embed.embeddings_factory(IndexEmbeddings())
+    assert np.allclose(factory().embed_documents(["chunk 3"]), [[3.0, 1.0]])
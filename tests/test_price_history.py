@@ -0,0 +1,36 @@
+import json
+import multiprocessing
+import os
+
+import pandas as pd
+
+from utils import price_history
+
+
+def _snapshot(path, market):
+    pd.DataFrame({
+        "State": ["Kerala", "Kerala"], "District": ["Ernakulam"] * 2, "Market": [market] * 2,
+        "Commodity": ["Onion", "Tomato"], "Variety": ["Other"] * 2, "Grade": ["FAQ"] * 2,
+        "Arrival_Date": ["01/11/2025"] * 2, "Min_x0020_Price": [1000, 800],
+        "Max_x0020_Price": [1400, 1200], "Modal_x0020_Price": [1200, 1000],
+    }).to_csv(path, index=False)
+
+
+def _ingest(args):
+    return price_history.ingest_snapshot(*args)
+
+
+def test_concurrent_workers_lose_no_rows(tmp_path):
+    root = str(tmp_path / "history")
+    snapshots = []
+    for i in range(8):
+        path = str(tmp_path / f"snapshot_{i}.csv")
+        _snapshot(path, f"Market {i}")
+        snapshots.append((path, root))
+
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        assert pool.map(_ingest, snapshots) == [2] * 8
+
+    assert len(price_history.scan(root=root)) == 16
+    with open(os.path.join(root, price_history.INGESTED_FILE), encoding="utf-8") as f:
+        assert len(json.load(f)) == 8
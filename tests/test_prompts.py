@@ -0,0 +1,51 @@
+import threading
+from types import SimpleNamespace
+
+from utils import prompts
+from utils.tracing import tracer
+
+
+def test_prefix_is_instructions_only_without_context_cache(monkeypatch):
+    monkeypatch.setattr(prompts, "_load_prompts_config", lambda: {})
+    monkeypatch.setattr(prompts, "_templates", {})
+    template = prompts.answer_template()
+    assert template.static_blocks == ()
+    assert template.prefix == prompts.clean(prompts.ANSWER_INSTRUCTIONS)
+
+    first, second = template.render("onion price?", "ctx  \n\n\n\nmore"), template.render("rice?", "other")
+    assert first.prefix == second.prefix
+    assert first.suffix == "Context:\nctx\n\nmore\n\nQuestion:\nonion price?"
+
+
+def test_cache_upload_does_not_block_other_requests(monkeypatch):
+    monkeypatch.setattr(prompts, "_load_prompts_config", lambda: {"context_cache": {"enabled": True, "min_tokens": 0}})
+    monkeypatch.setattr(prompts, "_context_caches", {})
+    uploading, release = threading.Event(), threading.Event()
+
+    def create(**kwargs):
+        uploading.set()
+        release.wait(5)
+        return "cache"
+
+    genai = SimpleNamespace(
+        caching=SimpleNamespace(CachedContent=SimpleNamespace(create=create)),
+        GenerativeModel=SimpleNamespace(from_cached_content=lambda cached_content: f"model on {cached_content}"),
+    )
+    monkeypatch.setattr(prompts, "get_genai", lambda api_key: genai)
+    prompt = prompts.PromptTemplate("test", "Answer briefly.").render("q")
+
+    results = []
+    uploader = threading.Thread(target=lambda: results.append(prompts._cached_model("key", "model", prompt)))
+    uploader.start()
+    assert uploading.wait(5)
+    assert prompts._cached_model("key", "model", prompt) is None  # full prompt while the upload runs
+    release.set()
+    uploader.join(5)
+    assert results == ["model on cache"]
+    assert prompts._cached_model("key", "model", prompt) == "model on cache"
+
+
+def test_token_savings_are_exported():
+    text = tracer.prometheus_text()
+    for name in ("requests", "prompt_tokens", "cached_tokens", "trimmed_tokens", "saved_tokens"):
+        assert f"krishisutra_llm_{name}_total " in text
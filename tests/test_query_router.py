@@ -0,0 +1,135 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from utils import query_router
+
+AGENTS = ["Crop", "Climate", "Market"]
+
+
+class VectorEmbeddings:
+    """embed_query returns the vector registered for the query text"""
+
+    model_name = "vector-3"
+
+    def __init__(self, vectors=None):
+        self.vectors = vectors or {}
+        self.calls = 0
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[1.0, float(len(t)), 0.5] for t in texts]
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(query_router, "build_centroids", lambda embeddings: (AGENTS, np.eye(3, dtype=np.float32)))
+    embeddings = VectorEmbeddings({
+        "crop only": [1.0, 0.0, 0.0],
+        "crop and climate": [1.0, 0.95, 0.0],
+        "crop, some climate": [1.0, 0.5, 0.0],
+        "nothing": [0.2, -1.0, -1.0],
+    })
+    return query_router.EmbeddingRouter(embeddings, threshold=0.3, multi_margin=0.08, max_agents=2)
+
+
+def test_single_agent_above_threshold(router):
+    assert router.route("crop only").agents == ["Crop"]
+
+
+def test_close_runner_up_is_kept(router):
+    assert router.route("crop and climate").agents == ["Crop", "Climate"]
+
+
+def test_runner_up_outside_margin_is_dropped(router):
+    assert router.route("crop, some climate").agents == ["Crop"]
+
+
+def test_below_threshold_routes_nowhere(router):
+    result = router.route("nothing")
+    assert result.agents == []
+    assert set(result.scores) == set(AGENTS)
+
+
+@pytest.fixture
+def profiles(monkeypatch):
+    texts = {name: [f"{name} example"] for name in AGENTS}
+    monkeypatch.setattr(query_router, "AGENT_PROFILES", {name: {} for name in AGENTS})
+    monkeypatch.setattr(query_router, "_profile_texts", lambda name: texts[name])
+    return texts
+
+
+def test_centroid_cache_reused_until_profiles_change(tmp_path, profiles):
+    cache, embeddings = str(tmp_path / "centroids.npz"), VectorEmbeddings()
+
+    names, first = query_router.build_centroids(embeddings, cache_path=cache)
+    assert names == AGENTS and embeddings.calls == 3
+    _, cached = query_router.build_centroids(embeddings, cache_path=cache)
+    assert embeddings.calls == 3
+    np.testing.assert_allclose(cached, first)
+
+    profiles["Market"].append("onion price in Nashik")
+    query_router.build_centroids(embeddings, cache_path=cache)
+    assert embeddings.calls == 6
+    assert [p.name for p in tmp_path.iterdir()] == ["centroids.npz"]  # no temp files left behind
+
+
+def test_corrupt_centroid_cache_is_rebuilt(tmp_path, profiles):
+    cache, embeddings = tmp_path / "centroids.npz", VectorEmbeddings()
+    cache.write_bytes(b"truncated")
+    names, centroids = query_router.build_centroids(embeddings, cache_path=str(cache))
+    assert names == AGENTS and centroids.shape == (3, 3)
+    query_router.build_centroids(embeddings, cache_path=str(cache))
+    assert embeddings.calls == 3
+
+
+@pytest.fixture
+def fresh_router(monkeypatch):
+    monkeypatch.setattr(query_router, "_router", None)
+    monkeypatch.setattr(query_router, "_router_failed_at", None)
+
+
+def test_get_router_builds_once_under_concurrency(monkeypatch, fresh_router):
+    builds = []
+
+    def slow_router(**kwargs):
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(query_router, "EmbeddingRouter", slow_router)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(query_router.get_router())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(builds) == 1
+    assert len({id(r) for r in results}) == 1
+
+
+def test_get_router_retries_after_failure(monkeypatch, fresh_router):
+    attempts = []
+
+    def flaky_router(**kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("model download failed")
+        return "router"
+
+    clock = [1000.0]
+    monkeypatch.setattr(query_router, "EmbeddingRouter", flaky_router)
+    monkeypatch.setattr(query_router.time, "monotonic", lambda: clock[0])
+
+    assert query_router.get_router() is None
+    assert query_router.get_router() is None  # within the retry interval: no new attempt
+    assert len(attempts) == 1
+
+    clock[0] += query_router.ROUTER_RETRY_SECONDS
+    assert query_router.get_router() == "router"
+    assert len(attempts) == 2
@@ -0,0 +1,17 @@
+from agents import registry
+from utils.multi_agent import AGENT_KEYWORDS, select_agents
+from utils.query_router import AGENT_PROFILES
+
+
+def test_routing_comes_from_config():
+    for name, spec in registry.AGENT_REGISTRY.items():
+        assert AGENT_KEYWORDS[name] == spec["routing"]["keywords"]
+        assert AGENT_PROFILES[name]["examples"] == spec["routing"]["examples"]
+    assert select_agents("rainfall and onion price") == [registry.agent_name("climate"), registry.agent_name("agriculture")]
+
+
+def test_config_only_agent_is_profiled_from_its_source(monkeypatch):
+    entry = registry._registry_entry("soil", {"name": "🪨 Soil Agent", "source": "data/soil.csv"})
+    monkeypatch.setitem(registry.AGENT_REGISTRY, "🪨 Soil Agent", entry)
+    assert registry.agent_name("soil") == "🪨 Soil Agent"
+    assert registry.routing("🪨 Soil Agent") == {"keywords": [], "examples": [], "datasets": ["data/soil.csv"]}
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from utils.table_text import render_documents, render_rows
+
+
+def test_generic_render_accepts_any_column_name():
+    df = pd.DataFrame({"State": ["Punjab"], 2019: [5.2], "Area.Sown": [3.1], "Ratio:1": [0.4], "{x}": ["y"]})
+    name, texts = render_rows(df)
+    assert name == "generic"
+    assert texts == ["State: Punjab; 2019: 5.2; Area.Sown: 3.1; Ratio:1: 0.4; {x}: y"]
+    assert len(render_documents(df, source="upload.csv")) == 1
+
+
+def test_generic_render_labels_and_missing_values():
+    df = pd.DataFrame({"Modal_x0020_Price": [1200.0, None], "Crop_Name": ["Rice", "Wheat"]})
+    assert render_rows(df)[1] == ["Modal Price: 1200.0; Crop Name: Rice", "Modal Price: n/a; Crop Name: Wheat"]
+
+
+def test_named_template_still_applies():
+    df = pd.DataFrame({"YEAR": [1901], "ANNUAL": [24.23], "JAN-FEB": [19.7], "MAR-MAY": [27.8],
+                       "JUN-SEP": [28.2], "OCT-DEC": [23.6]})
+    name, texts = render_rows(df)
+    assert name == "imd_seasonal_temperature"
+    assert texts[0].startswith("All-India mean temperature in 1901 (°C): annual 24.23")
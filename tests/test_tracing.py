@@ -0,0 +1,70 @@
+import pytest
+
+from utils import tracing
+from utils.tracing import Tracer, _percentile, agent_label, trace_request
+
+
+@pytest.mark.parametrize("values, q, expected", [
+    (list(range(1, 101)), 50, 50),
+    (list(range(1, 101)), 95, 95),
+    (list(range(1, 101)), 99, 99),
+    ([10, 20, 30, 40], 50, 20),
+    ([10, 20, 30, 40], 95, 40),
+    ([7], 99, 7),
+    ([], 50, 0.0),
+])
+def test_nearest_rank_percentile(values, q, expected):
+    assert _percentile(values, q) == expected
+
+
+def _tracer_with(durations, stage="retrieve_context", agent="climate", error_every=0):
+    tracer = Tracer()
+    for i, ms in enumerate(durations):
+        error = "TimeoutError" if error_every and i % error_every == 0 else None
+        tracer._record({"stage": stage, "agent": agent, "duration_ms": ms, "error": error})
+    return tracer
+
+
+def test_summary_groups_by_stage_and_agent():
+    tracer = _tracer_with([40, 10, 30, 20], error_every=2)
+    tracer._record({"stage": "generate", "agent": None, "duration_ms": 5.0, "error": None})
+    stats = tracer.summary()
+    assert stats[("retrieve_context", "climate")] == {
+        "count": 4, "errors": 2, "mean": 25.0, "p50": 20, "p95": 40, "p99": 40,
+    }
+    assert stats[("generate", None)]["count"] == 1
+
+
+def test_prometheus_text():
+    text = _tracer_with(range(1, 101)).prometheus_text()
+    labels = 'stage="retrieve_context",agent="climate"'
+    assert f'krishisutra_stage_latency_ms{{{labels},quantile="0.95"}} 95.000' in text
+    assert f"krishisutra_stage_latency_ms_sum{{{labels}}} 5050.000" in text
+    assert f"krishisutra_stage_latency_ms_count{{{labels}}} 100" in text
+
+
+def test_nested_spans_share_the_request_trace_id(monkeypatch):
+    tracer = Tracer()
+    monkeypatch.setattr(tracing, "tracer", tracer)
+    with pytest.raises(ValueError):
+        with trace_request(agent="climate"):
+            with tracing.span("retrieve_context", agent="climate"):
+                pass
+            raise ValueError("boom")
+
+    inner, root = tracer.spans
+    assert inner["trace_id"] == root["trace_id"] is not None
+    assert (inner["error"], root["error"]) == (None, "ValueError")
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("generate") as attrs:
+        attrs["tokens"] = 3
+    assert not tracer.spans
+
+
+def test_agent_label():
+    assert agent_label("🌦️ Climate Agent") == "climate"
+    assert agent_label("☎️ KCC Agent") == "kcc"
+    assert agent_label(None) is None
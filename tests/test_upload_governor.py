@@ -0,0 +1,91 @@
+import threading
+import zipfile
+
+import pandas as pd
+import pytest
+
+from utils.upload_governor import (
+    DEFAULT_LIMITS, UploadJob, UploadJobQueue, UploadRejected, prepare_upload, sniff_upload,
+)
+
+LIMITS = {**DEFAULT_LIMITS, "max_rows": 100, "chunk_rows": 64}
+
+
+def _frame(rows):
+    return pd.DataFrame({"State": ["Kerala"] * rows, "Modal Price": range(rows)})
+
+
+def test_xlsx_gets_the_archive_checks(tmp_path):
+    path = tmp_path / "bomb.xlsx"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("xl/worksheets/sheet1.xml", "<c>0</c>" * 1_000_000)
+    with pytest.raises(UploadRejected, match="Excel file is compressed"):
+        sniff_upload(str(path), LIMITS)
+    with pytest.raises(UploadRejected, match="Excel file expands"):
+        sniff_upload(str(path), {**LIMITS, "max_uncompressed_bytes": 1024})
+
+
+def test_parquet_rows_come_from_metadata_and_are_sampled(tmp_path):
+    path = tmp_path / "prices.parquet"
+    _frame(300).to_parquet(path, row_group_size=50)
+    sniffed = sniff_upload(str(path), LIMITS)
+    assert (sniffed["estimated_rows"], sniffed["columns"]) == (300, 2)
+
+    prepared = prepare_upload(str(path), str(tmp_path / "out.csv"), LIMITS)
+    assert (prepared.rows, prepared.total_rows) == (100, 300)
+    assert list(pd.read_csv(prepared.path).columns) == ["State", "Modal_Price"]
+
+    with pytest.raises(UploadRejected, match="Parquet data expands"):
+        sniff_upload(str(path), {**LIMITS, "max_uncompressed_bytes": 100})
+
+
+def test_zipped_csv_is_streamed_and_capped(tmp_path):
+    path = tmp_path / "prices.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("a.csv", _frame(150).to_csv(index=False))
+        z.writestr("b.csv", _frame(150).to_csv(index=False))
+    prepared = prepare_upload(str(path), str(tmp_path / "out.csv"), LIMITS)
+    assert (prepared.rows, prepared.total_rows) == (100, 300)
+
+
+def _wait(job):
+    for _ in range(200):
+        if job.status in ("ready", "failed"):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job stuck in {job.status}")
+
+
+def test_failed_job_is_retried_but_rejection_is_kept(tmp_path):
+    path = tmp_path / "prices.csv"
+    _frame(10).to_csv(path, index=False)
+    outcomes = [RuntimeError("disk full"), "handle"]
+
+    def build(job):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    queue = UploadJobQueue(build)
+    failed = _wait(queue.submit("agent", str(path)))
+    assert failed.status == "failed" and failed.retryable
+    retried = _wait(queue.submit("agent", str(path)))
+    assert retried is not failed and (retried.status, retried.result) == ("ready", "handle")
+
+    def reject(job):
+        raise UploadRejected("No rows could be read from the file")
+
+    queue = UploadJobQueue(reject)
+    rejected = _wait(queue.submit("agent", str(path)))
+    assert queue.submit("agent", str(path)) is rejected
+
+
+@pytest.mark.parametrize("stored, shown", [
+    ("0123456789ab_Mean_Temp.csv", "Mean_Temp.csv"),
+    ("Mean_Temp.csv", "Mean_Temp.csv"),
+    ("abc_prices.csv", "abc_prices.csv"),
+])
+def test_describe_strips_only_the_hash_prefix(stored, shown):
+    job = UploadJob(id="1", agent_name="Climate Agent", source_path=f"/uploads/{stored}")
+    assert job.describe().startswith(f"⏳ Indexing {shown} for Climate Agent")
@@ -0,0 +1,379 @@
+"""
+Server-side core shared by the Gradio and Streamlit front ends.
+
+Everything expensive lives here and is created once per process: config, the Gemini
+client, and built agents. Streamlit re-runs its script on every interaction, but this
+module is imported once, so a rerun only re-renders the view. Agents are cached by an
+`AgentHandle` (agent name + dataset content digest) rather than by upload objects, so the
+same dataset never triggers a second index build. Uploaded datasets are checked against
+the `uploads` limits and built on a background queue (utils/upload_governor.py), so a large
+upload never blocks a request thread.
+"""
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# Agent modules (LangChain, FAISS, sentence-transformers) are imported on first build
+from agents.registry import AGENT_REGISTRY, agent_name, build_agent
+from utils import fact_table
+from utils.config import load_config
+from utils.climate_lookup import CLIMATE_AGENT, get_climate_lookup, refresh_climate_lookup
+from utils.conversation import get_conversation_store, resolved_question
+from utils.index_watcher import IndexWatcher
+from utils.multi_agent import multi_agent_context, select_agents
+from utils.prompts import answer_template, generate, refresh_prompts
+from utils.query_router import route_query
+from utils.fact_table import get_fact_matcher
+from utils.tracing import span, agent_label
+from utils.upload_governor import UploadJobQueue, UploadRejected, prepare_upload, upload_limits
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+UPLOAD_DIR = os.path.join(BASE_DIR, "data", "uploads")
+DEFAULT_AGENT = agent_name("agriculture")
+
+
+# ============================================================
+# 1️⃣ Config and settings (read once per process)
+# ============================================================
+@dataclass(frozen=True)
+class Settings:
+    data_gov_api_key: str
+    llm_provider: str
+    gemini_api_key: str
+    embedding_provider: str
+    chat_model: str
+    multi_agent_max: int
+    multi_agent_timeout: float
+    router_threshold: float
+    router_multi_margin: float
+
+    @property
+    def gemini_ready(self):
+        return self.llm_provider.lower() == "gemini" and bool(self.gemini_api_key)
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    config = load_config()
+    multi_agent = config.get("multi_agent", {})
+    router = config.get("router", {})
+    return Settings(
+        data_gov_api_key=config["data_gov"]["api_key"],
+        llm_provider=config.get("llm_provider", "gemini"),
+        gemini_api_key=config.get("google_api_key"),
+        embedding_provider=config.get("embedding_provider", "huggingface"),
+        chat_model=config.get("chat_model", "models/gemini-pro-latest"),
+        multi_agent_max=multi_agent.get("max_agents", 3),
+        multi_agent_timeout=multi_agent.get("timeout_seconds", 20),
+        router_threshold=router.get("threshold", 0.3),
+        router_multi_margin=router.get("multi_margin", 0.08),
+    )
+
+
+# ============================================================
+# 2️⃣ Agent handles and the process-wide agent cache
+# ============================================================
+@dataclass(frozen=True)
+class AgentHandle:
+    """Hashable cache key for a built agent; equal handles share one agent"""
+    agent_name: str
+    digest: str = None  # content hash of a custom dataset, None for the bundled one
+    dataset_path: str = field(default=None, compare=False)
+
+
+def _file_digest(path):
+    stat = os.stat(path)
+    return _digest_for(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=256)
+def _digest_for(path, mtime_ns, size):
+    """Content hash, memoized per (path, mtime, size) so reruns don't re-read the file"""
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def save_upload(file_name, data):
+    """Store uploaded bytes content-addressed under data/uploads/ and return the path"""
+    digest = hashlib.sha1(data).hexdigest()
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, f"{digest[:12]}_{os.path.basename(file_name)}")
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(data)
+    return path
+
+
+def agent_handle(agent_name, dataset_path=None):
+    """Handle for `agent_name` on its bundled dataset, or on a custom dataset file"""
+    if not dataset_path:
+        return AgentHandle(agent_name)
+    return AgentHandle(agent_name, digest=_file_digest(dataset_path), dataset_path=dataset_path)
+
+
+def _build(handle):
+    settings = get_settings()
+    return build_agent(handle.agent_name, handle.dataset_path, api_key=settings.data_gov_api_key, settings=settings)
+
+
+_agent_cache = {}
+_build_locks = {}
+_cache_lock = threading.Lock()
+
+
+def get_agent(handle):
+    """Build the agent for `handle` once; concurrent callers wait for the same build"""
+    agent = _agent_cache.get(handle)
+    if agent is not None:
+        return agent
+
+    with _cache_lock:
+        lock = _build_locks.setdefault(handle, threading.Lock())
+    with lock:
+        agent = _agent_cache.get(handle)
+        if agent is None:
+            agent = _build(handle)
+            if agent:
+                _agent_cache[handle] = agent
+    return agent
+
+
+def cached_agents():
+    return list(_agent_cache)
+
+
+def rebuild_agent(handle):
+    """
+    Build a fresh agent for `handle` off to the side (new index directory) and swap it in.
+    The swap is a single reference assignment: queries already running keep the old agent
+    and its index, new queries get the new one, so there is no downtime.
+    """
+    with span("rebuild", agent=agent_label(handle.agent_name)):
+        agent = _build(handle)
+    if agent:
+        _agent_cache[handle] = agent
+    return agent
+
+
+# ============================================================
+# 3️⃣ Background rebuilds on dataset changes
+# ============================================================
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def _watched_files():
+    """{dataset path: callback} for live agents on bundled datasets and the fact table sources"""
+    actions = {}
+    for handle in cached_agents():
+        # Uploads are content-addressed and never change in place; KCC has no file
+        path = handle.dataset_path or AGENT_REGISTRY.get(handle.agent_name, {}).get("default_path")
+        if handle.digest is None and path:
+            actions.setdefault(os.path.abspath(path), []).append(lambda _, h=handle: rebuild_agent(h))
+    for rel_path in fact_table.SOURCES:
+        actions.setdefault(os.path.abspath(os.path.join(fact_table.BASE_DIR, rel_path)), []).extend([
+            lambda _: fact_table.refresh_fact_matcher(),
+            lambda _: refresh_climate_lookup(),
+            lambda _: refresh_prompts(),
+        ])
+
+    def run_all(callbacks):
+        return lambda path: [callback(path) for callback in callbacks]
+
+    return {path: run_all(callbacks) for path, callbacks in actions.items()}
+
+
+def start_index_watcher():
+    """Start the data/ watcher once per process, if `index_watcher.enabled` is set"""
+    global _watcher
+    settings = load_config().get("index_watcher", {}) or {}
+    if not settings.get("enabled", False):
+        return None
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = IndexWatcher(_watched_files, interval=settings.get("interval_seconds", 5)).start()
+    return _watcher
+
+
+# ============================================================
+# 4️⃣ Uploaded datasets (limits + background builds)
+# ============================================================
+_upload_queue = None
+_upload_queue_lock = threading.Lock()
+
+
+def _build_upload(job):
+    """Sample/cap the upload into data/uploads/ and build the agent on it; returns its handle"""
+    name = os.path.splitext(os.path.basename(job.source_path))[0]
+    out_path = os.path.join(UPLOAD_DIR, f"{_file_digest(job.source_path)[:12]}_{name}.prepared.csv")
+    prepared = prepare_upload(job.source_path, out_path, sniffed=job.sniffed)
+    job.message = f"Indexed {prepared.summary()}."
+
+    handle = agent_handle(job.agent_name, prepared.path)
+    with span("upload_build", agent=agent_label(job.agent_name)):
+        if get_agent(handle) is None:
+            raise RuntimeError(f"Failed to initialize {job.agent_name}")
+    return handle
+
+
+def get_upload_queue():
+    global _upload_queue
+    with _upload_queue_lock:
+        if _upload_queue is None:
+            limits = upload_limits()
+            _upload_queue = UploadJobQueue(_build_upload, workers=limits["build_workers"], max_jobs=limits["max_jobs"])
+    return _upload_queue
+
+
+def submit_upload(agent_name, dataset_path):
+    """The build job for `agent_name` on an uploaded file (queued on first call); raises UploadRejected"""
+    return get_upload_queue().submit(agent_name, dataset_path)
+
+
+def upload_status(agent_name, dataset_path):
+    """Status line for an upload's build, or "" when it was never submitted"""
+    if not dataset_path or agent_name not in AGENT_REGISTRY:
+        return ""
+    job = get_upload_queue().find(agent_name, dataset_path)
+    return job.describe() if job else ""
+
+
+# ============================================================
+# 5️⃣ Routing and answer generation
+# ============================================================
+def auto_select_agents(user_query):
+    """Embedding-based routing; returns (agent names, query vector for reuse in retrieval)"""
+    settings = get_settings()
+    route = route_query(
+        user_query,
+        threshold=settings.router_threshold,
+        multi_margin=settings.router_multi_margin,
+        max_agents=settings.multi_agent_max,
+    )
+    return route.agents, route.query_vector
+
+
+def gemini_answer(prompt, context="", history=""):
+    """Uses the configured Gemini model to generate a clean, factual answer"""
+    settings = get_settings()
+    try:
+        response = generate(
+            answer_template(), prompt, settings.gemini_api_key, settings.chat_model, context=context, history=history
+        )
+        return response.text or "⚠️ No response generated."
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
+
+
+def answer_query(user_query, agent_choice, dataset_path=None, fallback_agent=DEFAULT_AGENT, session_id=None):
+    """
+    Full question → answer pipeline: precomputed facts, routing, (multi-)agent retrieval,
+    then Gemini. Errors come back as "❌ ..." strings, like the rest of the app.
+    With a `session_id`, follow-ups are rewritten against that session's earlier turns for
+    facts, routing and retrieval; Gemini still answers the question as asked.
+    """
+    if not session_id:
+        return _answer_query(user_query, agent_choice, dataset_path, fallback_agent)
+
+    store = get_conversation_store()
+    with span("rewrite"):
+        standalone = store.rewrite(session_id, user_query)
+        history = store.history_context(session_id)
+        question = resolved_question(user_query, standalone)
+    answer = _answer_query(standalone, agent_choice, dataset_path, fallback_agent, history, question)
+    if not answer.startswith(("❌", "⏳")):
+        store.add_turn(session_id, user_query, standalone, answer)
+    return answer
+
+
+def _answer_query(user_query, agent_choice, dataset_path, fallback_agent, history="", question=None):
+    question = question or user_query  # what Gemini is asked; `user_query` drives retrieval
+    # Step 0: Answer from exact climate cells or precomputed dataset facts when possible
+    # (bundled datasets only). The exact lookup goes first: "mean temperature in July 1987"
+    # is one cell, not the long-term July mean fact. It only runs for climate questions.
+    facts_context = ""
+    routed = None  # (agents, query vector) once the router has run
+    if not dataset_path:
+        lookup = None
+        if agent_choice in ("Auto Detect", CLIMATE_AGENT):
+            with span("climate_lookup"):
+                lookup = get_climate_lookup().lookup(user_query)
+        if lookup and lookup.complete and not lookup.direct and not select_agents(user_query):
+            # No domain keyword either way: answer directly only if climate is positively picked
+            if agent_choice == "Auto Detect":
+                with span("route"):
+                    routed = auto_select_agents(user_query)
+            lookup.direct = (routed[0] if routed else [agent_choice]) == [CLIMATE_AGENT]
+        if lookup and lookup.direct:
+            return lookup.answer()
+
+        with span("facts"):
+            fact_matcher = get_fact_matcher()
+            direct_answer = None if lookup else fact_matcher.answer(user_query)
+        if direct_answer:
+            return direct_answer
+        facts_context = "\n\n".join(filter(None, [lookup.context() if lookup else "", fact_matcher.context(user_query)]))
+
+    # Step 1: Auto-select agent if needed
+    selected_agent = agent_choice
+    query_vector = None
+    if agent_choice == "Auto Detect":
+        if routed is None:
+            with span("route"):
+                routed = auto_select_agents(user_query)
+        selected_agents, query_vector = routed
+        selected_agents = selected_agents or ([fallback_agent] if fallback_agent else [])
+        if not selected_agents:
+            return "🤖 Could not auto-detect domain. Please select an agent manually."
+
+        # Cross-domain question: query all matched agents in parallel on the bundled datasets
+        if len(selected_agents) > 1:
+            try:
+                with span("fan_out", agents=len(selected_agents)):
+                    context = multi_agent_context(
+                        user_query,
+                        selected_agents,
+                        lambda name: get_agent(agent_handle(name)),
+                        timeout=get_settings().multi_agent_timeout,
+                        query_vector=query_vector,
+                    )
+            except Exception as e:
+                return f"❌ Error retrieving context: {str(e)}"
+            return gemini_answer(question, "\n\n".join(filter(None, [facts_context, context])), history)
+
+        selected_agent = selected_agents[0]
+
+    # Step 2: Initialize selected agent. Uploads are built in the background: until the
+    # build is done the answer is its progress (agents without a dataset ignore uploads)
+    handle = agent_handle(selected_agent)
+    if dataset_path and AGENT_REGISTRY.get(selected_agent, {}).get("default_path"):
+        try:
+            job = submit_upload(selected_agent, dataset_path)
+        except UploadRejected as e:
+            return f"❌ Upload rejected: {e}"
+        if job.status != "ready":
+            return job.describe()
+        handle = job.result
+
+    with span("get_agent", agent=agent_label(selected_agent)):
+        qa_agent = get_agent(handle)
+    if not qa_agent:
+        return f"❌ Failed to initialize {selected_agent}"
+
+    # Step 3: Retrieve domain-specific context
+    try:
+        with span("retrieve_context", agent=agent_label(selected_agent)):
+            if hasattr(qa_agent, 'retrieve_context'):
+                context = qa_agent.retrieve_context(user_query, query_vector=query_vector)
+            else:
+                context = qa_agent.run(user_query)
+    except Exception as e:
+        return f"❌ Error retrieving context: {str(e)}"
+
+    # Step 4: Use Gemini to generate final answer
+    return gemini_answer(question, "\n\n".join(filter(None, [facts_context, context])), history)
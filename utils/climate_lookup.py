@@ -0,0 +1,203 @@
+"""
+Exact cell lookups for year/month/season climate questions.
+
+"Mean temperature in July 1987" or "rainfall in Kerala in 1987 monsoon" each have exactly
+one correct cell in the bundled IMD tables. The query is parsed for years, months/seasons
+and a sub-division with precompiled patterns, and the values come straight from dicts
+keyed (year, period) and (sub-division, year, period), loaded once from the CSVs. No
+embedding, no vector search.
+"""
+import csv
+import os
+import re
+from dataclasses import dataclass, field
+
+from agents.registry import agent_name
+from utils import fact_table
+from utils.fact_table import PERIOD_NAMES, RAIN_SEASONS, RAIN_WORDS, TEMP_WORDS
+from utils.multi_agent import select_agents
+
+CLIMATE_AGENT = agent_name("climate")
+MAX_VALUES = 24  # more cells than this is a table question, not a lookup
+
+# Other names people use for IMD sub-divisions (values must match the CSV exactly)
+SUBDIVISION_ALIASES = {
+    "odisha": "Orissa", "marathwada": "Matathwada", "goa": "Konkan & Goa", "konkan": "Konkan & Goa",
+    "assam": "Assam & Meghalaya", "meghalaya": "Assam & Meghalaya",
+    "haryana": "Haryana Delhi & Chandigarh", "delhi": "Haryana Delhi & Chandigarh",
+    "chandigarh": "Haryana Delhi & Chandigarh", "sikkim": "Sub Himalayan West Bengal & Sikkim",
+    "saurashtra": "Saurashtra & Kutch", "kutch": "Saurashtra & Kutch", "andaman": "Andaman & Nicobar Islands",
+    "nagaland": "Naga Mani Mizo Tripura", "manipur": "Naga Mani Mizo Tripura",
+    "mizoram": "Naga Mani Mizo Tripura", "tripura": "Naga Mani Mizo Tripura",
+}
+# "since 2000" is every year from 2000 on, not the 2000 cell: no lookup at all
+OPEN_RANGE_WORDS = ["since", "after", "before", "until", "till", "onwards", "up to", "prior to"]
+# Aggregates and superlatives over the cells: the values go to the LLM, never as the answer.
+# "between" ranges are listed cell by cell, but the question usually wants them summarised
+AGGREGATE_WORDS = [
+    "average", "avg", "mean", "total", "sum", "trend", "wettest", "driest", "hottest", "coldest",
+    "warmest", "coolest", "highest", "lowest", "between", "compare", "compared", "change",
+]
+_QUANTITY_NAMES = re.compile(r"mean\s+(?:temp\w*|rain\w*)")  # "mean temperature" names the column
+
+HEAT_WORDS = TEMP_WORDS + ["hot", "cold", "warm", "cool", "°c", "celsius"]
+WET_WORDS = RAIN_WORDS + ["precipitation", "mm"]
+
+_MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+_PERIOD_LABELS = {
+    **{m: m.title() for m in _MONTHS}, "ANNUAL": "annual",
+    "JAN-FEB": "winter (Jan-Feb)", "MAR-MAY": "pre-monsoon (Mar-May)",
+    "JUN-SEP": "monsoon (Jun-Sep)", "OCT-DEC": "post-monsoon (Oct-Dec)",
+}
+
+
+def _alternation(phrases):
+    alternatives = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)")
+
+
+@dataclass
+class LookupResult:
+    lines: list = field(default_factory=list)   # "All-India mean temperature, Jul 1987: 27.49°C"
+    datasets: list = field(default_factory=list)
+    direct: bool = False                         # the query asks for nothing else (keywords say climate only)
+    complete: bool = True                        # the cells are the whole answer (no aggregate asked for)
+
+    def answer(self):
+        return "📊 " + "\n".join(self.lines) + f"\n\n*Source: exact lookup in {', '.join(self.datasets)}*"
+
+    def context(self):
+        return "Exact dataset values:\n" + "\n".join(f"- {line}" for line in self.lines)
+
+
+class ClimateLookup:
+    """In-memory keyed index over Mean_Temp, Mean_Seasonal and Sub_Division"""
+
+    def __init__(self, base_dir=fact_table.BASE_DIR):
+        self.temperature = {}   # (year, period) → (value, dataset)
+        self.rainfall = {}      # (sub-division, year, period) → (value, dataset)
+        for rel_path in (fact_table.MEAN_TEMP_CSV, fact_table.MEAN_SEASONAL_CSV):
+            for row, dataset in self._rows(base_dir, rel_path):
+                for period in _PERIOD_LABELS:
+                    if row.get(period) not in (None, "", "NA"):
+                        # Mean_Seasonal repeats Mean_Temp's seasonal columns; keep the first
+                        self.temperature.setdefault((int(row["YEAR"]), period), (row[period], dataset))
+        for row, dataset in self._rows(base_dir, fact_table.SUBDIVISION_CSV):
+            row = {RAIN_SEASONS.get(k, k): v for k, v in row.items()}
+            for period in _PERIOD_LABELS:
+                if row.get(period) not in (None, "", "NA"):
+                    self.rainfall[(row["SUBDIVISION"], int(row["YEAR"]), period)] = (row[period], dataset)
+
+        subdivisions = {subdivision for subdivision, _, _ in self.rainfall}
+        self._subdivision_names = {name.lower(): name for name in subdivisions}
+        self._subdivision_names.update(
+            {alias: name for alias, name in SUBDIVISION_ALIASES.items() if name in subdivisions}
+        )
+        self._subdivision_pattern = _alternation(self._subdivision_names)
+        self._period_patterns = [
+            (period, _alternation([a for a in aliases if a not in ("seasonal", "year")]))
+            for period, aliases in PERIOD_NAMES.items()
+        ]
+        self._open_range_pattern = _alternation(OPEN_RANGE_WORDS)
+        self._aggregate_pattern = _alternation(AGGREGATE_WORDS)
+        self._heat_pattern = _alternation(HEAT_WORDS)
+        self._wet_pattern = _alternation(WET_WORDS)
+        years = [year for year, _ in self.temperature] + [year for _, year, _ in self.rainfall]
+        self.first_year, self.last_year = (min(years), max(years)) if years else (0, 0)
+
+    @staticmethod
+    def _rows(base_dir, rel_path):
+        path = os.path.join(base_dir, rel_path)
+        if not os.path.exists(path):
+            return
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield {k.strip(): (v or "").strip() for k, v in row.items() if k}, os.path.basename(rel_path)
+
+    # ----------------------------------
+    # Query parsing
+    # ----------------------------------
+    def parse(self, user_query):
+        """(years, periods, sub-division or None, wants temperature, wants rainfall)"""
+        query = user_query.lower()
+        years = [int(y) for y in re.findall(r"(?<!\d)(\d{4})(?!\d)", query)]
+        years = list(dict.fromkeys(y for y in years if self.first_year <= y <= self.last_year))
+
+        # "from 1987 to 1990", "between 1987 and 1990", "1987-1990": every year in between
+        year_range = re.search(
+            r"(?:from|between)\s+(\d{4})\s*(?:-|–|to|and)\s*(\d{4})|(?<!\d)(\d{4})\s*[-–]\s*(\d{4})(?!\d)", query
+        )
+        if year_range:
+            start, end = sorted(int(y) for y in year_range.groups() if y)
+            years = [y for y in range(start, end + 1) if self.first_year <= y <= self.last_year]
+
+        # Seasons first, then blank them out so "jan-feb" does not also read as Jan and Feb
+        period_query, periods = re.sub(r"\d{4}", " ", query), []
+        for period, pattern in sorted(self._period_patterns, key=lambda item: "-" not in item[0]):
+            if pattern.search(period_query):
+                periods.append(period)
+                period_query = pattern.sub(" ", period_query)
+
+        subdivision = self._subdivision_pattern.search(query)
+        subdivision = self._subdivision_names[subdivision.group()] if subdivision else None
+        heat = bool(self._heat_pattern.search(query))
+        wet = bool(self._wet_pattern.search(query))
+        return years, periods or ["ANNUAL"], subdivision, heat, wet
+
+    # ----------------------------------
+    # Lookup
+    # ----------------------------------
+    def lookup(self, user_query):
+        """LookupResult with the exact values the query asks for, or None"""
+        query = user_query.lower()
+        if self._open_range_pattern.search(query):
+            return None
+        years, periods, subdivision, heat, wet = self.parse(user_query)
+        if not years or len(years) * len(periods) > MAX_VALUES:
+            return None
+
+        result = LookupResult()
+        # A place and a year alone are not a rainfall question ("tomato arrivals in Kerala in 2017")
+        if subdivision and wet and not heat:
+            for year in years:
+                for period in periods:
+                    cell = self.rainfall.get((subdivision, year, period))
+                    if cell:
+                        result.lines.append(f"{_PERIOD_LABELS[period]} rainfall in {subdivision}, {year}: {cell[0]} mm")
+                        result.datasets.append(cell[1])
+        elif heat and not subdivision:
+            for year in years:
+                for period in periods:
+                    cell = self.temperature.get((year, period))
+                    if cell:
+                        result.lines.append(f"All-India {_PERIOD_LABELS[period]} mean temperature, {year}: {cell[0]}°C")
+                        result.datasets.append(cell[1])
+        if not result.lines:
+            return None
+
+        result.datasets = list(dict.fromkeys(result.datasets))
+        result.complete = not self._aggregate_pattern.search(_QUANTITY_NAMES.sub(" ", query))
+        # Answer without the LLM only when the cells are the whole answer and the keywords pick
+        # climate and nothing else; with no keyword either way the caller decides (explicit
+        # agent choice or the router)
+        result.direct = result.complete and select_agents(user_query) == [CLIMATE_AGENT]
+        return result
+
+
+_lookup = None
+
+
+def get_climate_lookup():
+    """Shared lookup over the bundled IMD tables (built on first use)"""
+    global _lookup
+    if _lookup is None:
+        _lookup = ClimateLookup()
+    return _lookup
+
+
+def refresh_climate_lookup():
+    """Reload after the IMD CSVs change (no-op if never loaded)"""
+    global _lookup
+    if _lookup is not None:
+        _lookup = ClimateLookup()
+    return _lookup
@@ -0,0 +1,32 @@
+"""
+config.yaml, read once per process.
+
+Every module reads its section through `config_section`, so the environment overrides
+(HuggingFace Spaces secrets) apply everywhere and hot paths never re-parse the YAML.
+Edits to config.yaml take effect on restart.
+"""
+import os
+from functools import lru_cache
+
+import yaml
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CONFIG_PATH = os.path.join(BASE_DIR, "config.yaml")
+
+
+@lru_cache(maxsize=None)
+def load_config():
+    """config.yaml with environment overrides (HuggingFace Spaces secrets); treat as read-only"""
+    with open(CONFIG_PATH, "r") as f:
+        config = yaml.safe_load(f) or {}
+
+    config["google_api_key"] = os.environ.get("GOOGLE_API_KEY", config.get("google_api_key"))
+    data_gov = config.setdefault("data_gov", {}) or {}
+    data_gov["api_key"] = os.environ.get("DATA_GOV_API_KEY", data_gov.get("api_key"))
+    config["data_gov"] = data_gov
+    return config
+
+
+def config_section(name):
+    """One top-level section of the config ({} if absent); treat as read-only"""
+    return load_config().get(name, {}) or {}
@@ -0,0 +1,281 @@
+"""
+Bounded per-session conversation memory.
+
+Each session keeps its last few turns, a short summary of older ones and the entity
+filters already resolved (state, commodity, year, month/season). Follow-ups such as
+"and in Kerala?" are rewritten into standalone queries for routing and retrieval; the LLM
+gets the question as asked, the entities it left implicit and a capped slice of history. Sessions live in one
+server-side store with TTL and LRU eviction, so memory does not grow with traffic.
+"""
+import csv
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+
+from utils.config import config_section
+from utils.fact_table import MANDI_CSV, PERIOD_NAMES, commodity_aliases
+from utils.multi_agent import select_agents
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+STATES = [
+    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh", "Chattisgarh", "Goa",
+    "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka", "Kerala", "Madhya Pradesh",
+    "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Orissa", "Punjab",
+    "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand",
+    "Uttrakhand", "West Bengal", "Delhi", "Chandigarh", "Jammu and Kashmir", "Jammu & Kashmir",
+    "Ladakh", "Puducherry", "Lakshadweep", "Andaman & Nicobar Islands",
+]
+
+FOLLOW_UP_PREFIXES = (
+    "and ", "what about", "how about", "also", "same for", "same in", "compare with",
+    "vs ", "versus", "then ", "only ", "now ",
+)
+FOLLOW_UP_WORDS = {"it", "its", "there", "that", "those", "them", "these", "same", "instead"}
+# Words that add nothing to an elliptical follow-up ("and the same in Kerala instead?")
+_FILLER_WORDS = {"in", "for", "of", "the", "about", "at", "on", "same", "instead", "only", "there", "please"}
+
+# How a carried-over filter is phrased when it has to be appended to a query
+_PHRASES = {"state": "in {}", "commodity": "for {}", "year": "in {}"}
+
+
+def _phrase(kind, value, surface):
+    # Periods read best as the user wrote them ("monsoon", "in may"), not as column codes
+    return surface if kind == "period" else _PHRASES[kind].format(value)
+
+
+# ============================================================
+# 1️⃣ Entity extraction
+# ============================================================
+def _load_conversation_config():
+    return config_section("conversation")
+
+
+@lru_cache(maxsize=1)
+def _vocabulary():
+    """[(entity type, canonical value, compiled pattern)], longest surface forms first"""
+    entries = [("state", state, state.lower()) for state in STATES]
+
+    mandi_path = os.path.join(BASE_DIR, MANDI_CSV)
+    if os.path.exists(mandi_path):
+        with open(mandi_path, newline="", encoding="utf-8") as f:
+            commodities = sorted({row["Commodity"] for row in csv.DictReader(f) if row.get("Commodity")})
+        for commodity in commodities:
+            for alias in commodity_aliases(commodity):
+                if len(alias) > 2:
+                    entries.append(("commodity", commodity.split("(")[0].strip(), alias))
+
+    for period, aliases in PERIOD_NAMES.items():
+        if period == "ANNUAL":
+            continue
+        for alias in aliases:
+            if alias != "seasonal":
+                entries.append(("period", period, alias))
+
+    entries.sort(key=lambda entry: len(entry[2]), reverse=True)
+    return [(kind, value, re.compile(rf"(?<!\w){re.escape(surface)}(?!\w)")) for kind, value, surface in entries]
+
+
+def extract_entities(text):
+    """{entity type: (canonical value, surface text as written)} for the first match of each type"""
+    lowered = text.lower()
+    found, taken = {}, []
+    for kind, value, pattern in _vocabulary():
+        if kind in found:
+            continue
+        match = pattern.search(lowered)
+        if match and not any(match.start() < end and start < match.end() for start, end in taken):
+            found[kind] = (value, text[match.start():match.end()])
+            taken.append(match.span())
+
+    year = re.search(r"\b(?:18|19|20)\d{2}\b", text)
+    if year:
+        found["year"] = (year.group(), year.group())
+    return found
+
+
+def _is_follow_up(query):
+    lowered = query.lower().strip()
+    words = re.findall(r"\w+", lowered)
+    return (
+        lowered.startswith(FOLLOW_UP_PREFIXES)
+        or len(words) <= 4
+        or bool(FOLLOW_UP_WORDS.intersection(words))
+    )
+
+
+def _strip_connector(query):
+    return re.sub(r"^(?:and|also|then|now|what about|how about)\s+", "", query.strip(), flags=re.IGNORECASE)
+
+
+def _is_elliptical(query, entities):
+    """Nothing but a connector and entities ("and in Kerala?"): the last question, about something else"""
+    rest = _strip_connector(query).lower()
+    for _, surface in entities.values():
+        rest = re.sub(rf"(?<!\w){re.escape(surface.lower())}(?!\w)", " ", rest)
+    return not [word for word in re.findall(r"\w+", rest) if word not in _FILLER_WORDS]
+
+
+def resolved_question(query, standalone):
+    """The question as asked, plus the entities its standalone rewrite filled in (for the LLM)"""
+    named = extract_entities(query)
+    implicit = [
+        f"{kind} {value}" for kind, (value, _) in extract_entities(standalone).items() if kind not in named
+    ]
+    if standalone == query or not implicit:
+        return query
+    return f"{query}\n(From the conversation: {', '.join(implicit)})"
+
+
+# ============================================================
+# 2️⃣ Sessions and the store
+# ============================================================
+@dataclass
+class Turn:
+    query: str          # as typed
+    standalone: str     # after follow-up rewriting
+    answer: str         # truncated
+    entities: dict
+
+
+@dataclass
+class Session:
+    turns: deque
+    summary: deque
+    filters: dict = field(default_factory=dict)
+    updated: float = field(default_factory=time.time)
+
+
+class ConversationStore:
+    def __init__(self, max_turns=6, history_tokens=400, answer_chars=600, ttl_seconds=1800, max_sessions=1000):
+        self.max_turns = max_turns
+        self.history_tokens = history_tokens
+        self.answer_chars = answer_chars
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict(self, now):
+        # Sessions are kept in last-used order, so expired ones are at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.updated <= self.ttl_seconds and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.pop(session_id)
+
+    def _session(self, session_id, create=False):
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(session_id)
+            if session is None and create:
+                session = Session(turns=deque(maxlen=self.max_turns), summary=deque(maxlen=self.max_turns))
+                self._sessions[session_id] = session
+                self._evict(now)  # over max_sessions: drop the least recently used
+            if session is not None:
+                session.updated = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def clear(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    # ----------------------------------
+    # Follow-up rewriting
+    # ----------------------------------
+    def rewrite(self, session_id, query):
+        """Standalone version of `query` given the session's last turn and resolved filters"""
+        session = self._session(session_id)
+        if session is None or not session.turns or not _is_follow_up(query):
+            return query
+
+        previous = session.turns[-1]
+        entities = extract_entities(query)
+        refers_back = FOLLOW_UP_WORDS.intersection(re.findall(r"\w+", query.lower()))
+        if not entities and not refers_back and not query.lower().strip().startswith(FOLLOW_UP_PREFIXES):
+            return query  # a new short question ("hottest year on record"), nothing to resolve
+
+        carried = session.filters
+        if _is_elliptical(query, entities):
+            # Same question about something else: substitute the new entities into the last one
+            rewritten = previous.standalone.rstrip("?. ")
+            for kind, (value, surface) in list(entities.items()):
+                old = previous.entities.get(kind)
+                if old:
+                    replacement = surface if kind == "period" else value
+                    rewritten = re.sub(re.escape(old[1]), lambda _: replacement, rewritten, count=1, flags=re.IGNORECASE)
+                    entities.pop(kind)
+            for kind, (value, surface) in entities.items():
+                rewritten += " " + _phrase(kind, value, surface)
+            entities = extract_entities(rewritten)
+        else:
+            # A question of its own ("is it cheaper than in Kerala?"): keep it as asked and
+            # add the filters it leaves out; a new topic only carries the place and year over
+            rewritten = _strip_connector(query).rstrip("?. ")
+            if select_agents(query):
+                carried = {kind: v for kind, v in session.filters.items() if kind in ("state", "year")}
+
+        for kind, (value, surface) in carried.items():
+            if kind not in entities:
+                rewritten += " " + _phrase(kind, value, surface)
+        return rewritten + "?"
+
+    # ----------------------------------
+    # Recording turns / prompt history
+    # ----------------------------------
+    def add_turn(self, session_id, query, standalone, answer):
+        session = self._session(session_id, create=True)
+        entities = extract_entities(standalone)
+        with self._lock:
+            if len(session.turns) == session.turns.maxlen:
+                session.summary.append(session.turns[0].standalone[:120])
+            session.turns.append(Turn(query, standalone, answer[: self.answer_chars], entities))
+            session.filters = entities
+
+    def history_context(self, session_id):
+        """Recent turns (newest kept first) within `history_tokens` (~4 characters per token)"""
+        session = self._session(session_id)
+        if session is None or not session.turns:
+            return ""
+
+        budget = self.history_tokens * 4
+        lines = []
+        for turn in reversed(session.turns):
+            text = f"User: {turn.standalone}\nAssistant: {turn.answer}"
+            if len(text) > budget:
+                break
+            lines.insert(0, text)
+            budget -= len(text)
+
+        earlier = f"Earlier questions: {'; '.join(session.summary)}" if session.summary else ""
+        if earlier and len(earlier) <= budget:
+            lines.insert(0, earlier)
+        return "\n".join(lines)
+
+
+_store = None
+
+
+def get_conversation_store():
+    """Process-wide store configured from the `conversation` section of config.yaml"""
+    global _store
+    if _store is None:
+        config = _load_conversation_config()
+        _store = ConversationStore(
+            max_turns=config.get("max_turns", 6),
+            history_tokens=config.get("history_tokens", 400),
+            answer_chars=config.get("answer_chars", 600),
+            ttl_seconds=config.get("ttl_seconds", 1800),
+            max_sessions=config.get("max_sessions", 1000),
+        )
+    return _store
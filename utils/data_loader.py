@@ -1,10 +1,74 @@
 import pandas as pd
 import json, os, zipfile, io, pyarrow.parquet as pq
 
-def load_data(file_path):
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y"]
+
+
+def memory_mb(df):
+    """Deep memory footprint of a DataFrame in MB (string payloads included)"""
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def _parse_dates(col):
+    """(datetime column, format) if every value parses with one known format, else (None, None)"""
+    values = pd.Series(col.dropna().unique()).astype(str)  # a daily feed repeats few dates
+    for fmt in DATE_FORMATS:
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+        # Keep the format only if rendering it back reproduces the source text exactly
+        if len(values) and parsed.notna().all() and (parsed.dt.strftime(fmt) == values).all():
+            return pd.to_datetime(col, format=fmt), fmt
+    return None, None
+
+
+def compact_dtypes(df):
+    """
+    Shrink a freshly loaded frame in place: repetitive text columns (state, market,
+    commodity, ...) become categoricals, *date* columns become datetime64, and integer
+    columns (prices) are downcast to the smallest integer type that holds them. The source date format is
+    kept in df.attrs["date_formats"] so rows still render exactly as in the file.
+    """
+    date_formats = {}
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_integer_dtype(col) and not pd.api.types.is_bool_dtype(col):
+            # Floats are left alone: downcasting them would change how they render
+            df[name] = pd.to_numeric(col, downcast="integer")
+        elif pd.api.types.is_string_dtype(col) or col.dtype == object:
+            if "date" in name.lower():
+                parsed, fmt = _parse_dates(col)
+                if parsed is not None:
+                    df[name] = parsed
+                    date_formats[name] = fmt
+                    continue
+            if len(col) and col.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(col):
+                df[name] = col.astype("category")
+    df.attrs["date_formats"] = date_formats
+    return df
+
+
+def _column_text(df, name):
+    """Lazy str() of every value in one column, matching df.astype(str) without copying the frame"""
+    col = df[name]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        labels = [str(c) for c in col.cat.categories] + ["nan"]  # code -1 (missing) → "nan"
+        return (labels[code] for code in col.cat.codes.to_numpy())
+    fmt = df.attrs.get("date_formats", {}).get(name)
+    if fmt:
+        return (value.strftime(fmt) if not pd.isna(value) else "NaT" for value in col)
+    return (str(value) for value in col.tolist())
+
+
+def iter_row_text(df, sep=" | "):
+    """Yield each row as `sep`-joined text, one row at a time"""
+    return (sep.join(values) for values in zip(*(_column_text(df, name) for name in df.columns)))
+
+
+def load_data(file_path, compact=False):
     """
     Automatically loads CSV, Excel, JSON, Parquet, or ZIP (containing any of these)
-    Returns a pandas DataFrame
+    Returns a pandas DataFrame (with compact dtypes when `compact=True`)
     """
     ext = os.path.splitext(file_path)[1].lower()
 
@@ -53,4 +117,9 @@ def load_data(file_path):
 
     # Clean up column names
     df.columns = df.columns.str.strip().str.replace('\n', '_').str.replace(' ', '_')
+
+    if compact:
+        before = memory_mb(df)
+        compact_dtypes(df)
+        print(f"📉 {os.path.basename(file_path)}: {before:.1f} MB → {memory_mb(df):.1f} MB in memory")
     return df
@@ -0,0 +1,181 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+
+from utils.config import load_config
+
+
+def _load_config():
+    return load_config()
+
+
+_shared_embeddings = None
+
+
+def encoder_mode():
+    """`quantization.encoder` from config.yaml: "none" or "int8" (dynamic int8 Linear layers)"""
+    return ((_load_config().get("quantization", {}) or {}).get("encoder") or "none").lower()
+
+
+def quantize_encoder(embeddings):
+    """
+    Swap the encoder's Linear layers for dynamically quantized int8 versions (CPU only).
+    Works on HuggingFaceEmbeddings and on any embeddings object exposing a torch `model`.
+    """
+    import torch
+
+    module = getattr(embeddings, "_client", None) or getattr(embeddings, "model", None)
+    if not isinstance(module, torch.nn.Module):
+        raise ValueError(f"Cannot quantize {type(embeddings).__name__}: no torch module found")
+    torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return embeddings
+
+
+@lru_cache(maxsize=None)
+def _load_embeddings(model_name):
+    # Imported here: sentence-transformers/torch cost seconds and are only needed once an agent is built
+    from langchain_huggingface import HuggingFaceEmbeddings
+    embeddings = HuggingFaceEmbeddings(model_name=model_name)
+    if encoder_mode() == "int8":
+        quantize_encoder(embeddings)
+    return embeddings
+
+
+def get_embeddings(model_name=None):
+    """
+    Return the process-wide sentence embedding model.
+    Every agent and the query router share one instance, so the model is loaded once
+    and a query vector computed by the router can be reused for retrieval.
+    The model can be pinned to a local path with the KRISHI_EMBEDDING_MODEL env variable.
+    """
+    global _shared_embeddings
+    if model_name is None:
+        if _shared_embeddings is None:
+            _shared_embeddings = _load_embeddings(
+                os.environ.get("KRISHI_EMBEDDING_MODEL")
+                or _load_config().get("huggingface_model", "sentence-transformers/all-MiniLM-L6-v2")
+            )
+        return _shared_embeddings
+    return _load_embeddings(model_name)
+
+
+def set_embeddings(embeddings):
+    """Replace the shared model (benchmarks and offline runs inject a local/fake model here)"""
+    global _shared_embeddings
+    _shared_embeddings = embeddings
+
+
+class QueryBatcher:
+    """
+    Micro-batches single-query embedding calls from concurrent requests.
+    A background thread takes the first waiting query, gathers whatever else arrives within
+    `max_wait_ms` (up to `max_batch_size`), embeds them in one forward pass and hands each
+    vector back to its caller.
+    """
+
+    def __init__(self, embeddings, max_batch_size=32, max_wait_ms=3):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.queries = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="query-batcher")
+        self._thread.start()
+
+    def embed_query(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            try:
+                vectors = self.embeddings.embed_documents([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.queries += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+_batching = None
+
+
+def batching_settings():
+    """`embedding_batching` from config.yaml, read once: it is consulted on every query"""
+    global _batching
+    if _batching is None:
+        _batching = _load_config().get("embedding_batching", {}) or {}
+    return _batching
+
+
+def set_batching(**settings):
+    """Override `embedding_batching` (benchmarks compare batched and direct embedding here)"""
+    global _batching, _batcher
+    with _batcher_lock:
+        _batching, _batcher = settings, None
+
+
+def get_query_batcher():
+    """Batcher for the shared model, or None when `embedding_batching.enabled` is false"""
+    global _batcher
+    settings = batching_settings()
+    if not settings.get("enabled", False):
+        return None
+    embeddings = get_embeddings()
+    with _batcher_lock:
+        if _batcher is None or _batcher.embeddings is not embeddings:
+            _batcher = QueryBatcher(
+                embeddings,
+                max_batch_size=settings.get("max_batch_size", 32),
+                max_wait_ms=settings.get("max_wait_ms", 3),
+            )
+        return _batcher
+
+
+def embed_query(text):
+    """Embed one query with the shared model, micro-batched with concurrent requests if enabled"""
+    batcher = get_query_batcher()
+    if batcher is not None:
+        return batcher.embed_query(text)
+    return get_embeddings().embed_query(text)
+
+
+def is_shared_embeddings(embeddings):
+    """True if `embeddings` is the shared model (so router query vectors are compatible)"""
+    return embeddings is not None and embeddings is _shared_embeddings
+
+
+def similarity_search(vectorstore, query, k=4, query_vector=None):
+    """
+    Search a vectorstore, reusing a precomputed query vector when it came from the same
+    embedding model (e.g. the router already embedded the query); otherwise embed again.
+    """
+    if is_shared_embeddings(getattr(vectorstore, "embeddings", None)):
+        if query_vector is None:
+            query_vector = embed_query(query)
+        return vectorstore.similarity_search_by_vector(query_vector, k=k)
+    return vectorstore.similarity_search(query, k=k)
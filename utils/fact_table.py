@@ -0,0 +1,397 @@
+"""
+Precomputed summary facts for the bundled datasets.
+
+Questions like "hottest year on record" or "how many markets report onion" are answered
+from a small fact table instead of the embed → FAISS → Gemini round trip.
+
+Build the table offline with:
+    python -m utils.fact_table
+"""
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+BASE_DIR = os.path.join(os.path.dirname(__file__), "..")
+FACTS_PATH = os.path.join(BASE_DIR, "data", "facts.json")
+FACTS_VERSION = 2  # bump when the fact format changes, so saved tables are rebuilt
+
+MEAN_TEMP_CSV = "data/Mean_Temp_IMD_2017.csv"
+MEAN_SEASONAL_CSV = "data/Mean_Seasonal_IMD_2017.csv"
+SUBDIVISION_CSV = "data/Sub_Division_IMD_2017.csv"
+MANDI_CSV = "data/Current Daily Price of Various Commodities from Various Markets (Mandi).csv"
+
+SOURCES = [MEAN_TEMP_CSV, MEAN_SEASONAL_CSV, SUBDIVISION_CSV, MANDI_CSV]
+
+PERIOD_NAMES = {
+    "JAN": ["january", "jan"], "FEB": ["february", "feb"], "MAR": ["march"], "APR": ["april", "apr"],
+    "MAY": ["in may", "of may", "during may", "may month"], "JUN": ["june", "jun"], "JUL": ["july", "jul"], "AUG": ["august", "aug"],
+    "SEP": ["september", "sep", "sept"], "OCT": ["october", "oct"], "NOV": ["november", "nov"],
+    "DEC": ["december", "dec"],
+    "ANNUAL": ["annual", "year", "yearly"],
+    "JAN-FEB": ["jan-feb", "winter", "seasonal"], "MAR-MAY": ["mar-may", "summer", "pre-monsoon", "seasonal"],
+    "JUN-SEP": ["jun-sep", "monsoon", "seasonal"], "OCT-DEC": ["oct-dec", "post-monsoon", "seasonal"],
+}
+# Sub-division rainfall uses short season codes
+RAIN_SEASONS = {"JF": "JAN-FEB", "MAM": "MAR-MAY", "JJAS": "JUN-SEP", "OND": "OCT-DEC"}
+
+HOT_WORDS = ["hottest", "warmest", "highest temperature", "maximum temperature"]
+COLD_WORDS = ["coldest", "coolest", "lowest temperature", "minimum temperature"]
+WET_WORDS = ["wettest", "highest rainfall", "most rain", "maximum rainfall"]
+DRY_WORDS = ["driest", "lowest rainfall", "least rain", "minimum rainfall", "drought"]
+TREND_WORDS = ["trend", "warming", "change over", "increase", "decrease"]
+MEAN_WORDS = ["average", "mean", "normal"]
+COUNT_WORDS = ["how many", "number of", "count of"]
+YEAR_WORDS = ["year", "years"]
+TEMP_WORDS = ["temperature", "temperatures", "temp"]
+RAIN_WORDS = ["rain", "rains", "rainfall"]
+MARKET_WORDS = ["market", "markets", "mandi", "mandis"]
+PRICE_WORDS = ["price", "prices", "rate", "rates", "cost"]
+
+_ALIAS_STOPWORDS = {"common", "whole", "veg", "raw", "green", "other", "local"}
+
+# Qualifiers a precomputed fact cannot honour: numbers (years, decades, thresholds), ranges
+# and comparisons. Checked after the fact's own phrases are removed from the query.
+QUALIFIER_WORDS = [
+    "between", "before", "after", "since", "until", "till", "during the", "decade", "century",
+    "above", "below", "over", "under", "more than", "less than", "greater than", "higher than",
+    "lower than", "at least", "at most", "cheaper", "costlier", "compared", "compare", "vs", "versus",
+    "except", "excluding", "without", "only",
+]
+_QUALIFIER_PATTERN = re.compile(
+    r"\d|(?<!\w)(?:" + "|".join(re.escape(w) for w in sorted(QUALIFIER_WORDS, key=len, reverse=True)) + r")(?!\w)"
+)
+
+
+def _fact(dataset, match, text, direct=True, entity=None):
+    """
+    A fact matches a query when every group in `match` has at least one phrase in it.
+    `direct` facts may be returned as the answer without calling the LLM.
+    `entity` names the state, sub-division or commodity the fact is about (also in `match`).
+    """
+    return {"dataset": dataset, "match": match, "text": text, "direct": direct, "entity": entity or []}
+
+
+def _trend_per_decade(years, values):
+    mask = ~np.isnan(values)
+    if mask.sum() < 2:
+        return float("nan")
+    return float(np.polyfit(years[mask], values[mask], 1)[0] * 10)
+
+
+# ============================================================
+# 1️⃣ Per-dataset fact builders
+# ============================================================
+def _temperature_facts(df, dataset):
+    import pandas as pd
+
+    facts = []
+    years = df["YEAR"].to_numpy(dtype=float)
+    first, last = int(years.min()), int(years.max())
+
+    for column, names in PERIOD_NAMES.items():
+        if column not in df.columns:
+            continue
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+        hi, lo = int(np.nanargmax(values)), int(np.nanargmin(values))
+        period = "annual" if column == "ANNUAL" else column
+        # Annual facts should also match plain "hottest year" without naming the period
+        period_group = [] if column == "ANNUAL" else [names]
+        facts.append(_fact(
+            dataset, [HOT_WORDS, YEAR_WORDS] + period_group,
+            f"Warmest year on record ({period} all-India mean temperature, {first}-{last}): "
+            f"{int(years[hi])} at {values[hi]:.2f}°C.",
+        ))
+        facts.append(_fact(
+            dataset, [COLD_WORDS, YEAR_WORDS] + period_group,
+            f"Coldest year on record ({period} all-India mean temperature, {first}-{last}): "
+            f"{int(years[lo])} at {values[lo]:.2f}°C.",
+        ))
+        facts.append(_fact(
+            dataset, [MEAN_WORDS, TEMP_WORDS, names],
+            f"Long-term {period} all-India mean temperature ({first}-{last}): {np.nanmean(values):.2f}°C.",
+        ))
+        facts.append(_fact(
+            dataset, [TREND_WORDS, TEMP_WORDS] + period_group,
+            f"Trend in {period} all-India mean temperature ({first}-{last}): "
+            f"{_trend_per_decade(years, values):+.3f}°C per decade.",
+            direct=column == "ANNUAL",
+        ))
+    return facts
+
+
+def _subdivision_rainfall_facts(df, dataset):
+    import pandas as pd
+
+    facts = []
+    df = df.rename(columns=RAIN_SEASONS)
+    first, last = int(df["YEAR"].min()), int(df["YEAR"].max())
+
+    annual_means = df.groupby("SUBDIVISION")["ANNUAL"].mean().sort_values()
+    facts.append(_fact(
+        dataset, [WET_WORDS, ["subdivision", "sub-division", "region", "state"]],
+        f"Wettest sub-division by mean annual rainfall ({first}-{last}): "
+        f"{annual_means.index[-1]} ({annual_means.iloc[-1]:.1f} mm).",
+    ))
+    facts.append(_fact(
+        dataset, [DRY_WORDS, ["subdivision", "sub-division", "region", "state"]],
+        f"Driest sub-division by mean annual rainfall ({first}-{last}): "
+        f"{annual_means.index[0]} ({annual_means.iloc[0]:.1f} mm).",
+    ))
+    facts.append(_fact(
+        dataset, [COUNT_WORDS, ["subdivision", "sub-division", "meteorological"]],
+        f"The IMD rainfall dataset covers {df['SUBDIVISION'].nunique()} meteorological sub-divisions.",
+    ))
+
+    for subdivision, group in df.groupby("SUBDIVISION"):
+        name = [subdivision.lower()]
+        years = group["YEAR"].to_numpy(dtype=float)
+        for column in ["ANNUAL", "JUN-SEP"]:
+            values = pd.to_numeric(group[column], errors="coerce").to_numpy(dtype=float)
+            if np.isnan(values).all():
+                continue
+            hi, lo = int(np.nanargmax(values)), int(np.nanargmin(values))
+            label = "annual" if column == "ANNUAL" else "monsoon (JUN-SEP)"
+            period_group = [] if column == "ANNUAL" else [PERIOD_NAMES[column]]
+            facts.append(_fact(
+                dataset, [name, WET_WORDS, YEAR_WORDS] + period_group,
+                f"Wettest year for {label} rainfall in {subdivision}: {int(years[hi])} ({values[hi]:.1f} mm).",
+                entity=name,
+            ))
+            facts.append(_fact(
+                dataset, [name, DRY_WORDS, YEAR_WORDS] + period_group,
+                f"Driest year for {label} rainfall in {subdivision}: {int(years[lo])} ({values[lo]:.1f} mm).",
+                entity=name,
+            ))
+            facts.append(_fact(
+                dataset, [name, MEAN_WORDS, RAIN_WORDS] + period_group,
+                f"Mean {label} rainfall in {subdivision} ({first}-{last}): {np.nanmean(values):.1f} mm.",
+                entity=name,
+            ))
+            facts.append(_fact(
+                dataset, [name, TREND_WORDS, RAIN_WORDS] + period_group,
+                f"Trend in {label} rainfall in {subdivision} ({first}-{last}): "
+                f"{_trend_per_decade(years, values):+.1f} mm per decade.",
+                direct=False,
+                entity=name,
+            ))
+    return facts
+
+
+def commodity_aliases(commodity):
+    """'Paddy(Dhan)(Common)' → ['paddy(dhan)(common)', 'paddy', 'dhan']"""
+    aliases = [commodity.lower()]
+    head = commodity.split("(")[0].strip().lower()
+    if head:
+        aliases.append(head)
+    for part in re.findall(r"\(([^)]*)\)", commodity):
+        for alias in part.split("/"):
+            alias = alias.strip().lower()
+            if len(alias) > 2 and alias not in _ALIAS_STOPWORDS:
+                aliases.append(alias)
+    return list(dict.fromkeys(aliases))
+
+
+def _mandi_facts(df, dataset):
+    facts = []
+    date = df["Arrival_Date"].iloc[0] if "Arrival_Date" in df.columns else "latest snapshot"
+    modal = "Modal_x0020_Price"
+
+    for column, noun in [("State", "states"), ("District", "districts"), ("Market", "markets"),
+                         ("Commodity", "commodities")]:
+        facts.append(_fact(
+            dataset, [COUNT_WORDS, [noun]],
+            f"The mandi price snapshot ({date}) covers {df[column].nunique()} distinct {noun}.",
+        ))
+
+    for commodity, group in df.groupby("Commodity"):
+        aliases = commodity_aliases(commodity)
+        markets = group["Market"].nunique()
+        states = group["State"].nunique()
+        facts.append(_fact(
+            dataset, [aliases, COUNT_WORDS, MARKET_WORDS],
+            f"{markets} markets across {states} states report {commodity} prices on {date}.",
+            entity=aliases,
+        ))
+        cheapest = group.loc[group[modal].idxmin()]
+        dearest = group.loc[group[modal].idxmax()]
+        facts.append(_fact(
+            dataset, [aliases, PRICE_WORDS],
+            f"{commodity} modal price on {date}: mean ₹{group[modal].mean():.0f}/quintal across {markets} markets; "
+            f"lowest ₹{cheapest[modal]} at {cheapest['Market']} ({cheapest['State']}), "
+            f"highest ₹{dearest[modal]} at {dearest['Market']} ({dearest['State']}).",
+            direct=False,
+            entity=aliases,
+        ))
+
+    for state, group in df.groupby("State"):
+        facts.append(_fact(
+            dataset, [[state.lower()], COUNT_WORDS, MARKET_WORDS],
+            f"{group['Market'].nunique()} markets in {state} report prices for "
+            f"{group['Commodity'].nunique()} commodities on {date}.",
+            entity=[state.lower()],
+        ))
+    return facts
+
+
+# ============================================================
+# 2️⃣ Offline precompute
+# ============================================================
+def build_facts(base_dir=BASE_DIR):
+    """Read every bundled dataset and return the fact table (list of dicts)"""
+    # pandas is only needed when (re)building, not when serving the saved table
+    import pandas as pd
+
+    builders = [
+        (MEAN_TEMP_CSV, _temperature_facts),
+        (MEAN_SEASONAL_CSV, _temperature_facts),
+        (SUBDIVISION_CSV, _subdivision_rainfall_facts),
+        (MANDI_CSV, _mandi_facts),
+    ]
+    facts, seen = [], set()
+    for rel_path, builder in builders:
+        path = os.path.join(base_dir, rel_path)
+        if not os.path.exists(path):
+            continue
+        for fact in builder(pd.read_csv(path), os.path.basename(rel_path)):
+            # Mean_Seasonal repeats the seasonal columns of Mean_Temp; keep the first copy
+            if fact["text"] not in seen:
+                seen.add(fact["text"])
+                facts.append(fact)
+    return facts
+
+
+def _source_digests(base_dir=BASE_DIR):
+    """Content hashes of the source datasets (mtimes do not survive a git checkout)"""
+    digests = {}
+    for rel_path in SOURCES:
+        path = os.path.join(base_dir, rel_path)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digests[rel_path] = hashlib.sha1(f.read()).hexdigest()
+    return digests
+
+
+def save_facts(path=FACTS_PATH, base_dir=BASE_DIR):
+    facts = build_facts(base_dir)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": FACTS_VERSION, "sources": _source_digests(base_dir), "facts": facts}, f, ensure_ascii=False
+        )
+    return facts
+
+
+def load_facts(path=FACTS_PATH, base_dir=BASE_DIR):
+    """Load the precomputed table, rebuilding it if missing or older than its sources"""
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        if table.get("version") == FACTS_VERSION and table.get("sources") == _source_digests(base_dir):
+            return table["facts"]
+    return save_facts(path, base_dir)
+
+
+# ============================================================
+# 3️⃣ Matcher
+# ============================================================
+class FactMatcher:
+    """Matches queries against fact phrase groups with precompiled word-boundary regexes"""
+
+    def __init__(self, facts):
+        self.facts = facts
+        self._patterns = {}
+        self._compiled = [
+            [self._pattern(tuple(group)) for group in fact["match"]] for fact in facts
+        ]
+        # Every state, sub-division and commodity some fact is about
+        entities = sorted({phrase for fact in facts for phrase in fact.get("entity") or []})
+        self._entity_pattern = self._pattern(tuple(entities)) if entities else None
+
+    def _pattern(self, phrases):
+        if phrases not in self._patterns:
+            alternatives = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+            self._patterns[phrases] = re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)")
+        return self._patterns[phrases]
+
+    def match(self, user_query):
+        """Facts whose every phrase group occurs in the query, most specific first"""
+        query = user_query.lower()
+        hits = [
+            (len(groups), i)
+            for i, groups in enumerate(self._compiled)
+            if all(p.search(query) for p in groups)
+        ]
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        return [self.facts[i] for _, i in hits]
+
+    def named_entities(self, user_query):
+        """States, sub-divisions and commodities named in the query"""
+        if self._entity_pattern is None:
+            return set()
+        return set(self._entity_pattern.findall(user_query.lower()))
+
+    def qualified(self, user_query, fact):
+        """
+        True if the query narrows what it asks beyond the fact's own phrases: a year, decade,
+        range, threshold or comparison ("hottest year between 1950 and 1980")
+        """
+        remainder = user_query.lower()
+        for group in fact["match"]:
+            remainder = self._pattern(tuple(group)).sub(" ", remainder)
+        return bool(_QUALIFIER_PATTERN.search(remainder))
+
+    def answer(self, user_query):
+        """
+        Direct answer if exactly one, directly answerable fact is the most specific match, the
+        query names no state, sub-division or commodity that fact does not cover ("hottest
+        year in Kerala" is not answered by the all-India warmest year) and asks for no year,
+        range, threshold or comparison the fact does not match. Otherwise the fact only goes
+        to the LLM through context().
+        """
+        matched = self.match(user_query)
+        if not matched or not matched[0]["direct"]:
+            return None
+        top = len(matched[0]["match"])
+        best = [fact for fact in matched if len(fact["match"]) == top]
+        if len(best) != 1:
+            return None
+        fact = best[0]
+        covered = {phrase for group in fact["match"] for phrase in group}
+        if self.named_entities(user_query) - covered or self.qualified(user_query, fact):
+            return None
+        return f"📊 {fact['text']}\n\n*Source: precomputed facts from {fact['dataset']}*"
+
+    def context(self, user_query, limit=8):
+        """Matched facts formatted for injection into the LLM prompt"""
+        matched = self.match(user_query)[:limit]
+        if not matched:
+            return ""
+        return "Precomputed dataset facts:\n" + "\n".join(
+            f"- {fact['text']} (source: {fact['dataset']})" for fact in matched
+        )
+
+
+_matcher = None
+
+
+def get_fact_matcher():
+    """Shared matcher over the bundled datasets (built on first use)"""
+    global _matcher
+    if _matcher is None:
+        _matcher = FactMatcher(load_facts())
+    return _matcher
+
+
+def refresh_fact_matcher():
+    """Rebuild the table from changed sources and swap the matcher in (no-op if never loaded)"""
+    global _matcher
+    if _matcher is not None:
+        _matcher = FactMatcher(load_facts())
+    return _matcher
+
+
+if __name__ == "__main__":
+    facts = save_facts()
+    print(f"✅ Wrote {len(facts)} facts to {os.path.normpath(FACTS_PATH)}")
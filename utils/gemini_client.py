@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_genai(api_key):
+    """Import and configure the Gemini SDK once, on the first LLM call"""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(api_key, model_name):
+    """Shared GenerativeModel per (key, model) instead of one per request"""
+    return get_genai(api_key).GenerativeModel(model_name)
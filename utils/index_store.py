@@ -0,0 +1,330 @@
+"""
+On-disk vector indexes that several worker processes can share.
+
+Each index is a directory under data/indexes/:
+
+    vectors.faiss        FAISS index (flat float32, or float16 / int8 scalar-quantized),
+                         opened memory-mapped and read-only
+    chunks.bin           every chunk's text, UTF-8, back to back
+    chunks.offsets.npy   int64 offsets: chunk i is chunks.bin[offsets[i]:offsets[i + 1]]
+    meta.<key>.npy       per-chunk metadata column as small integer codes (-1 = missing)
+    manifest.json        chunk count, dimension, embedding model, source digest, build key
+                         and time, and the distinct values of each metadata column
+
+Nothing is unpickled and nothing is copied onto the heap at load time: N workers that
+open the same index share one physical copy through the page cache, and a search only
+touches the vectors it scans and the text and metadata of the hits it returns. Loading is
+safe for indexes built from user uploads (no allow_dangerous_deserialization).
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from utils.config import config_section
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+INDEX_ROOT = os.path.join(BASE_DIR, "data", "indexes")
+
+VECTORS_FILE = "vectors.faiss"
+CHUNKS_FILE = "chunks.bin"
+OFFSETS_FILE = "chunks.offsets.npy"
+MANIFEST_FILE = "manifest.json"
+
+
+# ============================================================
+# 1️⃣ Index location (keyed by source content, chunking and model)
+# ============================================================
+def _file_digest(path):
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _load_quantization_config():
+    return config_section("quantization")
+
+
+def vector_dtype():
+    """`quantization.vectors` from config.yaml: "float32", "float16" or "int8" """
+    return (_load_quantization_config().get("vectors") or "float32").lower()
+
+
+def quantize_index(index, dtype):
+    """
+    Re-encode a flat float32 index as a FAISS scalar-quantizer index: float16 halves the
+    vector memory, int8 quarters it (per-dimension ranges trained on the vectors themselves).
+    """
+    import faiss
+
+    if dtype == "float32":
+        return index
+    qtypes = {"float16": faiss.ScalarQuantizer.QT_fp16, "int8": faiss.ScalarQuantizer.QT_8bit}
+    if dtype not in qtypes:
+        raise ValueError(f"Unsupported vector dtype: {dtype}")
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+    quantized = faiss.IndexScalarQuantizer(index.d, qtypes[dtype], index.metric_type)
+    quantized.train(vectors)
+    quantized.add(vectors)
+    return quantized
+
+
+def embedding_model_name(embeddings):
+    return getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+def build_key(embeddings, params=""):
+    """Model + build params, without the source: builds with the same key supersede each other"""
+    return hashlib.sha1("\n".join([embedding_model_name(embeddings), str(params)]).encode("utf-8")).hexdigest()[:16]
+
+
+def index_dir(name, source_path, embeddings, params=""):
+    """Directory for `name` built from `source_path`; a new source, model or params → new index"""
+    key = hashlib.sha1(
+        "\n".join([_file_digest(source_path), embedding_model_name(embeddings), str(params)]).encode("utf-8")
+    ).hexdigest()[:16]
+    return os.path.join(INDEX_ROOT, f"{name}-{key}")
+
+
+# ============================================================
+# 2️⃣ Flat-file docstore
+# ============================================================
+def _metadata_columns(metadatas):
+    """[{key: value}] → {key: (int codes, distinct values)}; values must be JSON-serialisable"""
+    columns = {}
+    keys = sorted({key for metadata in metadatas for key in metadata})
+    for key in keys:
+        values, lookup = [], {}
+        codes = np.full(len(metadatas), -1, dtype=np.int64)
+        for i, metadata in enumerate(metadatas):
+            if key not in metadata:
+                continue
+            value = metadata[key]
+            marker = json.dumps(value, sort_keys=True)
+            if marker not in lookup:
+                lookup[marker] = len(values)
+                values.append(value)
+            codes[i] = lookup[marker]
+        dtype = np.int16 if len(values) < 2 ** 15 else np.int32 if len(values) < 2 ** 31 else np.int64
+        columns[key] = (codes.astype(dtype), values)
+    return columns
+
+
+class FlatFileDocstore:
+    """Read-only docstore over chunks.bin + offsets; a lookup decodes only the requested chunk"""
+
+    def __init__(self, path):
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r")
+        self._file = open(os.path.join(path, CHUNKS_FILE), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.metadata_columns = {
+            key: (np.load(os.path.join(path, f"meta.{key}.npy"), mmap_mode="r"), values)
+            for key, values in manifest.get("metadata", {}).items()
+        }
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def text(self, i):
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self._blob[start:end].decode("utf-8")
+
+    def metadata(self, i):
+        metadata = {}
+        for key, (codes, values) in self.metadata_columns.items():
+            code = int(codes[i])
+            if code >= 0:
+                metadata[key] = values[code]
+        return metadata
+
+    def search(self, search):
+        i = int(search)
+        if not 0 <= i < len(self):
+            return f"ID {search} not found."
+        return Document(page_content=self.text(i), metadata=self.metadata(i), id=str(i))
+
+    def texts(self):
+        return (self.text(i) for i in range(len(self)))
+
+
+class _PositionIds:
+    """index_to_docstore_id for stores where FAISS position i is chunk i (no per-chunk dict)"""
+
+    def __init__(self, count):
+        self.count = count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise KeyError(i)
+        return int(i)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(range(self.count))
+
+    def values(self):
+        return range(self.count)
+
+
+# ============================================================
+# 3️⃣ Save / load
+# ============================================================
+def save_index(path, index, texts, metadatas=None, embeddings=None, source_digest=None, source_path=None,
+               key=None):
+    """Write an index directory atomically; if another process got there first, keep theirs"""
+    import faiss
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".building-", dir=os.path.dirname(path))
+    try:
+        faiss.write_index(index, os.path.join(tmp, VECTORS_FILE))
+
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        with open(os.path.join(tmp, CHUNKS_FILE), "wb") as f:
+            for i, text in enumerate(texts):
+                data = text.encode("utf-8")
+                f.write(data)
+                offsets[i + 1] = offsets[i] + len(data)
+        np.save(os.path.join(tmp, OFFSETS_FILE), offsets)
+
+        columns = _metadata_columns(metadatas or [])
+        for key, (codes, _) in columns.items():
+            np.save(os.path.join(tmp, f"meta.{key}.npy"), codes)
+
+        with open(os.path.join(tmp, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "chunks": len(texts),
+                "dimension": index.d,
+                "embedding_model": embedding_model_name(embeddings) if embeddings is not None else None,
+                "source_digest": source_digest,
+                "source_path": os.path.abspath(source_path) if source_path else None,
+                "build_key": key,
+                "built_at": time.time(),
+                "metadata": {key: values for key, (_, values) in columns.items()},
+            }, f, indent=2)
+
+        os.rename(tmp, path)
+    except OSError:
+        if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+def save_vectorstore(path, vectorstore, source_digest=None):
+    """Persist an in-memory LangChain FAISS store (chunks in index order) to the flat format"""
+    docs = [vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]) for i in range(vectorstore.index.ntotal)]
+    return save_index(
+        path,
+        vectorstore.index,
+        [doc.page_content for doc in docs],
+        metadatas=[doc.metadata for doc in docs],
+        embeddings=vectorstore.embeddings,
+        source_digest=source_digest,
+    )
+
+
+def load_index(path, embeddings, mmap_vectors=True):
+    """Open an index directory as a LangChain FAISS vectorstore backed by memory-mapped files"""
+    import faiss
+    from langchain_community.vectorstores import FAISS
+
+    # IO_FLAG_MMAP_IFC (faiss >= 1.10) maps any index type; older builds only have IO_FLAG_MMAP
+    mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    flags = mmap_flag | faiss.IO_FLAG_READ_ONLY if mmap_vectors else 0
+    index = faiss.read_index(os.path.join(path, VECTORS_FILE), flags)
+    docstore = FlatFileDocstore(path)
+    return FAISS(embeddings, index, docstore, _PositionIds(len(docstore)))
+
+
+def is_index(path):
+    return os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def _manifest(path):
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def prune_indexes(name, source_path, keep):
+    """
+    Remove builds that `keep` supersedes: same source path and build key (model + params),
+    built before it. Builds with other settings stay, so switching configs back and forth
+    does not re-embed. Processes still serving a removed build keep working: their mapped
+    files stay valid until closed (POSIX); where deletion fails, skip it.
+    """
+    if not os.path.isdir(INDEX_ROOT):
+        return
+    try:
+        current = _manifest(keep)
+    except (OSError, ValueError):
+        return
+    if not current.get("build_key"):
+        return
+    source_path = os.path.abspath(source_path)
+    for entry in os.listdir(INDEX_ROOT):
+        path = os.path.join(INDEX_ROOT, entry)
+        if path == keep or not entry.startswith(f"{name}-") or not is_index(path):
+            continue
+        try:
+            manifest = _manifest(path)
+            if (
+                manifest.get("source_path") != source_path
+                or manifest.get("build_key") != current["build_key"]
+                or manifest.get("built_at", 0) >= current.get("built_at", 0)
+            ):
+                continue
+            shutil.rmtree(path)
+        except (OSError, ValueError):
+            pass
+
+
+def get_or_build_index(name, source_path, embeddings, make_chunks, params="", batch_size=None):
+    """
+    Load the shared on-disk index for `source_path`, building it first if needed.
+    `make_chunks()` returns chunk texts or Documents (to keep their metadata); it is only
+    called on a cache miss. `batch_size` overrides `index_build.batch_size`.
+    """
+    from utils.embeddings import encoder_mode
+    from utils.parallel_embed import build_index
+    from utils.tracing import span
+
+    dtype = vector_dtype()
+    params = f"{params};vectors={dtype};encoder={encoder_mode()}"
+    path = index_dir(name, source_path, embeddings, params)
+    if not is_index(path):
+        docs = [c if isinstance(c, Document) else Document(page_content=c) for c in make_chunks()]
+        texts = [doc.page_content for doc in docs]
+        with span("embed_index", agent=name, chunks=len(texts)):
+            index = quantize_index(build_index(texts, embeddings, label=name, batch_size=batch_size), dtype)
+        save_index(
+            path,
+            index,
+            texts,
+            metadatas=[doc.metadata for doc in docs],
+            embeddings=embeddings,
+            source_digest=_file_digest(source_path),
+            source_path=source_path,
+            key=build_key(embeddings, params),
+        )
+        del index  # serve from the mapped files, like every other worker
+        prune_indexes(name, source_path, keep=path)
+
+    with span("load_index", agent=name):
+        return load_index(path, embeddings)
@@ -0,0 +1,75 @@
+"""
+Background rebuilds when dataset files change.
+
+A daemon thread polls the (mtime, size) of the files the live agents were built from.
+A change is acted on once it has been stable for one more poll (so a file that is still
+being copied is not indexed half-written); the rebuild then runs on a single background
+thread, off the request path, and the caller swaps the result in.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class IndexWatcher:
+    def __init__(self, watched, interval=5.0):
+        """`watched()` returns {path: callback}; callback(path) is run after the file changes"""
+        self.watched = watched
+        self.interval = interval
+        self.rebuilds = 0
+        self.errors = {}
+        self._seen = {}
+        self._candidate = {}
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-rebuild")
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="index-watcher")
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _rebuild(self, callback, path):
+        try:
+            callback(path)
+            self.rebuilds += 1
+            self.errors.pop(path, None)
+        except Exception as e:
+            self.errors[path] = str(e)
+            print(f"❌ Background rebuild failed for {path}: {e}")
+
+    def poll(self):
+        for path, callback in self.watched().items():
+            signature = _signature(path)
+            if path not in self._seen:
+                self._seen[path] = signature  # baseline: the agent was just built from this
+                continue
+            if signature == self._seen[path] or signature is None:
+                self._candidate.pop(path, None)
+                continue
+            if self._candidate.get(path) != signature:
+                self._candidate[path] = signature  # changed; wait one poll for it to settle
+                continue
+
+            self._seen[path] = signature
+            del self._candidate[path]
+            print(f"🔄 {os.path.basename(path)} changed, rebuilding in the background")
+            self._pool.submit(self._rebuild, callback, path)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"❌ Index watcher error: {e}")
@@ -0,0 +1,99 @@
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from agents.registry import AGENT_REGISTRY, routing
+from utils.tracing import span, agent_label
+
+# Keyword lists per agent (`routing.keywords` in config.yaml), in priority order
+# (first match wins for single-agent routing)
+AGENT_KEYWORDS = {
+    agent_name: routing(agent_name)["keywords"]
+    for agent_name in AGENT_REGISTRY
+    if routing(agent_name)["keywords"]
+}
+
+# Keywords must start a word, so "grain" does not count as "rain"
+_KEYWORD_PATTERNS = {
+    agent_name: re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + ")")
+    for agent_name, words in AGENT_KEYWORDS.items()
+}
+
+# Shared pool so a timed-out agent never blocks the caller on shutdown
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="agent-fanout")
+
+
+def select_agents(user_query, max_agents=3):
+    """Return every agent whose keywords appear in the query, in priority order"""
+    query = user_query.lower()
+    matched = [
+        agent_name
+        for agent_name, pattern in _KEYWORD_PATTERNS.items()
+        if pattern.search(query)
+    ]
+    return matched[:max_agents]
+
+
+def _retrieve(get_agent, agent_name, user_query, query_vector=None):
+    """Build (or fetch from cache) one agent and pull its context"""
+    with span("get_agent", agent=agent_label(agent_name)):
+        qa_agent = get_agent(agent_name)
+    if not qa_agent:
+        raise RuntimeError(f"Failed to initialize {agent_name}")
+
+    with span("retrieve_context", agent=agent_label(agent_name)):
+        if hasattr(qa_agent, 'retrieve_context'):
+            return qa_agent.retrieve_context(user_query, query_vector=query_vector)
+        return qa_agent.run(user_query)
+
+
+def fan_out_retrieve(user_query, agent_names, get_agent, timeout=20, query_vector=None):
+    """
+    Run retrieval for several agents in parallel on a thread pool.
+    Each agent gets `timeout` seconds from the moment the fan-out starts, so total
+    latency tracks the slowest agent rather than the sum of all of them.
+    Returns {agent_name: context} for agents that answered and {agent_name: error} for the rest.
+    """
+    # Each task runs in a copy of the caller's context so its spans keep the request's trace id
+    futures = {
+        _executor.submit(
+            contextvars.copy_context().run, _retrieve, get_agent, agent_name, user_query, query_vector
+        ): agent_name
+        for agent_name in agent_names
+    }
+    done, not_done = wait(futures, timeout=timeout)
+
+    contexts, errors = {}, {}
+    for future in done:
+        agent_name = futures[future]
+        try:
+            contexts[agent_name] = future.result()
+        except Exception as e:
+            errors[agent_name] = str(e)
+
+    for future in not_done:
+        future.cancel()
+        errors[futures[future]] = f"timed out after {timeout}s"
+
+    return contexts, errors
+
+
+def merge_contexts(contexts, agent_names, errors=None):
+    """Merge per-agent contexts into one prompt context, keeping routing order"""
+    sections = []
+    for agent_name in agent_names:
+        if agent_name in contexts:
+            sections.append(f"### {agent_name}\n{contexts[agent_name]}")
+        elif errors and agent_name in errors:
+            sections.append(f"### {agent_name}\n(No data: {errors[agent_name]})")
+    return "\n\n".join(sections)
+
+
+def multi_agent_context(user_query, agent_names, get_agent, timeout=20, query_vector=None):
+    """Fan out to the given agents and return a single merged context string"""
+    contexts, errors = fan_out_retrieve(
+        user_query, agent_names, get_agent, timeout=timeout, query_vector=query_vector
+    )
+    if not contexts:
+        raise RuntimeError("; ".join(f"{name}: {err}" for name, err in errors.items()))
+    return merge_contexts(contexts, agent_names, errors)
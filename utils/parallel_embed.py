@@ -0,0 +1,156 @@
+"""
+Parallel document embedding for index builds.
+
+Chunks are split into batches and sharded across a process pool; every worker process
+loads one copy of the embedding model (in its initializer) and embeds whole batches. The
+parent streams finished batches into the FAISS index in chunk order as they arrive, so
+index position i is still chunk i, and only a bounded number of batches are in flight.
+"""
+import contextvars
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+
+import numpy as np
+
+from utils.config import config_section
+
+_worker_embeddings = None
+
+# Background jobs set this to a callable(done, total) to follow a build they started
+build_progress = contextvars.ContextVar("build_progress", default=None)
+
+
+def _load_build_config():
+    return config_section("index_build")
+
+
+# ============================================================
+# 1️⃣ Worker side
+# ============================================================
+def _restore(payload):
+    return pickle.loads(payload)
+
+
+def embeddings_factory(embeddings):
+    """
+    Picklable zero-argument callable that recreates `embeddings` in a worker process,
+    or None if it cannot be shipped (the build then runs in-process).
+    """
+    from utils.embeddings import _load_embeddings
+
+    if type(embeddings).__name__ == "HuggingFaceEmbeddings":
+        return partial(_load_embeddings, embeddings.model_name)
+    try:
+        return partial(_restore, pickle.dumps(embeddings))
+    except Exception:
+        return None
+
+
+def _init_worker(factory, threads):
+    global _worker_embeddings
+    _worker_embeddings = factory()
+    if "torch" in sys.modules:
+        # Split the cores between workers instead of every worker using all of them
+        sys.modules["torch"].set_num_threads(threads)
+
+
+def _embed_batch(start, texts):
+    return start, _worker_embeddings.embed_documents(texts)
+
+
+# ============================================================
+# 2️⃣ Parent side
+# ============================================================
+class _Progress:
+    def __init__(self, label, total, every=2.0):
+        self.label, self.total, self.every = label, total, every
+        self.done = 0
+        self.start = self.last = time.perf_counter()
+
+    def update(self, count):
+        self.done += count
+        callback = build_progress.get()
+        if callback:
+            callback(self.done, self.total)
+        now = time.perf_counter()
+        if now - self.last >= self.every or self.done == self.total:
+            self.last = now
+            rate = self.done / max(now - self.start, 1e-9)
+            print(f"⏳ Embedding {self.label}: {self.done}/{self.total} chunks ({rate:.1f}/s)", flush=True)
+
+
+def _new_index(dim):
+    import faiss
+    return faiss.IndexFlatL2(dim)
+
+
+def _empty_index(embeddings):
+    return _new_index(len(embeddings.embed_query("")))
+
+
+def build_index(texts, embeddings, label="index", workers=None, batch_size=None, progress=True):
+    """
+    Embed `texts` and return a flat L2 FAISS index whose position i is texts[i].
+    `workers` defaults to `index_build.workers` (0 = one per CPU core); small corpora and
+    models that cannot be shipped to worker processes are embedded in-process.
+    """
+    config = _load_build_config()
+    workers = workers if workers is not None else config.get("workers", 0)
+    workers = workers or os.cpu_count() or 1
+    batch_size = batch_size or config.get("batch_size", 64)
+    min_parallel = config.get("min_chunks_for_parallel", 512)
+
+    tracker = _Progress(label, len(texts)) if progress else None
+    batches = [(start, texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)]
+    factory = embeddings_factory(embeddings) if workers > 1 and len(texts) >= min_parallel else None
+
+    index = None
+    if factory is None:
+        for start, batch in batches:
+            vectors = np.asarray(embeddings.embed_documents(batch), dtype=np.float32)
+            if index is None:
+                index = _new_index(vectors.shape[1])
+            index.add(vectors)
+            if tracker:
+                tracker.update(len(batch))
+        return index if index is not None else _empty_index(embeddings)
+
+    import multiprocessing as mp
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    pending, next_start, queue = {}, 0, iter(batches)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(factory, threads),
+    ) as pool:
+        in_flight = set()
+        for _ in range(workers * 2):
+            item = next(queue, None)
+            if item:
+                in_flight.add(pool.submit(_embed_batch, *item))
+
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                start, vectors = future.result()
+                pending[start] = np.asarray(vectors, dtype=np.float32)
+                item = next(queue, None)
+                if item:
+                    in_flight.add(pool.submit(_embed_batch, *item))
+
+            # Stream every batch that is now contiguous with the index into it
+            while next_start in pending:
+                vectors = pending.pop(next_start)
+                if index is None:
+                    index = _new_index(vectors.shape[1])
+                index.add(vectors)
+                next_start += len(vectors)
+                if tracker:
+                    tracker.update(len(vectors))
+    return index if index is not None else _empty_index(embeddings)
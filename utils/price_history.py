@@ -0,0 +1,292 @@
+"""
+Append-only history of daily mandi price snapshots.
+
+The mandi feed is one day per file. Each snapshot is ingested into a Parquet store
+partitioned by arrival date and state:
+
+    data/mandi_history/date=2025-10-31/state=Maharashtra/part.parquet
+
+Re-ingesting a day merges into its partitions, deduplicated on (market, commodity,
+variety, grade, date) with the newest snapshot winning. Range scans only open the
+partitions in the requested dates/states and only read the requested columns, so a
+7-day trend for one state reads a handful of small files, not the whole history.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import pandas as pd
+
+from utils.config import config_section
+from utils.data_loader import load_data
+
+try:
+    import fcntl
+except ImportError:  # Windows: only writers in this process are serialised
+    fcntl = None
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PART_FILE = "part.parquet"
+INGESTED_FILE = "_ingested.json"
+LOCK_FILE = ".lock"
+
+DATE_COLUMN = "Arrival_Date"
+STATE_COLUMN = "State"
+KEY_COLUMNS = ["Market", "Commodity", "Variety", "Grade"]  # + the date partition
+MODAL_PRICE = "Modal_x0020_Price"
+
+_ingest_lock = threading.Lock()
+
+
+def _load_history_config():
+    return config_section("price_history")
+
+
+def history_enabled():
+    return bool(_load_history_config().get("enabled", False))
+
+
+def history_root():
+    return os.path.join(BASE_DIR, _load_history_config().get("root", "data/mandi_history"))
+
+
+def _partition_dir(root, date, state):
+    return os.path.join(root, f"date={date:%Y-%m-%d}", f"state={quote(str(state), safe='')}")
+
+
+# ============================================================
+# 1️⃣ Ingest
+# ============================================================
+def _file_digest(path):
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _write_partition(path, frame):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(path, exist_ok=True)
+    tmp = os.path.join(path, f".{PART_FILE}.{os.getpid()}.tmp")
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp, compression="zstd")
+    os.replace(tmp, os.path.join(path, PART_FILE))  # readers see the old or the new file
+
+
+@contextmanager
+def _store_lock(root):
+    """Serialise writers across threads and worker processes (flock on root/.lock)"""
+    with _ingest_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(root, exist_ok=True)
+        with open(os.path.join(root, LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def ingest_snapshot(file_path, root=None):
+    """
+    Add one snapshot file to the store; returns the number of rows ingested, or 0 if this
+    exact file content was ingested before.
+    """
+    import pyarrow.parquet as pq
+
+    root = root or history_root()
+    digest = _file_digest(file_path)
+    # Partitions and _ingested.json are read-merge-written: one writer at a time, across workers
+    with _store_lock(root):
+        ingested_path = os.path.join(root, INGESTED_FILE)
+        ingested = {}
+        if os.path.exists(ingested_path):
+            with open(ingested_path, "r", encoding="utf-8") as f:
+                ingested = json.load(f)
+        if digest in ingested:
+            return 0
+
+        df = load_data(file_path, compact=True)
+        df = df.dropna(subset=[DATE_COLUMN, STATE_COLUMN])
+        for (date, state), rows in df.groupby([DATE_COLUMN, STATE_COLUMN], observed=True, sort=False):
+            # Plain strings in the file: Parquet dictionary-encodes them on its own
+            rows = rows.drop(columns=[DATE_COLUMN, STATE_COLUMN])
+            rows = rows.astype({c: str for c in rows.columns if isinstance(rows[c].dtype, pd.CategoricalDtype)})
+            path = _partition_dir(root, date, state)
+            existing = os.path.join(path, PART_FILE)
+            if os.path.exists(existing):
+                rows = pd.concat([pq.read_table(existing).to_pandas(), rows], ignore_index=True)
+            rows = rows.drop_duplicates(subset=[c for c in KEY_COLUMNS if c in rows], keep="last")
+            _write_partition(path, rows)
+
+        ingested[digest] = {"path": os.path.abspath(file_path), "rows": int(len(df))}
+        os.makedirs(root, exist_ok=True)
+        with open(ingested_path, "w", encoding="utf-8") as f:
+            json.dump(ingested, f, indent=2)
+    print(f"🗄️ Ingested {len(df)} rows from {os.path.basename(file_path)} into the price history")
+    return len(df)
+
+
+# ============================================================
+# 2️⃣ Range scans and rolling aggregates
+# ============================================================
+def _partition_files(root, start=None, end=None, states=None):
+    """Parquet files for the wanted dates/states, found from directory names alone"""
+    state_dirs = {f"state={quote(str(state), safe='')}" for state in states} if states else None
+    files = []
+    for date_dir in os.listdir(root):
+        if not date_dir.startswith("date="):
+            continue
+        date = pd.Timestamp(date_dir[len("date="):])
+        if (start is not None and date < start) or (end is not None and date > end):
+            continue
+        for state_dir in state_dirs or os.listdir(os.path.join(root, date_dir)):
+            path = os.path.join(root, date_dir, state_dir, PART_FILE)
+            if os.path.exists(path):
+                files.append(path)
+    return files
+
+
+def _dataset(root, files):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(pa.schema([("date", pa.date32()), ("state", pa.string())]), flavor="hive")
+    return ds.dataset(files, format="parquet", partitioning=partitioning, partition_base_dir=root)
+
+
+def has_history(root=None):
+    root = root or history_root()
+    return os.path.isdir(root) and any(name.startswith("date=") for name in os.listdir(root))
+
+
+def available_dates(root=None):
+    """Sorted ingested dates, read from the partition directory names only"""
+    root = root or history_root()
+    if not os.path.isdir(root):
+        return []
+    return sorted(pd.Timestamp(name[len("date="):]) for name in os.listdir(root) if name.startswith("date="))
+
+
+def scan(start=None, end=None, states=None, commodities=None, columns=None, root=None):
+    """
+    Rows with start <= Arrival_Date <= end (dates inclusive, None = open), optionally for
+    some states and commodities, as a DataFrame with the snapshot's column names.
+    """
+    import pyarrow.dataset as ds
+
+    root = root or history_root()
+    if not has_history(root):
+        return pd.DataFrame()
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    files = _partition_files(root, start, end, states)
+    if not files:
+        return pd.DataFrame()
+    condition = ds.field("Commodity").isin(list(commodities)) if commodities else None
+
+    if columns is not None:
+        columns = list(dict.fromkeys(["date", "state", *[c for c in columns if c not in (DATE_COLUMN, STATE_COLUMN)]]))
+    table = _dataset(root, files).to_table(columns=columns, filter=condition)
+    df = table.to_pandas().rename(columns={"date": DATE_COLUMN, "state": STATE_COLUMN})
+    df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN])
+    return df
+
+
+def _matches_commodity(names, commodity):
+    """Which of `names` are `commodity`, by full name or by the part before "(" """
+    wanted = commodity.lower()
+    return [name for name in names if name.lower() == wanted or name.split("(")[0].strip().lower() == wanted]
+
+
+def rolling_modal_price(days=7, end=None, commodity=None, state=None, root=None):
+    """
+    Modal price per (commodity, state) over the `days` days ending at `end` (default: the
+    latest ingested date): daily mean across markets, then avg/min/max over the window,
+    the latest day's value and its change against the first day in the window.
+    """
+    root = root or history_root()
+    dates = available_dates(root)
+    if not dates:
+        return pd.DataFrame()
+    end = pd.Timestamp(end) if end is not None else dates[-1]
+    start = end - pd.Timedelta(days=days - 1)
+
+    rows = scan(start, end, states=[state] if state else None, columns=["Commodity", MODAL_PRICE], root=root)
+    if commodity and not rows.empty:
+        rows = rows[rows["Commodity"].isin(_matches_commodity(rows["Commodity"].unique(), commodity))]
+    if rows.empty:
+        return rows
+
+    daily = rows.groupby(["Commodity", STATE_COLUMN, DATE_COLUMN], observed=True)[MODAL_PRICE].mean()
+    daily = daily.reset_index().sort_values(DATE_COLUMN)
+    summary = daily.groupby(["Commodity", STATE_COLUMN], observed=True).agg(
+        days=(DATE_COLUMN, "nunique"),
+        first_date=(DATE_COLUMN, "first"),
+        last_date=(DATE_COLUMN, "last"),
+        avg_modal=(MODAL_PRICE, "mean"),
+        min_modal=(MODAL_PRICE, "min"),
+        max_modal=(MODAL_PRICE, "max"),
+        first_modal=(MODAL_PRICE, "first"),
+        latest_modal=(MODAL_PRICE, "last"),
+    ).reset_index()
+    summary["change_pct"] = (summary["latest_modal"] / summary["first_modal"] - 1) * 100
+    return summary.drop(columns="first_modal")
+
+
+# ============================================================
+# 3️⃣ Retrieval context for the agriculture agent
+# ============================================================
+def trend_context(query, max_rows=10, root=None):
+    """
+    Rolling modal-price lines for the commodity (and state) named in `query`; "" when the
+    store holds fewer than two days or the query names no commodity.
+    """
+    from utils.conversation import extract_entities
+
+    config = _load_history_config()
+    root = root or history_root()
+    if len(available_dates(root)) < 2:
+        return ""
+
+    entities = extract_entities(query)
+    if "commodity" not in entities:
+        return ""
+    state = entities.get("state", (None,))[0]
+    days = config.get("rolling_days", 7)
+    summary = rolling_modal_price(days=days, commodity=entities["commodity"][0], state=state, root=root)
+    if summary.empty:
+        return ""
+
+    summary = summary.sort_values("days", ascending=False, kind="stable").head(max_rows)
+    lines = [f"{days}-day modal price trend (Rs./quintal, daily mean across markets):"]
+    for row in summary.itertuples(index=False):
+        lines.append(
+            f"- {row.Commodity}, {row.State}: avg {row.avg_modal:.0f} over {row.days} day(s) "
+            f"{row.first_date:%d/%m/%Y}-{row.last_date:%d/%m/%Y} (min {row.min_modal:.0f}, max {row.max_modal:.0f}), "
+            f"latest {row.latest_modal:.0f} ({row.change_pct:+.1f}% vs first day)"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mandi price history store")
+    parser.add_argument("snapshots", nargs="*", help="daily snapshot files to ingest")
+    parser.add_argument("--commodity", help="print the rolling modal price for this commodity")
+    parser.add_argument("--state")
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    for snapshot in args.snapshots:
+        ingest_snapshot(snapshot)
+    if args.commodity:
+        print(rolling_modal_price(days=args.days, commodity=args.commodity, state=args.state).to_string(index=False))
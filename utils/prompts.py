@@ -0,0 +1,296 @@
+"""
+Deterministic prompt templates for every LLM call.
+
+Prompts are assembled static-first: the template's instructions, then any configured
+static dataset context (schemas, precomputed facts), then the per-request parts (conversation, retrieved
+context, question). Every piece is dedented and whitespace-normalised, so a template's
+prefix is byte-identical across requests and the provider can reuse it: Gemini caches
+repeated prefixes implicitly, and with `prompts.context_cache` enabled the static prefix
+is uploaded once as explicit cached content and only the suffix is sent per request.
+Each call records its prompt, cached and trimmed token counts on the `generate_content`
+span; `token_savings()` sums them for the process (served on /healthz and /metrics).
+"""
+import hashlib
+import os
+import re
+import textwrap
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+
+from utils.config import config_section
+from utils.gemini_client import get_chat_model, get_genai
+from utils.tracing import span, tracer
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+ANSWER_INSTRUCTIONS = """
+You are an AI assistant for smart agriculture - KrishiSutra.
+Use the context to answer the question accurately.
+Provide a concise, factual, and human-readable answer.
+"""
+AGENT_INSTRUCTIONS = "Provide a concise answer based on the context."
+
+
+def _load_prompts_config():
+    return config_section("prompts")
+
+
+def clean(text):
+    """Dedent, strip trailing spaces and collapse blank-line runs (byte-stable output)"""
+    text = textwrap.dedent(str(text or "")).replace("\r\n", "\n")
+    text = "\n".join(line.rstrip() for line in text.split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def estimate_tokens(chars):
+    return int(round(chars / _load_prompts_config().get("chars_per_token", 4)))
+
+
+# ============================================================
+# 1️⃣ Static context blocks (same for every request until the data changes)
+# ============================================================
+def _column_kind(series):
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series):
+        return "number"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "date"
+    return "text"
+
+
+@lru_cache(maxsize=None)
+def schema_block(agent_names=None):
+    """Columns and row counts of the bundled datasets (all agents, or the given ones)"""
+    from agents.registry import AGENT_REGISTRY
+    from utils.data_loader import load_data
+
+    lines = []
+    for name, spec in AGENT_REGISTRY.items():
+        path = spec.get("default_path")
+        if (agent_names and name not in agent_names) or not path:
+            continue
+        path = os.path.join(BASE_DIR, path)
+        if not os.path.exists(path):
+            continue
+        df = load_data(path)
+        columns = ", ".join(f"{column} ({_column_kind(df[column])})" for column in df.columns)
+        lines.append(f"- {os.path.basename(path)} ({name}): {len(df):,} rows; columns: {columns}")
+    return "Datasets:\n" + "\n".join(lines) if lines else ""
+
+
+@lru_cache(maxsize=None)
+def facts_block(agent_names=None):
+    """Precomputed facts (all, or those of the given agents' bundled datasets), in table order"""
+    from agents.registry import AGENT_REGISTRY
+    from utils.fact_table import get_fact_matcher
+
+    facts = get_fact_matcher().facts
+    if agent_names:
+        datasets = {os.path.basename(AGENT_REGISTRY[name].get("default_path") or "") for name in agent_names}
+        facts = [fact for fact in facts if fact["dataset"] in datasets]
+    if not facts:
+        return ""
+    return "Precomputed dataset facts:\n" + "\n".join(f"- {fact['text']} (source: {fact['dataset']})" for fact in facts)
+
+
+STATIC_BLOCKS = {"schema": schema_block, "facts": facts_block}
+
+
+def refresh_prompts():
+    """Forget static blocks and templates after the bundled data or facts change"""
+    schema_block.cache_clear()
+    facts_block.cache_clear()
+    _templates.clear()
+
+
+# ============================================================
+# 2️⃣ Templates
+# ============================================================
+@dataclass(frozen=True)
+class Prompt:
+    template: str
+    prefix: str
+    suffix: str
+    trimmed_chars: int = 0  # whitespace removed from the request's parts by clean()
+
+    @property
+    def text(self):
+        return f"{self.prefix}\n\n{self.suffix}"
+
+    @cached_property
+    def prefix_digest(self):
+        return hashlib.sha1(self.prefix.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    instructions: str
+    static_blocks: tuple = ()   # names from STATIC_BLOCKS
+    agent_names: tuple = None   # restrict the static blocks to these agents' datasets
+
+    @cached_property
+    def prefix(self):
+        blocks = [clean(self.instructions)]
+        blocks += [clean(STATIC_BLOCKS[block](self.agent_names)) for block in self.static_blocks]
+        return "\n\n".join(filter(None, blocks))
+
+    def render(self, question, context="", history=""):
+        parts = [
+            ("Conversation so far", history),
+            ("Context", context),
+            ("Question", question),
+        ]
+        sections, trimmed = [], 0
+        for title, raw in parts:
+            body = clean(raw)
+            trimmed += len(str(raw or "")) - len(body)
+            if body or title == "Question":
+                sections.append(f"{title}:\n{body}")
+        return Prompt(self.name, self.prefix, "\n\n".join(sections), max(0, trimmed))
+
+
+_templates = {}
+
+
+def _static_blocks():
+    config = _load_prompts_config()
+    cache = config.get("context_cache", {}) or {}
+    if cache.get("enabled"):
+        return tuple(cache.get("static_context", ["schema", "facts"]))
+    # Without the cache every static block is paid for on every request
+    return tuple(config.get("static_context", []))
+
+
+def answer_template():
+    """The app's final-answer prompt (app_core.gemini_answer)"""
+    key = ("answer", _static_blocks())
+    if key not in _templates:
+        _templates[key] = PromptTemplate("answer", ANSWER_INSTRUCTIONS, key[1])
+    return _templates[key]
+
+
+def agent_template(agent_key, agent_name, intro):
+    """An agent's own prompt (DatasetAgent.run): its intro and answer style, static blocks for its dataset"""
+    key = (agent_key, intro, _static_blocks())
+    if key not in _templates:
+        _templates[key] = PromptTemplate(agent_key, f"{intro}\n{AGENT_INSTRUCTIONS}", key[2], (agent_name,))
+    return _templates[key]
+
+
+# ============================================================
+# 3️⃣ Generation with prefix reuse and token accounting
+# ============================================================
+_context_caches = {}        # (model, prefix digest) → (model bound to the cache or None, expires at)
+_cache_pending = set()      # keys whose cached content is being created
+_cache_lock = threading.Lock()
+_totals = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "trimmed_tokens": 0}
+_totals_lock = threading.Lock()
+
+
+def _cached_model(api_key, model_name, prompt):
+    """GenerativeModel bound to explicit cached content for `prompt.prefix`, or None"""
+    settings = _load_prompts_config().get("context_cache", {}) or {}
+    if not settings.get("enabled") or estimate_tokens(len(prompt.prefix)) < settings.get("min_tokens", 4096):
+        return None
+
+    key = (model_name, prompt.prefix_digest)
+    with _cache_lock:
+        model, expires = _context_caches.get(key, (None, 0))
+        if key in _context_caches and (model is None or time.time() < expires):
+            return model  # None: the provider refused before, don't retry every request
+        if key in _cache_pending:
+            return None  # another request is uploading it; send the full prompt meanwhile
+        _cache_pending.add(key)
+
+    # The upload is a network call: made outside the lock so other requests never wait on it
+    ttl = settings.get("ttl_seconds", 3600)
+    model = None
+    try:
+        import datetime
+
+        genai = get_genai(api_key)
+        cache = genai.caching.CachedContent.create(
+            model=model_name,
+            display_name=f"krishisutra-{prompt.template}-{prompt.prefix_digest[:8]}",
+            contents=[prompt.prefix],
+            ttl=datetime.timedelta(seconds=ttl),
+        )
+        model = genai.GenerativeModel.from_cached_content(cached_content=cache)
+        print(f"🧊 Cached {estimate_tokens(len(prompt.prefix)):,}-token prefix of '{prompt.template}' for {ttl}s")
+    except Exception as e:
+        print(f"⚠️ Context cache unavailable for {model_name}, sending full prompts: {e}")
+    finally:
+        with _cache_lock:
+            # Renew a minute early so requests never hit an expired cache
+            _context_caches[key] = (model, time.time() + ttl - 60)
+            _cache_pending.discard(key)
+    return model
+
+
+def _usage(response, prompt, sent_text, cached_model):
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(len(sent_text))
+    cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+    if cached_model is not None and not cached_tokens:
+        cached_tokens = estimate_tokens(len(prompt.prefix))
+    return {
+        "prompt_tokens": int(prompt_tokens),
+        "cached_tokens": int(cached_tokens),
+        "trimmed_tokens": estimate_tokens(prompt.trimmed_chars),
+    }
+
+
+def generate(template, question, api_key, model_name, context="", history="", agent=None):
+    """Render and send a prompt (just its suffix when the prefix is in a context cache); returns the response"""
+    with span("prompt_build", agent=agent):
+        prompt = template.render(question, context, history)
+        cached_model = _cached_model(api_key, model_name, prompt)
+        model = cached_model or get_chat_model(api_key, model_name)
+        sent_text = prompt.suffix if cached_model is not None else prompt.text
+
+    with span("generate_content", agent=agent, template=prompt.template, prefix=prompt.prefix_digest) as attrs:
+        response = model.generate_content(sent_text)
+        usage = _usage(response, prompt, sent_text, cached_model)
+        attrs.update(usage, saved_tokens=usage["cached_tokens"] + usage["trimmed_tokens"])
+
+    with _totals_lock:
+        _totals["requests"] += 1
+        for name, value in usage.items():
+            _totals[name] += value
+    return response
+
+
+def token_savings():
+    """Process totals: requests, prompt/cached/trimmed tokens and the saved share"""
+    with _totals_lock:
+        totals = dict(_totals)
+    saved = totals["cached_tokens"] + totals["trimmed_tokens"]
+    totals["saved_tokens"] = saved
+    totals["saved_ratio"] = saved / (totals["prompt_tokens"] + totals["trimmed_tokens"] or 1)
+    return totals
+
+
+_METRICS = {
+    "requests": "LLM calls made through prompt templates.",
+    "prompt_tokens": "Prompt tokens sent (provider count, or estimated).",
+    "cached_tokens": "Prompt tokens served from a context cache.",
+    "trimmed_tokens": "Tokens of whitespace removed from request parts.",
+    "saved_tokens": "Cached plus trimmed tokens.",
+}
+
+
+def prometheus_lines():
+    totals = token_savings()
+    lines = []
+    for name, help_text in _METRICS.items():
+        metric = f"krishisutra_llm_{name}_total"
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter", f"{metric} {totals[name]}"]
+    return lines
+
+
+tracer.add_metrics(prometheus_lines)
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from agents.registry import AGENT_REGISTRY, routing
+from utils.embeddings import embed_query, get_embeddings, is_shared_embeddings
+from utils.multi_agent import select_agents
+
+BASE_DIR = os.path.join(os.path.dirname(__file__), "..")
+CENTROID_CACHE = os.path.join(BASE_DIR, "data", "router_centroids.npz")
+
+# ============================================================
+# 1️⃣ Agent profiles — example queries + the datasets each agent serves
+# ============================================================
+# From `routing` in each agents: entry of config.yaml; agents with neither examples nor
+# datasets are never auto-routed
+AGENT_PROFILES = {
+    agent_name: {"examples": profile["examples"], "datasets": profile["datasets"]}
+    for agent_name, profile in ((name, routing(name)) for name in AGENT_REGISTRY)
+    if profile["examples"] or profile["datasets"]
+}
+
+DATASET_SAMPLE_ROWS = 12
+
+
+def _dataset_samples(rel_path):
+    """Render a few labelled rows from a dataset so centroids reflect its vocabulary"""
+    path = os.path.join(BASE_DIR, rel_path)
+    if not os.path.exists(path) or not path.endswith(".csv"):
+        return []
+
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    sample = df.sample(n=min(DATASET_SAMPLE_ROWS, len(df)), random_state=0)
+    columns = ", ".join(df.columns)
+    rows = [
+        "; ".join(f"{col}: {val}" for col, val in row.items())
+        for row in sample.astype(str).to_dict("records")
+    ]
+    return [f"Dataset columns: {columns}"] + rows
+
+
+def _profile_texts(agent_name):
+    profile = AGENT_PROFILES[agent_name]
+    texts = list(profile["examples"])
+    for rel_path in profile["datasets"]:
+        texts.extend(_dataset_samples(rel_path))
+    return texts
+
+
+# ============================================================
+# 2️⃣ Centroid precompute (cached on disk, keyed by model + profile text)
+# ============================================================
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def build_centroids(embeddings, cache_path=CENTROID_CACHE):
+    """Embed every agent profile and return (agent_names, unit centroid matrix)"""
+    agent_names = list(AGENT_PROFILES)
+    profile_texts = {name: _profile_texts(name) for name in agent_names}
+
+    model_name = getattr(embeddings, "model_name", type(embeddings).__name__)
+    digest = hashlib.sha256(
+        json.dumps([model_name, profile_texts], sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                if str(cached["digest"]) == digest and list(cached["agents"]) == agent_names:
+                    return agent_names, cached["centroids"]
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable cache → recompute and overwrite it
+
+    centroids = []
+    for name in agent_names:
+        vectors = _normalize(embeddings.embed_documents(profile_texts[name]))
+        centroids.append(vectors.mean(axis=0))
+    centroids = _normalize(centroids)
+
+    if cache_path:
+        _save_centroids(cache_path, agent_names, centroids, digest)
+
+    return agent_names, centroids
+
+
+def _save_centroids(cache_path, agent_names, centroids, digest):
+    """Write to a temp file and rename it over the cache, so readers never see a partial file"""
+    cache_dir = os.path.dirname(cache_path) or "."
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".centroids-", suffix=".npz", dir=cache_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, agents=np.array(agent_names), centroids=centroids, digest=np.array(digest))
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        print(f"⚠️ Could not cache router centroids: {e}")
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# ============================================================
+# 3️⃣ Router
+# ============================================================
+@dataclass
+class RouteResult:
+    agents: list                      # agents above threshold, best first
+    scores: dict = field(default_factory=dict)
+    query_vector: list = None         # reuse for similarity_search_by_vector
+
+    @property
+    def agent(self):
+        return self.agents[0] if self.agents else None
+
+
+class EmbeddingRouter:
+    """
+    Routes a query to agents by cosine similarity against precomputed agent centroids.
+    After the query is embedded, scoring is a single (n_agents x dim) mat-vec.
+    """
+
+    def __init__(self, embeddings=None, threshold=0.3, multi_margin=0.08, max_agents=3):
+        self.embeddings = embeddings or get_embeddings()
+        self.threshold = threshold
+        self.multi_margin = multi_margin
+        self.max_agents = max_agents
+        self.agent_names, self.centroids = build_centroids(self.embeddings)
+
+    def score(self, query_vector):
+        """Cosine similarity of a (unnormalised) query vector against every centroid"""
+        q = _normalize(query_vector)
+        sims = self.centroids @ q
+        return dict(zip(self.agent_names, sims.tolist()))
+
+    def route(self, user_query):
+        if is_shared_embeddings(self.embeddings):
+            query_vector = embed_query(user_query)  # micro-batched with concurrent requests
+        else:
+            query_vector = self.embeddings.embed_query(user_query)
+        scores = self.score(query_vector)
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        best = scores[ranked[0]]
+        if best < self.threshold:
+            return RouteResult(agents=[], scores=scores, query_vector=query_vector)
+
+        # Keep runners-up that are close to the best match — those are cross-domain questions
+        agents = [
+            name for name in ranked
+            if scores[name] >= self.threshold and best - scores[name] <= self.multi_margin
+        ][:self.max_agents]
+        return RouteResult(agents=agents, scores=scores, query_vector=query_vector)
+
+
+_router = None
+_router_failed_at = None
+_router_lock = threading.Lock()
+ROUTER_RETRY_SECONDS = 60
+
+
+def get_router(threshold=0.3, multi_margin=0.08, max_agents=3):
+    """
+    Lazily build the shared router; concurrent callers wait for the same build. Returns None
+    if the embedding model is unavailable, and tries again after ROUTER_RETRY_SECONDS.
+    """
+    global _router, _router_failed_at
+    if _router is not None:
+        return _router
+    if _router_failed_at is not None and time.monotonic() - _router_failed_at < ROUTER_RETRY_SECONDS:
+        return None
+
+    with _router_lock:
+        if _router is None:
+            try:
+                _router = EmbeddingRouter(
+                    threshold=threshold, multi_margin=multi_margin, max_agents=max_agents
+                )
+                _router_failed_at = None
+            except Exception as e:
+                _router_failed_at = time.monotonic()
+                print(f"⚠️ Embedding router unavailable, falling back to keywords "
+                      f"(retrying in {ROUTER_RETRY_SECONDS}s): {e}")
+    return _router
+
+
+def route_query(user_query, threshold=0.3, multi_margin=0.08, max_agents=3):
+    """
+    Route with the embedding router, falling back to keyword matching when the model is
+    unavailable or no agent clears the confidence threshold.
+    """
+    router = get_router(threshold=threshold, multi_margin=multi_margin, max_agents=max_agents)
+    if router is not None:
+        result = router.route(user_query)
+        if result.agents:
+            return result
+        return RouteResult(
+            agents=select_agents(user_query, max_agents),
+            scores=result.scores,
+            query_vector=result.query_vector,
+        )
+
+    return RouteResult(agents=select_agents(user_query, max_agents))
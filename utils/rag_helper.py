@@ -1,21 +1,22 @@
-import os
-import yaml
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from functools import lru_cache
 
-# Load config for API key
-config_path = os.path.join(os.path.dirname(__file__), "..", "config.yaml")
-with open(config_path, "r") as f:
-    config = yaml.safe_load(f)
+from utils.config import load_config
+
+# Load config for API key (GOOGLE_API_KEY overrides config.yaml)
+config = load_config()
 
 GEMINI_API_KEY = config.get("google_api_key")
 EMBEDDING_MODEL = config.get("embedding_model", "models/embedding-001")
 
-if GEMINI_API_KEY:
-    embeddings = GoogleGenerativeAIEmbeddings(
+
+@lru_cache(maxsize=None)
+def get_google_embeddings():
+    """Google embeddings, created (and the SDK imported) on first use rather than at import time"""
+    if not GEMINI_API_KEY:
+        raise ValueError("Missing Google API key in config.yaml")
+
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(
         model=EMBEDDING_MODEL,
         google_api_key=GEMINI_API_KEY
     )
-else:
-    raise ValueError("Missing Google API key in config.yaml")
@@ -0,0 +1,148 @@
+"""
+Tabular rows → labelled text documents for embedding.
+
+Joining raw cells ("1901, 17.99, 19.43, ...") gives the encoder bare numbers with no
+column names, and rows of the same table embed almost identically. Here each record is
+rendered through a per-dataset template that names every value ("All-India mean
+temperature in 1901 (°C): annual 24.23; Jan 17.99, ..."), one document per row, or per
+row-group where rows only make sense together (every variety of one commodity in one
+market on one day). Tables without a template get a generic "Column: value; ..." render.
+Identical renders are embedded once.
+"""
+from langchain_core.documents import Document
+
+from utils.config import config_section
+from utils.data_loader import _column_text
+
+# Bump when templates change: it is part of the index key, so old indexes are rebuilt
+TEMPLATE_VERSION = 1
+
+# Full month names: questions say "March", not "MAR"
+_MONTHS = ("January {JAN}, February {FEB}, March {MAR}, April {APR}, May {MAY}, June {JUN}, July {JUL}, "
+           "August {AUG}, September {SEP}, October {OCT}, November {NOV}, December {DEC}")
+_MONTH_COLUMNS = {"JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"}
+_SEASONS = "winter (Jan-Feb) {JAN-FEB}, pre-monsoon (Mar-May) {MAR-MAY}, monsoon (Jun-Sep) {JUN-SEP}, post-monsoon (Oct-Dec) {OCT-DEC}"
+_SEASON_COLUMNS = {"JAN-FEB", "MAR-MAY", "JUN-SEP", "OCT-DEC"}
+
+# First template whose columns are all present wins, so more specific ones come first.
+# "header" is rendered once per group_by group, "row" once per row in it.
+TEMPLATES = [
+    {
+        "name": "mandi_prices",
+        "columns": {"State", "District", "Market", "Commodity", "Variety", "Grade", "Arrival_Date",
+                    "Min_x0020_Price", "Max_x0020_Price", "Modal_x0020_Price"},
+        "group_by": ["Arrival_Date", "State", "District", "Market", "Commodity"],
+        "header": "{Commodity} prices at {Market} market ({District}, {State}) on {Arrival_Date}, Rs./quintal:",
+        "row": "{Variety} ({Grade}): modal {Modal_x0020_Price}, min {Min_x0020_Price}, max {Max_x0020_Price}",
+    },
+    {
+        "name": "imd_subdivision_rainfall",
+        "columns": {"SUBDIVISION", "YEAR", "ANNUAL", "JF", "MAM", "JJAS", "OND"} | _MONTH_COLUMNS,
+        "row": "Rainfall in {SUBDIVISION} in {YEAR} (mm): annual {ANNUAL}; monthly " + _MONTHS
+               + "; seasonal winter (Jan-Feb) {JF}, pre-monsoon (Mar-May) {MAM}, monsoon (Jun-Sep) {JJAS}, "
+                 "post-monsoon (Oct-Dec) {OND}",
+    },
+    {
+        "name": "imd_mean_temperature",
+        "columns": {"YEAR", "ANNUAL"} | _MONTH_COLUMNS | _SEASON_COLUMNS,
+        "row": "All-India mean temperature in {YEAR} (°C): annual {ANNUAL}; monthly " + _MONTHS
+               + "; seasonal " + _SEASONS,
+    },
+    {
+        "name": "imd_seasonal_temperature",
+        "columns": {"YEAR", "ANNUAL"} | _SEASON_COLUMNS,
+        "row": "All-India mean temperature in {YEAR} (°C): annual {ANNUAL}; seasonal " + _SEASONS,
+    },
+]
+
+
+def _load_table_text_config():
+    return config_section("table_text")
+
+
+def table_text_enabled():
+    return bool(_load_table_text_config().get("enabled", False))
+
+
+def embed_batch_size():
+    """Row documents are short, so they are embedded in larger batches than text chunks"""
+    return _load_table_text_config().get("batch_size", 256)
+
+
+def index_params():
+    """Index-key params for row documents (a new template version means a new index)"""
+    return f"rows=v{TEMPLATE_VERSION}"
+
+
+# ============================================================
+# 1️⃣ Templates
+# ============================================================
+def find_template(columns):
+    columns = set(columns)
+    return next((template for template in TEMPLATES if template["columns"] <= columns), None)
+
+
+def _label(column):
+    return column.replace("_x0020_", " ").replace("_", " ").strip()
+
+
+def _rows(df):
+    """Row tuples of display strings, one at a time (missing values shown as n/a)"""
+    for values in zip(*(_column_text(df, name) for name in df.columns)):
+        yield tuple("n/a" if v in ("nan", "NaT", "None", "<NA>") else v for v in values)
+
+
+def _records(df):
+    columns = list(df.columns)
+    for values in _rows(df):
+        yield dict(zip(columns, values))
+
+
+def _generic_rows(df):
+    """"Column: value; ..." for tables without a template. Joined directly, not through a
+    format string: uploaded column names like "2019", "Area.Sown" or "Ratio:1" are fields
+    str.format cannot address"""
+    labels = [_label(column) for column in df.columns]
+    for values in _rows(df):
+        yield "; ".join(f"{label}: {value}" for label, value in zip(labels, values))
+
+
+# ============================================================
+# 2️⃣ Rendering
+# ============================================================
+def render_rows(df):
+    """(template name, [rendered text]) for every row or row-group of `df`, duplicates kept"""
+    df = df.rename(columns=lambda c: str(c).strip())
+    template = find_template(df.columns)
+    if template is None:
+        return "generic", list(_generic_rows(df))
+    row_format = template["row"]
+
+    if not template.get("group_by"):
+        return template["name"], [row_format.format_map(record) for record in _records(df)]
+
+    texts, group, current = [], [], None
+    keys = template["group_by"]
+    # Rows of a group are usually adjacent in these feeds; a stable sort makes sure of it
+    for record in _records(df.sort_values(keys, kind="stable")):
+        key = tuple(record[k] for k in keys)
+        if key != current and group:
+            texts.append("\n".join(group))
+            group = []
+        if not group:
+            group.append(template["header"].format_map(record))
+        group.append("- " + row_format.format_map(record))
+        current = key
+    if group:
+        texts.append("\n".join(group))
+    return template["name"], texts
+
+
+def render_documents(df, source=None):
+    """One Document per distinct render; metadata records the source file and template"""
+    name, texts = render_rows(df)
+    unique = list(dict.fromkeys(texts))
+    if len(unique) < len(texts):
+        print(f"♻️ {len(texts) - len(unique)} duplicate row renders skipped ({source or name})")
+    metadata = {"template": name, **({"source": source} if source else {})}
+    return [Document(page_content=text, metadata=dict(metadata)) for text in unique]
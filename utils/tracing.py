@@ -0,0 +1,220 @@
+"""
+Lightweight latency tracing.
+
+Wrap a stage with `span()` (or decorate a function with `traced()`); finished spans go
+into an in-memory ring buffer, optionally appended to a JSONL file, and can be served as
+Prometheus text with p50/p95/p99 per (stage, agent).
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.config import config_section
+
+
+_trace_id = ContextVar("trace_id", default=None)
+
+
+def _load_tracing_config():
+    try:
+        return config_section("tracing")
+    except OSError:
+        return {}
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def agent_label(agent_name):
+    """'🌦️ Climate Agent' → 'climate', so UI names and builder spans group together"""
+    if not agent_name:
+        return None
+    words = re.sub(r"[^\w\s]", "", agent_name).split()
+    return " ".join(w for w in words if w.lower() != "agent").lower() or None
+
+
+class Tracer:
+    def __init__(self, buffer_size=5000, jsonl_path=None, enabled=True):
+        self.enabled = enabled
+        self.spans = deque(maxlen=buffer_size)
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+        self._metric_sources = []
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+
+    # ----------------------------------
+    # Recording
+    # ----------------------------------
+    @contextmanager
+    def span(self, stage, agent=None, **attrs):
+        """Yields the span's attribute dict, so results known only at the end can be added"""
+        if not self.enabled:
+            yield attrs
+            return
+
+        start_wall = time.time()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            record = {
+                "trace_id": _trace_id.get(),
+                "stage": stage,
+                "agent": agent,
+                "start": start_wall,
+                "duration_ms": (time.perf_counter() - start) * 1000,
+                "error": error,
+                **attrs,
+            }
+            self._record(record)
+
+    def _record(self, record):
+        with self._lock:
+            self.spans.append(record)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    # ----------------------------------
+    # Aggregation / export
+    # ----------------------------------
+    def summary(self):
+        """{(stage, agent): {count, errors, p50, p95, p99, mean}} in milliseconds"""
+        with self._lock:
+            spans = list(self.spans)
+
+        grouped = {}
+        for record in spans:
+            grouped.setdefault((record["stage"], record["agent"]), []).append(record)
+
+        stats = {}
+        for key, records in grouped.items():
+            durations = sorted(r["duration_ms"] for r in records)
+            stats[key] = {
+                "count": len(durations),
+                "errors": sum(1 for r in records if r["error"]),
+                "mean": sum(durations) / len(durations),
+                "p50": _percentile(durations, 50),
+                "p95": _percentile(durations, 95),
+                "p99": _percentile(durations, 99),
+            }
+        return stats
+
+    def add_metrics(self, source):
+        """`source()` returns extra Prometheus lines (process counters kept outside the span buffer)"""
+        self._metric_sources.append(source)
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP krishisutra_stage_latency_ms Stage latency over the span ring buffer.",
+            "# TYPE krishisutra_stage_latency_ms summary",
+        ]
+        for (stage, agent), s in sorted(self.summary().items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+            labels = f'stage="{stage}",agent="{agent or ""}"'
+            for q in ("p50", "p95", "p99"):
+                quantile = int(q[1:]) / 100
+                lines.append(f'krishisutra_stage_latency_ms{{{labels},quantile="{quantile}"}} {s[q]:.3f}')
+            lines.append(f"krishisutra_stage_latency_ms_sum{{{labels}}} {s['mean'] * s['count']:.3f}")
+            lines.append(f"krishisutra_stage_latency_ms_count{{{labels}}} {s['count']}")
+            lines.append(f"krishisutra_stage_errors_total{{{labels}}} {s['errors']}")
+        for source in self._metric_sources:
+            lines.extend(source())
+        return "\n".join(lines) + "\n"
+
+    def export_jsonl(self, path):
+        """Dump the current ring buffer to a JSONL file"""
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "w", encoding="utf-8") as f:
+            for record in spans:
+                f.write(json.dumps(record, default=str) + "\n")
+        return len(spans)
+
+    def serve_metrics(self, port, host="127.0.0.1"):
+        """Serve Prometheus text at http://host:port/metrics from a daemon thread"""
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+        return server
+
+
+# ============================================================
+# Module-level tracer configured from config.yaml
+# ============================================================
+_config = _load_tracing_config()
+tracer = Tracer(
+    buffer_size=_config.get("buffer_size", 5000),
+    jsonl_path=_config.get("jsonl_path"),
+    enabled=_config.get("enabled", True),
+)
+_metrics_server = None
+
+
+def span(stage, agent=None, **attrs):
+    return tracer.span(stage, agent=agent, **attrs)
+
+
+def traced(stage, agent=None):
+    """Decorator form of `span()`"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(stage, agent=agent):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def trace_request(stage="request", agent=None, **attrs):
+    """Root span for one user request; nested spans share its trace id"""
+    token = _trace_id.set(uuid.uuid4().hex[:16])
+    try:
+        with tracer.span(stage, agent=agent, **attrs):
+            yield
+    finally:
+        _trace_id.reset(token)
+
+
+def start_metrics_server():
+    """Start the Prometheus endpoint once, if `tracing.metrics_port` is configured"""
+    global _metrics_server
+    port = _config.get("metrics_port")
+    if port and _metrics_server is None:
+        _metrics_server = tracer.serve_metrics(int(port))
+    return _metrics_server
@@ -0,0 +1,367 @@
+"""
+Resource limits and background indexing for user-uploaded datasets.
+
+1. `sniff_upload` checks an upload cheaply before anything is parsed: file size, archive
+   contents (uncompressed size and ratio, so a small ZIP or .xlsx cannot expand into
+   gigabytes), Parquet row counts and sizes from the file metadata, and for CSV the
+   delimiter and column count from the first few KB.
+2. `prepare_upload` streams the file into a bounded frame: oversized files are sampled
+   (or capped) to `max_rows` chunk by chunk (CSV and Parquet, also inside a ZIP), very
+   long cells are truncated, and the result is written as a plain CSV every agent can read.
+3. `UploadJobQueue` runs preparation and the embedding build on a small background pool
+   with progress reporting, so a large upload never runs on a request thread and queries
+   on the bundled agents are not stuck behind it.
+"""
+import csv
+import os
+import re
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from utils.config import config_section
+
+SUPPORTED_EXTENSIONS = {".csv", ".xls", ".xlsx", ".json", ".parquet", ".zip"}
+
+# save_upload stores files as "{sha1[:12]}_{original name}"
+_UPLOAD_PREFIX = re.compile(r"^[0-9a-f]{12}_")
+
+DEFAULT_LIMITS = {
+    "max_bytes": 50 * 1024 * 1024,
+    "max_uncompressed_bytes": 200 * 1024 * 1024,
+    "max_compression_ratio": 100,
+    "max_rows": 100_000,
+    "row_policy": "sample",
+    "max_columns": 200,
+    "max_cell_chars": 2000,
+    "sniff_bytes": 64 * 1024,
+    "chunk_rows": 50_000,
+    "build_workers": 1,
+    "max_jobs": 100,
+}
+
+
+class UploadRejected(ValueError):
+    """The upload is over a hard limit or cannot be read; the message is shown to the user"""
+
+
+def _load_upload_config():
+    return config_section("uploads")
+
+
+def upload_limits():
+    return {**DEFAULT_LIMITS, **_load_upload_config()}
+
+
+def _mb(n):
+    return f"{n / (1024 * 1024):.0f} MB"
+
+
+# ============================================================
+# 1️⃣ Sniff (hard limits, nothing parsed)
+# ============================================================
+def _check_archive(path, limits, label, extensions=None):
+    """ZIP members (with one of `extensions`, or all), rejected if they expand too far"""
+    try:
+        with zipfile.ZipFile(path) as z:
+            members = [
+                m for m in z.infolist()
+                if extensions is None or os.path.splitext(m.filename)[1].lower() in extensions
+            ]
+    except zipfile.BadZipFile:
+        raise UploadRejected(f"The {label} is damaged")
+    expanded = sum(m.file_size for m in members)
+    packed = max(1, sum(m.compress_size for m in members))
+    if expanded > limits["max_uncompressed_bytes"]:
+        raise UploadRejected(
+            f"The {label} expands to {_mb(expanded)}; the limit is {_mb(limits['max_uncompressed_bytes'])}"
+        )
+    if expanded / packed > limits["max_compression_ratio"]:
+        raise UploadRejected(f"The {label} is compressed {expanded / packed:.0f}:1, which is not a normal dataset")
+    return members
+
+
+def sniff_upload(path, limits=None):
+    """{"format", "bytes", "columns", "estimated_rows"} or UploadRejected"""
+    limits = limits or upload_limits()
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise UploadRejected(f"Unsupported file type: {ext or 'none'}")
+
+    size = os.path.getsize(path)
+    if size > limits["max_bytes"]:
+        raise UploadRejected(f"File is {_mb(size)}; the limit is {_mb(limits['max_bytes'])}")
+    info = {"format": ext.lstrip("."), "bytes": size, "columns": None, "estimated_rows": None}
+
+    if ext == ".zip":
+        members = _check_archive(path, limits, "ZIP file", SUPPORTED_EXTENSIONS - {".zip"})
+        if not members:
+            raise UploadRejected("The ZIP file has no CSV, Excel, JSON or Parquet files")
+
+    elif ext == ".xlsx":
+        # A workbook is a ZIP of XML parts and is parsed whole, so it gets the same checks
+        _check_archive(path, limits, "Excel file")
+
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+
+        try:
+            metadata = pq.ParquetFile(path).metadata
+        except Exception:
+            raise UploadRejected("The Parquet file is damaged")
+        info["columns"], info["estimated_rows"] = metadata.num_columns, metadata.num_rows
+        expanded = sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+        if expanded > limits["max_uncompressed_bytes"]:
+            raise UploadRejected(
+                f"The Parquet data expands to {_mb(expanded)}; the limit is {_mb(limits['max_uncompressed_bytes'])}"
+            )
+
+    elif ext == ".csv":
+        with open(path, "rb") as f:
+            head = f.read(limits["sniff_bytes"]).decode("utf-8", errors="replace")
+        lines = head.splitlines()[:-1] if size > len(head) else head.splitlines()  # last may be cut off
+        if not lines:
+            raise UploadRejected("The CSV file is empty")
+        try:
+            dialect = csv.Sniffer().sniff("\n".join(lines[:50]), delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        header = next(csv.reader([lines[0]], dialect))
+        info["columns"] = len(header)
+        info["delimiter"] = dialect.delimiter
+        info["estimated_rows"] = int(size / max(1, len(head.encode("utf-8")) / len(lines))) - 1
+
+    if info["columns"] and info["columns"] > limits["max_columns"]:
+        raise UploadRejected(f"The file has {info['columns']} columns; the limit is {limits['max_columns']}")
+    return info
+
+
+# ============================================================
+# 2️⃣ Prepare (bounded rows / cells, normalised to CSV)
+# ============================================================
+@dataclass
+class PreparedUpload:
+    path: str
+    rows: int
+    total_rows: int
+    columns: int
+    truncated_cells: int = 0
+
+    @property
+    def sampled(self):
+        return self.rows < self.total_rows
+
+    def summary(self):
+        notes = [f"{self.rows:,} rows × {self.columns} columns"]
+        if self.sampled:
+            notes.append(f"sampled from {self.total_rows:,} rows")
+        if self.truncated_cells:
+            notes.append(f"long cells truncated: {self.truncated_cells:,}")
+        return ", ".join(notes)
+
+
+def _sample_chunks(chunks, max_rows, policy, seed=0):
+    """
+    Bounded uniform sample over a stream of frames: every row gets a random key and the
+    `max_rows` smallest keys are kept, so memory stays at max_rows + one chunk.
+    "head" keeps the first rows instead.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    kept, total, offset = None, 0, 0
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+        chunk.index = chunk.index + offset
+        offset += len(chunk)
+        total += len(chunk)
+        if policy == "head":
+            if kept is None or len(kept) < max_rows:
+                kept = chunk if kept is None else pd.concat([kept, chunk])
+                kept = kept.iloc[:max_rows]
+            continue
+        chunk = chunk.assign(_key=rng.random(len(chunk)))
+        kept = chunk if kept is None else pd.concat([kept, chunk])
+        if len(kept) > max_rows:
+            kept = kept.nsmallest(max_rows, "_key")
+    if kept is None:
+        return pd.DataFrame(), 0
+    kept = kept.drop(columns="_key", errors="ignore").sort_index()  # back in file order
+    return kept.reset_index(drop=True), total
+
+
+def _parquet_chunks(source, chunk_rows):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def _iter_chunks(path, sniffed, limits):
+    """DataFrames of at most `chunk_rows` rows for CSV and Parquet (also inside a ZIP)"""
+    import pandas as pd
+    from utils.data_loader import load_data
+
+    def csv_chunks(source, sep=","):
+        return pd.read_csv(
+            source, sep=sep, chunksize=limits["chunk_rows"], encoding_errors="replace", on_bad_lines="skip"
+        )
+
+    if sniffed["format"] == "csv":
+        yield from csv_chunks(path, sniffed.get("delimiter", ","))
+    elif sniffed["format"] == "parquet":
+        yield from _parquet_chunks(path, limits["chunk_rows"])
+    elif sniffed["format"] == "zip":
+        with zipfile.ZipFile(path) as z:
+            for member in z.infolist():
+                ext = os.path.splitext(member.filename)[1].lower()
+                if ext not in SUPPORTED_EXTENSIONS - {".zip"}:
+                    continue
+                with z.open(member) as f:
+                    if ext == ".csv":
+                        yield from csv_chunks(f)
+                    elif ext == ".parquet":
+                        yield from _parquet_chunks(f, limits["chunk_rows"])
+                    elif ext == ".json":
+                        yield pd.read_json(f)
+                    else:
+                        yield pd.read_excel(f)
+    else:
+        # Excel and JSON have no streaming reader here; their size is bounded by the sniff
+        yield load_data(path)
+
+
+def prepare_upload(path, out_path=None, limits=None, sniffed=None):
+    """Read `path` within the limits and write it as CSV (default `<name>.prepared.csv` next to it)"""
+    import pandas as pd
+
+    limits = limits or upload_limits()
+    sniffed = sniffed or sniff_upload(path, limits)
+    max_rows, policy = limits["max_rows"], limits["row_policy"]
+
+    df, total = _sample_chunks(_iter_chunks(path, sniffed, limits), max_rows, policy)
+    df.columns = df.columns.astype(str).str.strip().str.replace("\n", "_").str.replace(" ", "_")
+
+    if df.empty:
+        raise UploadRejected("No rows could be read from the file")
+    if len(df.columns) > limits["max_columns"]:
+        raise UploadRejected(f"The file has {len(df.columns)} columns; the limit is {limits['max_columns']}")
+
+    truncated = 0
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_string_dtype(col) or col.dtype == object:
+            long_cells = col.astype(str).str.len() > limits["max_cell_chars"]
+            if long_cells.any():
+                truncated += int(long_cells.sum())
+                df.loc[long_cells, name] = col[long_cells].astype(str).str.slice(0, limits["max_cell_chars"])
+
+    prepared_path = out_path or f"{os.path.splitext(path)[0]}.prepared.csv"
+    os.makedirs(os.path.dirname(os.path.abspath(prepared_path)), exist_ok=True)
+    df.to_csv(prepared_path, index=False)
+    return PreparedUpload(prepared_path, len(df), total, len(df.columns), truncated)
+
+
+# ============================================================
+# 3️⃣ Background job queue
+# ============================================================
+@dataclass
+class UploadJob:
+    id: str
+    agent_name: str
+    source_path: str
+    status: str = "queued"      # queued → preparing → indexing → ready | failed
+    done: int = 0               # chunks embedded so far
+    total: int = 0
+    message: str = ""
+    retryable: bool = False     # failed on an error a rebuild may not hit again
+    sniffed: dict = None        # sniff_upload() of the source, done before queueing
+    result: object = None       # whatever the build callable returns (e.g. the agent handle)
+    created: float = field(default_factory=time.time)
+
+    @property
+    def progress(self):
+        if self.status == "ready":
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+    def describe(self):
+        name = _UPLOAD_PREFIX.sub("", os.path.basename(self.source_path))
+        if self.status == "failed":
+            return f"❌ Could not index {name}: {self.message}"
+        if self.status == "ready":
+            return f"✅ {name} is ready for {self.agent_name}. {self.message}".strip()
+        if self.status == "indexing" and self.total:
+            step = f"embedding {self.done}/{self.total} chunks ({self.progress:.0%})"
+        else:
+            step = {"queued": "waiting in the queue", "preparing": "checking and sampling the file"}.get(
+                self.status, "building the index")
+        return (f"⏳ Indexing {name} for {self.agent_name}: {step}. Ask again in a moment; "
+                f"the built-in datasets stay available meanwhile.")
+
+
+class UploadJobQueue:
+    """One job per (agent, upload); builds run on `workers` background threads"""
+
+    def __init__(self, build, workers=1, max_jobs=100):
+        """`build(job)` prepares and indexes the upload and returns the job's result"""
+        self.build = build
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload-build")
+
+    def submit(self, agent_name, source_path):
+        """
+        The existing job for this upload, or a newly queued one. A job that failed on an
+        unexpected error is queued again (the same content fails a rejection again, so those
+        are kept). Raises UploadRejected straight away when the file is over a hard limit.
+        """
+        job = self.find(agent_name, source_path)
+        if job is not None and not job.retryable:
+            return job
+        sniffed = sniff_upload(source_path)
+
+        key = (agent_name, os.path.abspath(source_path))
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.retryable:
+                return job
+            if len(self._jobs) >= self.max_jobs:
+                # Forget the oldest finished jobs; their agents stay in the agent cache
+                for old_key, old in sorted(self._jobs.items(), key=lambda item: item[1].created):
+                    if old.status in ("ready", "failed") and len(self._jobs) >= self.max_jobs:
+                        del self._jobs[old_key]
+            job = self._jobs[key] = UploadJob(uuid.uuid4().hex[:12], agent_name, source_path, sniffed=sniffed)
+        self._pool.submit(self._run, job)
+        return job
+
+    def find(self, agent_name, source_path):
+        return self._jobs.get((agent_name, os.path.abspath(source_path)))
+
+    def jobs(self):
+        return list(self._jobs.values())
+
+    def _run(self, job):
+        from utils.parallel_embed import build_progress
+
+        def on_progress(done, total):
+            job.status, job.done, job.total = "indexing", done, total
+
+        # Pool threads are reused, so the callback is reset after every job
+        token = build_progress.set(on_progress)
+        job.status = "preparing"
+        try:
+            job.result = self.build(job)
+            job.status = "ready"
+        except UploadRejected as e:
+            job.status, job.message = "failed", str(e)
+        except Exception as e:
+            job.status, job.message, job.retryable = "failed", f"{type(e).__name__}: {e}", True
+            print(f"❌ Upload build failed for {job.source_path}: {e}")
+        finally:
+            build_progress.reset(token)